@@ -0,0 +1,130 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from attendee.models import Attendee
+from event.models import Event
+
+
+class CheckInSerializer(serializers.Serializer):
+    attendee = serializers.IntegerField()
+    checked_in = serializers.DateTimeField()
+
+
+class CheckInBatchSerializer(serializers.Serializer):
+    checkins = CheckInSerializer(many=True, allow_empty=False)
+
+
+def get_checkin_snapshot(event):
+    """
+    Return the check-in data of all attendees of the event as a list of
+    ``[id, checkin_code, verification, email, checked_in]`` rows and a version
+    hash of these rows.
+    """
+    rows = [
+        [
+            attendee_id,
+            checkin_code,
+            Attendee.objects.get_verification(attendee_id),
+            email,
+            checked_in,
+        ]
+        for attendee_id, checkin_code, email, checked_in in Attendee.objects.filter(
+            event=event
+        )
+        .order_by("id")
+        .values_list("id", "checkin_code", "user__email", "checked_in")
+    ]
+    encoded = json.dumps(rows, cls=DjangoJSONEncoder)
+    return rows, hashlib.sha1(encoded.encode()).hexdigest()
+
+
+class CheckInSyncViewSet(viewsets.ViewSet):
+    """
+    Check-in synchronization for check-in kiosks with an unreliable network
+    connection.
+
+    A kiosk downloads the snapshot of the check-in data of an event, checks
+    attendees in offline and uploads the check-ins in batches. Uploads are
+    idempotent: attendees that are checked in already keep their check-in
+    time, so a batch can be sent again if the response got lost.
+    """
+
+    permission_classes = [IsAdminUser]
+    lookup_field = "slug"
+
+    def retrieve(self, request, slug=None):
+        """
+        Return the check-in snapshot of the event. If the ``version`` query
+        parameter matches the current version the response is empty with
+        status 304.
+        """
+        event = get_object_or_404(Event, slug=slug)
+        rows, version = get_checkin_snapshot(event)
+        if request.query_params.get("version") == version:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return Response(
+            {
+                "event": event.slug,
+                "version": version,
+                "fields": ["id", "checkin_code", "verification", "email", "checked_in"],
+                "attendees": rows,
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def checkins(self, request, slug=None):
+        """
+        Apply a batch of check-ins in one transaction. The result of each
+        check-in is one of ``checked_in``, ``already`` or ``unknown``.
+        """
+        event = get_object_or_404(Event, slug=slug)
+        serializer = CheckInBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # the earliest check-in wins if an attendee occurs more than once
+        checkins = {}
+        for checkin in serializer.validated_data["checkins"]:
+            attendee_id = checkin["attendee"]
+            if (
+                attendee_id not in checkins
+                or checkin["checked_in"] < checkins[attendee_id]
+            ):
+                checkins[attendee_id] = checkin["checked_in"]
+
+        results = []
+        with transaction.atomic():
+            attendees = (
+                Attendee.objects.select_for_update()
+                .filter(event=event, id__in=checkins.keys())
+                .in_bulk()
+            )
+            checked_in = []
+            for attendee_id, timestamp in checkins.items():
+                attendee = attendees.get(attendee_id)
+                if attendee is None:
+                    result = {"attendee": attendee_id, "status": "unknown"}
+                elif attendee.checked_in is not None:
+                    result = {
+                        "attendee": attendee_id,
+                        "status": "already",
+                        "checked_in": attendee.checked_in,
+                    }
+                else:
+                    attendee.checked_in = timestamp
+                    checked_in.append(attendee)
+                    result = {
+                        "attendee": attendee_id,
+                        "status": "checked_in",
+                        "checked_in": timestamp,
+                    }
+                results.append(result)
+            Attendee.objects.bulk_update(checked_in, ["checked_in"])
+        return Response({"results": results})
@@ -0,0 +1,110 @@
+"""
+Per-request answers to the recurring questions about the current user.
+
+Context processors, the CMS menu and several view mixins need to know whether
+the user of a request is an attendee of an event, a speaker or a member of the
+program committee. :py:class:`UserCapabilities` answers these questions
+lazily and remembers the answers for the lifetime of the request:
+
+- the speaker profile is loaded with one query on first use
+
+- the committee membership is answered by the permissions that the committee
+  views require, which the authentication backend loads once per user
+
+- the attendee of each event is loaded with one query on first use
+
+:py:class:`attendee.middleware.UserCapabilitiesMiddleware` attaches an
+instance to every request, :py:func:`get_capabilities` creates one for
+requests that did not pass the middleware.
+
+"""
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+
+from attendee.models import Attendee
+from talk import COMMITTEE_PERMISSIONS
+
+_NOT_LOADED = object()
+
+
+class UserCapabilities(object):
+    def __init__(self, user):
+        self.user = user
+        self._speaker = _NOT_LOADED
+        self._committee_member = _NOT_LOADED
+        self._attendees = {}
+
+    @property
+    def is_authenticated(self):
+        return self.user.is_authenticated
+
+    @property
+    def is_staff(self):
+        return self.is_authenticated and self.user.is_staff
+
+    @property
+    def speaker(self):
+        """
+        The :py:class:`speaker.models.Speaker` of the user or None.
+        """
+        if self._speaker is _NOT_LOADED:
+            self._speaker = None
+            if self.is_authenticated:
+                user = (
+                    get_user_model()
+                    .objects.select_related("speaker")
+                    .get(pk=self.user.pk)
+                )
+                try:
+                    self._speaker = user.speaker
+                except ObjectDoesNotExist:
+                    pass
+        return self._speaker
+
+    @property
+    def is_speaker(self):
+        return self.speaker is not None
+
+    @property
+    def is_committee_member(self):
+        """
+        Whether the user has the permissions required by
+        :py:class:`talk.views.CommitteeRequiredMixin`.
+        """
+        if self._committee_member is _NOT_LOADED:
+            self._committee_member = self.is_authenticated and self.user.has_perms(
+                COMMITTEE_PERMISSIONS
+            )
+        return self._committee_member
+
+    def attendee(self, event):
+        """
+        Return the :py:class:`attendee.models.Attendee` of the user for the
+        given event or None.
+        """
+        if event is None or not self.is_authenticated:
+            return None
+        if event.pk not in self._attendees:
+            self._attendees[event.pk] = (
+                Attendee.objects.filter(user=self.user, event=event).first()
+            )
+        return self._attendees[event.pk]
+
+    def is_attendee(self, event):
+        return self.attendee(event) is not None
+
+    def checked_in(self, event):
+        attendee = self.attendee(event)
+        return attendee is not None and attendee.checked_in is not None
+
+
+def get_capabilities(request):
+    """
+    Return the :py:class:`UserCapabilities` of the request and attach a new
+    instance if there is none yet.
+    """
+    capabilities = getattr(request, "capabilities", None)
+    if capabilities is None:
+        capabilities = UserCapabilities(request.user)
+        request.capabilities = capabilities
+    return capabilities
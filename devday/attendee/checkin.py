@@ -0,0 +1,63 @@
+"""
+Attendee lookup for the check-in desk.
+
+A check-in shows the attendee, the confirmed session reservations with their
+talk formats and whether the attendee is a speaker of the event. The
+querysets in this module load all of that along with the attendee, so a
+check-in needs a fixed number of queries independent of the number of
+reservations.
+
+"""
+from django.db.models import Exists, OuterRef, Prefetch
+
+from attendee.models import Attendee
+from speaker.models import PublishedSpeaker
+from talk.models import SessionReservation
+
+
+def get_checkin_queryset():
+    """
+    Return a queryset of attendees with the user, event and badge data, an
+    ``is_speaker`` annotation and the confirmed session reservations in
+    ``confirmed_reservations``.
+    """
+    confirmed_reservations = (
+        SessionReservation.objects.filter(is_confirmed=True)
+        .select_related("talk")
+        .prefetch_related("talk__talkformat")
+        .order_by("talk__title")
+    )
+    return (
+        Attendee.objects.select_related("user", "event", "badgedata")
+        .annotate(
+            is_speaker=Exists(
+                PublishedSpeaker.objects.filter(
+                    speaker__user_id=OuterRef("user_id"), event_id=OuterRef("event_id")
+                )
+            )
+        )
+        .prefetch_related(
+            Prefetch(
+                "sessionreservation_set",
+                queryset=confirmed_reservations,
+                to_attr="confirmed_reservations",
+            )
+        )
+    )
+
+
+def find_attendee(key, event):
+    """
+    Return the attendee of the event with the given check-in code or email
+    address or None.
+    """
+    return Attendee.objects.get_by_checkin_code_or_email(
+        key, event, queryset=get_checkin_queryset()
+    )
+
+
+def get_attendee(attendee_id):
+    """
+    Return the attendee with the given id or None.
+    """
+    return get_checkin_queryset().filter(id=attendee_id).first()
@@ -10,6 +10,7 @@ from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django_registration.forms import RegistrationFormUniqueEmail
 
+from attendee import checkin
 from attendee.models import Attendee, AttendeeEventFeedback, BadgeData, DevDayUser
 from devday.forms import AuthenticationForm
 
@@ -366,9 +367,7 @@ class CheckInAttendeeForm(forms.Form):
 
     def clean_attendee(self):
         checkin_code = self.cleaned_data["attendee"]
-        attendee = Attendee.objects.get_by_checkin_code_or_email(
-            checkin_code, self.event
-        )
+        attendee = checkin.find_attendee(checkin_code, self.event)
         if not attendee:
             raise ValidationError(
                 _(
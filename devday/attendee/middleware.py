@@ -0,0 +1,15 @@
+from attendee.capabilities import UserCapabilities
+
+
+class UserCapabilitiesMiddleware:
+    """
+    Attach a lazily evaluated :py:class:`attendee.capabilities.UserCapabilities`
+    to every request as ``request.capabilities``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.capabilities = UserCapabilities(request.user)
+        return self.get_response(request)
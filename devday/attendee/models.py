@@ -7,9 +7,7 @@ import luhn
 from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
-from django.core.mail import send_mail
 from django.db import IntegrityError, models
-from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import pgettext_lazy
@@ -17,6 +15,7 @@ from django.utils.translation import ugettext_lazy as _
 from model_utils.models import TimeStampedModel
 
 from event.models import Event
+from outbox.mail import queue_mail
 
 
 class DevDayUserManager(BaseUserManager):
@@ -100,9 +99,9 @@ class DevDayUser(AbstractBaseUser, PermissionsMixin):
 
     def email_user(self, subject, message, from_email=None, **kwargs):
         """
-        Sends an email to this User.
+        Queues an email to this User in the outbox.
         """
-        send_mail(subject, message, from_email, [self.email], **kwargs)
+        queue_mail(subject, message, from_email, [self.email], **kwargs)
 
     def get_attendee(self, event):
         """
@@ -116,15 +115,23 @@ class DevDayUser(AbstractBaseUser, PermissionsMixin):
 
 
 class AttendeeManager(models.Manager):
-    def get_by_checkin_code_or_email(self, key, event):
+    def get_by_checkin_code_or_email(self, key, event, queryset=None):
         """
         Returns the attendee with the given checkin code or email address. It
         is the responsibility of the caller to verify that the attendee matches
         the desired event, and that the attendee is not checked in already.
+
+        The checkin code and the email address are looked up in separate
+        queries that can use the unique index of the respective column. Pass
+        a queryset to load related data along with the attendee.
         """
-        return self.filter(
-            Q(checkin_code=key) | Q(user__email=key), event=event
-        ).first()
+        if queryset is None:
+            queryset = self.get_queryset()
+        queryset = queryset.filter(event=event)
+        attendee = queryset.filter(checkin_code=key).first()
+        if attendee is None and "@" in key:
+            attendee = queryset.filter(user__email=key).first()
+        return attendee
 
     def is_verification_valid(self, id, verification):
         return self.get_verification(id) == verification
@@ -0,0 +1,137 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from attendee.models import Attendee
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+
+
+class CheckInSyncViewSetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = event_testutils.create_test_event()
+        cls.staff, _ = attendee_testutils.create_test_user(
+            "staff@example.org", is_staff=True
+        )
+        cls.attendees = [
+            Attendee.objects.create(
+                user=attendee_testutils.create_test_user(
+                    "attendee{}@example.org".format(index)
+                )[0],
+                event=cls.event,
+            )
+            for index in range(3)
+        ]
+        cls.other_attendee = Attendee.objects.create(
+            user=attendee_testutils.create_test_user("other@example.org")[0],
+            event=event_testutils.create_test_event("Other Event"),
+        )
+        cls.url = "/api/checkin/{}/".format(cls.event.slug)
+        cls.checkins_url = "/api/checkin/{}/checkins/".format(cls.event.slug)
+
+    def setUp(self):
+        self.client.force_authenticate(self.staff)
+
+    def test_needs_staff(self):
+        user, _ = attendee_testutils.create_test_user()
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(
+            self.client.post(self.checkins_url, {}, format="json").status_code, 403
+        )
+
+    def test_snapshot(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["event"], self.event.slug)
+        self.assertEqual(
+            data["fields"],
+            ["id", "checkin_code", "verification", "email", "checked_in"],
+        )
+        self.assertEqual(
+            data["attendees"],
+            [
+                [
+                    attendee.id,
+                    attendee.checkin_code,
+                    attendee.get_verification(),
+                    attendee.user.email,
+                    None,
+                ]
+                for attendee in self.attendees
+            ],
+        )
+
+    def test_snapshot_version(self):
+        version = self.client.get(self.url).json()["version"]
+        response = self.client.get(self.url, {"version": version})
+        self.assertEqual(response.status_code, 304)
+
+        Attendee.objects.filter(id=self.attendees[0].id).update(
+            checked_in=timezone.now()
+        )
+        response = self.client.get(self.url, {"version": version})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["version"], version)
+
+    def test_snapshot_unknown_event(self):
+        self.assertEqual(self.client.get("/api/checkin/unknown/").status_code, 404)
+
+    def test_checkins(self):
+        now = timezone.now()
+        already = now - timedelta(hours=1)
+        Attendee.objects.filter(id=self.attendees[1].id).update(checked_in=already)
+        payload = {
+            "checkins": [
+                {"attendee": self.attendees[0].id, "checked_in": now},
+                {
+                    "attendee": self.attendees[0].id,
+                    "checked_in": now - timedelta(minutes=5),
+                },
+                {"attendee": self.attendees[1].id, "checked_in": now},
+                {"attendee": self.other_attendee.id, "checked_in": now},
+            ]
+        }
+        response = self.client.post(self.checkins_url, payload, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (result["attendee"], result["status"])
+                for result in response.json()["results"]
+            ],
+            [
+                (self.attendees[0].id, "checked_in"),
+                (self.attendees[1].id, "already"),
+                (self.other_attendee.id, "unknown"),
+            ],
+        )
+        self.attendees[0].refresh_from_db()
+        self.assertEqual(self.attendees[0].checked_in, now - timedelta(minutes=5))
+        self.attendees[1].refresh_from_db()
+        self.assertEqual(self.attendees[1].checked_in, already)
+        self.other_attendee.refresh_from_db()
+        self.assertIsNone(self.other_attendee.checked_in)
+
+    def test_checkins_idempotent(self):
+        checked_in = timezone.now()
+        payload = {
+            "checkins": [{"attendee": self.attendees[2].id, "checked_in": checked_in}]
+        }
+        self.client.post(self.checkins_url, payload, format="json")
+        response = self.client.post(self.checkins_url, payload, format="json")
+        self.assertEqual(response.json()["results"][0]["status"], "already")
+        self.attendees[2].refresh_from_db()
+        self.assertEqual(self.attendees[2].checked_in, checked_in)
+
+    def test_checkins_invalid(self):
+        response = self.client.post(
+            self.checkins_url,
+            {"checkins": [{"attendee": "x", "checked_in": "yesterday"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.checkins_url, {"checkins": []}, format="json")
+        self.assertEqual(response.status_code, 400)
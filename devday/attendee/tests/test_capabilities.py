@@ -0,0 +1,100 @@
+from django.contrib.auth.models import AnonymousUser, Group, Permission
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import timezone
+
+from attendee.capabilities import UserCapabilities, get_capabilities
+from attendee.models import Attendee
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk import COMMITTEE_GROUP
+
+
+class UserCapabilitiesTest(TestCase):
+    def setUp(self):
+        self.event = event_testutils.create_test_event()
+        self.user, _ = attendee_testutils.create_test_user()
+
+    def test_anonymous(self):
+        capabilities = UserCapabilities(AnonymousUser())
+        with self.assertNumQueries(0):
+            self.assertFalse(capabilities.is_staff)
+            self.assertFalse(capabilities.is_speaker)
+            self.assertFalse(capabilities.is_committee_member)
+            self.assertFalse(capabilities.is_attendee(self.event))
+            self.assertFalse(capabilities.checked_in(self.event))
+
+    def test_speaker_single_query(self):
+        speaker, user, _ = speaker_testutils.create_test_speaker()
+        capabilities = UserCapabilities(user)
+        with self.assertNumQueries(1):
+            self.assertTrue(capabilities.is_speaker)
+            self.assertEqual(capabilities.speaker, speaker)
+
+    def test_committee_member_is_memoized(self):
+        self.user.groups.add(Group.objects.get(name=COMMITTEE_GROUP))
+        capabilities = UserCapabilities(self.user)
+        self.assertTrue(capabilities.is_committee_member)
+        with self.assertNumQueries(0):
+            self.assertTrue(capabilities.is_committee_member)
+
+    def test_committee_permissions_without_group(self):
+        self.user.user_permissions.set(
+            Permission.objects.filter(
+                content_type__app_label="talk",
+                codename__in=["add_vote", "add_talkcomment"],
+            )
+        )
+        self.assertTrue(UserCapabilities(self.user).is_committee_member)
+
+    def test_partial_committee_permissions(self):
+        group = Group.objects.create(name="Voters")
+        self.user.groups.add(group)
+        group.permissions.set(
+            Permission.objects.filter(
+                content_type__app_label="talk", codename="add_vote"
+            )
+        )
+        self.assertFalse(UserCapabilities(self.user).is_committee_member)
+
+    def test_no_speaker_no_committee_member(self):
+        capabilities = UserCapabilities(self.user)
+        self.assertFalse(capabilities.is_speaker)
+        self.assertIsNone(capabilities.speaker)
+        self.assertFalse(capabilities.is_committee_member)
+
+    def test_superuser_is_committee_member(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertTrue(UserCapabilities(self.user).is_committee_member)
+
+    def test_attendee_single_query_per_event(self):
+        other_event = event_testutils.create_test_event("Other Event")
+        attendee = Attendee.objects.create(
+            user=self.user, event=self.event, checked_in=timezone.now()
+        )
+        capabilities = UserCapabilities(self.user)
+        with self.assertNumQueries(2):
+            self.assertEqual(capabilities.attendee(self.event), attendee)
+            self.assertTrue(capabilities.is_attendee(self.event))
+            self.assertTrue(capabilities.checked_in(self.event))
+            self.assertFalse(capabilities.is_attendee(other_event))
+            self.assertFalse(capabilities.checked_in(other_event))
+
+    def test_not_checked_in(self):
+        Attendee.objects.create(user=self.user, event=self.event)
+        capabilities = UserCapabilities(self.user)
+        self.assertTrue(capabilities.is_attendee(self.event))
+        self.assertFalse(capabilities.checked_in(self.event))
+
+    def test_get_capabilities(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        capabilities = get_capabilities(request)
+        self.assertIs(get_capabilities(request), capabilities)
+        self.assertIs(request.capabilities, capabilities)
+
+    def test_middleware(self):
+        response = self.client.get("/")
+        self.assertIsInstance(response.wsgi_request.capabilities, UserCapabilities)
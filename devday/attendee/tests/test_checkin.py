@@ -0,0 +1,83 @@
+from django.test import TestCase
+
+from attendee import checkin
+from attendee.models import Attendee
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk.models import SessionReservation, TalkFormat, Track
+from talk.tests import talk_testutils
+
+
+class CheckInServiceTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = event_testutils.create_test_event()
+        cls.user, _ = attendee_testutils.create_test_user("test@example.org")
+        cls.attendee = Attendee.objects.create(user=cls.user, event=cls.event)
+        cls.speaker, _, _ = speaker_testutils.create_test_speaker()
+        cls.workshop_format = TalkFormat.objects.create(name="Workshop", duration=180)
+        cls.talks = []
+        for index in range(3):
+            talk = talk_testutils.create_test_talk(
+                cls.speaker, cls.event, "Workshop {}".format(index), spots=10
+            )
+            talk.talkformat.add(cls.workshop_format)
+            cls.talks.append(talk)
+
+    def reserve(self):
+        SessionReservation.objects.create(
+            attendee=self.attendee, talk=self.talks[0], is_confirmed=True
+        )
+
+    def test_find_attendee_by_checkin_code(self):
+        self.reserve()
+        # attendee, reservations and talk formats
+        with self.assertNumQueries(3):
+            attendee = checkin.find_attendee(self.attendee.checkin_code, self.event)
+        self.assertEqual(attendee, self.attendee)
+
+    def test_find_attendee_by_email(self):
+        self.reserve()
+        # checkin code, email, reservations and talk formats
+        with self.assertNumQueries(4):
+            attendee = checkin.find_attendee("test@example.org", self.event)
+        self.assertEqual(attendee, self.attendee)
+
+    def test_find_attendee_unknown(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(checkin.find_attendee("1234567", self.event))
+        other_event = event_testutils.create_test_event("Other")
+        self.assertIsNone(checkin.find_attendee("test@example.org", other_event))
+
+    def test_get_attendee(self):
+        self.assertEqual(checkin.get_attendee(self.attendee.id), self.attendee)
+        self.assertIsNone(checkin.get_attendee(self.attendee.id + 1000))
+
+    def test_related_data_loaded(self):
+        for talk in self.talks:
+            SessionReservation.objects.create(
+                attendee=self.attendee, talk=talk, is_confirmed=talk != self.talks[1]
+            )
+        attendee = checkin.get_attendee(self.attendee.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(attendee.user.email, "test@example.org")
+            self.assertEqual(attendee.event.title, self.event.title)
+            self.assertFalse(attendee.is_speaker)
+            self.assertEqual(
+                [
+                    (r.talk.title, [f.name for f in r.talk.talkformat.all()])
+                    for r in attendee.confirmed_reservations
+                ],
+                [("Workshop 0", ["Workshop"]), ("Workshop 2", ["Workshop"])],
+            )
+
+    def test_is_speaker(self):
+        speaker, user, _ = speaker_testutils.create_test_speaker(
+            "speaker-attendee@example.org"
+        )
+        attendee = Attendee.objects.create(user=user, event=self.event)
+        talk = talk_testutils.create_test_talk(speaker, self.event, "Keynote")
+        self.assertFalse(checkin.get_attendee(attendee.id).is_speaker)
+        talk.publish(Track.objects.create(name="Keynotes", event=self.event))
+        self.assertTrue(checkin.get_attendee(attendee.id).is_speaker)
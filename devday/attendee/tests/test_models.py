@@ -14,6 +14,7 @@ from attendee.tests import attendee_testutils
 from event.models import Event
 from event.tests import event_testutils
 from event.tests.event_testutils import create_test_event
+from outbox.mail import send_queued_mail
 
 ADMIN_EMAIL = "admin@example.org"
 ADMIN_PASSWORD = "sUp3rS3cr3t"
@@ -86,6 +87,7 @@ class DevDayUserTest(TestCase):
     def test_email_user(self):
         user = DevDayUser.objects.create_user(USER_EMAIL, USER_PASSWORD)
         user.email_user("Test mail", "Test mail body")
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         email = mail.outbox[0]
         self.assertIn(USER_EMAIL, email.recipients())
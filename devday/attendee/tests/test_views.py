@@ -6,8 +6,10 @@ from bs4 import BeautifulSoup
 
 from django.core import mail
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection
 from django.http import HttpRequest
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -22,7 +24,8 @@ from attendee.tests import attendee_testutils
 from attendee.views import AttendeeRegistrationView, DevDayUserRegistrationView
 from event.models import Event
 from event.tests import event_testutils
-from speaker.models import PublishedSpeaker
+from outbox.mail import send_queued_mail
+from speaker.models import PublishedSpeaker, Speaker
 from speaker.tests import speaker_testutils
 from talk.models import SessionReservation, Talk, TalkFormat, Track
 from talk.tests import talk_testutils
@@ -154,6 +157,7 @@ class AttendeeRegistrationViewTest(TestCase):
         self.assertIsNone(user.contact_permission_date)
         self.assertFalse(user.is_active)
         self.assertFalse(user.attendees.exists())
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
 
     def test_register_permit_contact(self):
@@ -175,6 +179,7 @@ class AttendeeRegistrationViewTest(TestCase):
         self.assertLessEqual(user.contact_permission_date, now)
         self.assertFalse(user.is_active)
         self.assertFalse(user.attendees.exists())
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
 
     def test_get_anonymous(self):
@@ -204,6 +209,7 @@ class AttendeeRegistrationViewTest(TestCase):
         self.assertRedirects(response, self.register_existing_url)
         attendee = Attendee.objects.filter(user=user, event=self.event).first()
         self.assertIsNone(attendee)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         activation_mail = mail.outbox[0]
         self.assertIn(user.email, activation_mail.to)
@@ -447,6 +453,7 @@ class DevDayRegistrationViewTest(TestCase):
         response = self.client.post(self.url, data=data, follow=False)
         self.assertRedirects(response, "/accounts/register/complete/")
         # check for next URL in activation mail
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         activation_mail = mail.outbox[0]
         self.assertIn("?next={}".format(next_url), activation_mail.body)
@@ -493,6 +500,7 @@ class DevDayRegistrationViewTest(TestCase):
         self.assertFalse(user.is_active)
         attendees = user.attendees
         self.assertEqual(attendees.count(), 0)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
 
     def test_register_permit_contact(self):
@@ -868,17 +876,32 @@ class CSVViewTest(TestCase):
         self.login()
         r = self.get_staff("admin_csv_attendees")
         self.assertIn(
-            self.user.email, r.content.decode(), "user should be listed in attendees"
+            self.user.email, r.getvalue().decode(), "user should be listed in attendees"
         )
 
         self.attendee.delete()
         r = self.get_staff("admin_csv_attendees")
         self.assertNotIn(
             self.user.email,
-            r.content.decode(),
+            r.getvalue().decode(),
             "user should not be listed in attendees",
         )
 
+    def test_get_attendees_streamed(self):
+        self.user.contact_permission_date = self.user.date_joined
+        self.user.save()
+        r = self.get_staff("admin_csv_attendees")
+        self.assertTrue(r.streaming, "export should be streamed")
+        self.assertEqual(r["Content-Disposition"], "attachment; filename=attendees.csv")
+        date_joined = self.user.date_joined.strftime("%Y-%m-%d %H:%M:%S")
+        self.assertEqual(
+            r.getvalue().decode().splitlines(),
+            [
+                "Email;Date joined;Contact permission date",
+                "{};{};{}".format(self.user.email, date_joined, date_joined),
+            ],
+        )
+
     def test_get_inactive_anonymous(self):
         self.get_anonymous("admin_csv_inactive")
 
@@ -889,14 +912,16 @@ class CSVViewTest(TestCase):
         self.user.save()
         r = self.get_staff("admin_csv_inactive")
         self.assertNotIn(
-            self.user.email, r.content.decode(), "user should not be listed in inactive"
+            self.user.email,
+            r.getvalue().decode(),
+            "user should not be listed in inactive",
         )
 
         self.user.is_active = False
         self.user.save()
         r = self.get_staff("admin_csv_inactive")
         self.assertIn(
-            self.user.email, r.content.decode(), "user should be listed in inactive"
+            self.user.email, r.getvalue().decode(), "user should be listed in inactive"
         )
 
     def test_get_maycontact_anonymous(self):
@@ -909,14 +934,18 @@ class CSVViewTest(TestCase):
         self.user.save()
         r = self.get_staff("admin_csv_maycontact")
         self.assertIn(
-            self.user.email, r.content.decode(), "user should be listed in maycontact"
+            self.user.email,
+            r.getvalue().decode(),
+            "user should be listed in maycontact",
         )
 
         self.user.contact_permission_date = None
         self.user.save()
         r = self.get_staff("admin_csv_maycontact")
         self.assertIn(
-            self.user.email, r.content.decode(), "user should be listed in maycontact"
+            self.user.email,
+            r.getvalue().decode(),
+            "user should be listed in maycontact",
         )
 
         self.user.contact_permission_date = timezone.now()
@@ -924,7 +953,9 @@ class CSVViewTest(TestCase):
         self.user.save()
         r = self.get_staff("admin_csv_maycontact")
         self.assertIn(
-            self.user.email, r.content.decode(), "user should be listed in maycontact"
+            self.user.email,
+            r.getvalue().decode(),
+            "user should be listed in maycontact",
         )
 
         self.user.contact_permission_date = None
@@ -932,7 +963,7 @@ class CSVViewTest(TestCase):
         r = self.get_staff("admin_csv_maycontact")
         self.assertNotIn(
             self.user.email,
-            r.content.decode(),
+            r.getvalue().decode(),
             "user should not be listed in maycontact",
         )
 
@@ -1624,3 +1655,77 @@ class CheckInAttendeeSummaryViewTest(TestCase):
         self.assertTrue(hasattr(limited_sessions[1], "attendees_checked_in"))
         self.assertEqual(limited_sessions[1].attendees_registered, 2)
         self.assertEqual(limited_sessions[1].attendees_checked_in, 1)
+
+    def create_limited_session_with_reservations(self):
+        speaker, _, _ = speaker_testutils.create_test_speaker()
+        talk = Talk.objects.create(
+            draft_speaker=speaker,
+            title="Limited Talk",
+            spots=10,
+            abstract="Limited to 10",
+            event=self.event,
+        )
+        attendees = []
+        for i in range(4):
+            user, _ = attendee_testutils.create_test_user(
+                email="test{}@example.org".format(i)
+            )
+            attendees.append(Attendee.objects.create(event=self.event, user=user))
+        for attendee in attendees[:3]:
+            SessionReservation.objects.create(
+                attendee=attendee, talk=talk, is_confirmed=attendee != attendees[2]
+            )
+        for attendee in attendees[1:3]:
+            attendee.check_in()
+            attendee.save()
+        return talk
+
+    def test_summary_query_count(self):
+        self.create_limited_session_with_reservations()
+        self.client.login(username=self.user.get_username(), password=self.password)
+        # the first request creates the cms toolbar placeholders
+        self.client.get(self.url)
+        summary_queries = CaptureQueriesContext(connection)
+        with summary_queries:
+            self.client.get(self.url)
+        Talk.objects.create(
+            draft_speaker=Speaker.objects.first(),
+            title="Other Limited Talk",
+            spots=5,
+            abstract="Limited to 5",
+            event=self.event,
+        )
+        with self.assertNumQueries(len(summary_queries)):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context["limited_sessions"]), 2)
+
+    def test_json_needs_staff(self):
+        url = "/{}/checkin-summary/json/".format(self.event.slug)
+        response = self.client.get(url)
+        self.assertRedirects(response, "/accounts/login/?next={}".format(url))
+        user, password = attendee_testutils.create_test_user()
+        self.client.login(username=user.get_username(), password=password)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_json(self):
+        talk = self.create_limited_session_with_reservations()
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.get("/{}/checkin-summary/json/".format(self.event.slug))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            {
+                "attendees_registered": 4,
+                "attendees_checked_in": 2,
+                "limited_sessions": [
+                    {
+                        "id": talk.id,
+                        "title": "Limited Talk",
+                        "spots": 10,
+                        "attendees_registered": 2,
+                        "attendees_checked_in": 1,
+                    }
+                ],
+            },
+        )
@@ -11,6 +11,7 @@ from attendee.views import (
     AttendeeRegistrationView,
     AttendeeToggleRaffleView,
     CheckInAttendeeQRView,
+    CheckInAttendeeSummaryJsonView,
     CheckInAttendeeSummaryView,
     CheckInAttendeeUrlView,
     CheckInAttendeeView,
@@ -118,6 +119,11 @@ urlpatterns = [
         CheckInAttendeeSummaryView.as_view(),
         name="attendee_checkin_summary",
     ),
+    url(
+        r"^(?P<event>[^/]+)/checkin-summary/json/$",
+        CheckInAttendeeSummaryJsonView.as_view(),
+        name="attendee_checkin_summary_json",
+    ),
     url(r"^(?P<event>[^/]+)/raffle/$", RaffleView.as_view(), name="raffle"),
     url(
         r"^(?P<event>[^/]+)/feedback-summary/$",
@@ -1,6 +1,3 @@
-import csv
-from io import StringIO
-
 from django.conf import settings
 from django.contrib.auth import get_user_model, logout
 from django.contrib.auth.mixins import (
@@ -13,17 +10,18 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.core import signing
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import IntegrityError
-from django.db.models import Avg, Count, Prefetch, Q
+from django.db.models import Avg, Count, F, Prefetch, Q
 from django.db.transaction import atomic
-from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
+from django.http import HttpResponseRedirect, JsonResponse
 from django.shortcuts import get_object_or_404, redirect
 from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils.encoding import force_text
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import DeleteView, DetailView, TemplateView, UpdateView, View
+from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.edit import CreateView, FormView, ModelFormMixin
-from django.views.generic.list import BaseListView, ListView
+from django.views.generic.list import ListView
 from django_registration import signals
 from django_registration.backends.activation.views import (
     ActivationView,
@@ -31,6 +29,8 @@ from django_registration.backends.activation.views import (
 )
 from django_registration.exceptions import ActivationError
 
+from attendee import checkin
+from attendee.capabilities import get_capabilities
 from attendee.forms import (
     AttendeeEventFeedbackForm,
     AttendeeProfileForm,
@@ -42,8 +42,10 @@ from attendee.forms import (
     RegistrationAuthenticationForm,
 )
 from attendee.signals import attendence_cancelled
+from devday.utils.csv_export import StreamingCSVExportView, format_datetime
 from event.models import Event
 from talk.models import Attendee, SessionReservation, Talk
+from talk.reservation import annotate_waiting_positions
 
 from .models import AttendeeEventFeedback, BadgeData, DevDayUser
 
@@ -106,9 +108,7 @@ class AttendeeRequiredMixin(AccessMixin):
         self.event = get_object_or_404(
             Event, slug=kwargs[self.event_slug_url_kwarg], published=True
         )
-        self.attendee = Attendee.objects.filter(
-            event=self.event, user=request.user
-        ).first()
+        self.attendee = get_capabilities(request).attendee(self.event)
         if self.attendee is None:
             if self.event.registration_open:
                 return redirect("attendee_registration", event=self.event.slug)
@@ -150,6 +150,13 @@ class DevDayUserProfileView(LoginRequiredMixin, AttendeeQRCodeMixIn, UpdateView)
             )
             .order_by("event__start_time")
         )
+        annotate_waiting_positions(
+            [
+                reservation
+                for attendee in attendees
+                for reservation in attendee.reservations
+            ]
+        )
         context["attendees"] = attendees
         context["current_event"] = Event.objects.current_event()
         self.attendee_qrcode_context(context)
@@ -177,7 +184,10 @@ class AttendeeRegistrationView(RegistrationView):
 
         if user.is_anonymous:
             self.auth_level = "anonymous"
-        elif user.get_attendee(event=self.event) and not self.event.online_event:
+        elif (
+            get_capabilities(self.request).is_attendee(self.event)
+            and not self.event.online_event
+        ):
             return redirect(
                 reverse_lazy("edit_badge_data", kwargs={"event": self.event.slug})
             )
@@ -384,10 +394,11 @@ class AttendeeConfirmationView(LoginRequiredMixin, ActivationView):
 class AttendeeCancelView(AttendeeRequiredMixin, View):
     def get(self, request, *args, **kwargs):
         # remove attendee for user, event tuple
-        attendence_cancelled.send(
-            self.__class__, attendee=self.attendee, request=request
-        )
-        self.attendee.delete()
+        with atomic():
+            attendence_cancelled.send(
+                self.__class__, attendee=self.attendee, request=request
+            )
+            self.attendee.delete()
         return HttpResponseRedirect(reverse("user_profile"))
 
 
@@ -511,34 +522,25 @@ class StaffUserMixin(UserPassesTestMixin):
         return self.request.user.is_staff
 
 
-class InactiveAttendeeView(StaffUserMixin, BaseListView):
+class InactiveAttendeeView(StaffUserMixin, StreamingCSVExportView):
     model = User
+    filename = "inactive.csv"
+    header = ("Email", "Date joined")
+    fields = ("email", "date_joined")
 
     def get_queryset(self):
         return super().get_queryset().filter(is_active=False).order_by("email")
 
-    def render_to_response(self, context):
-        output = StringIO()
-        try:
-            writer = csv.writer(output, delimiter=";")
-            writer.writerow(("Email", "Date joined"))
-            writer.writerows(
-                [
-                    (u.email, u.date_joined.strftime("%Y-%m-%d %H:%M:%S"))
-                    for u in context.get("object_list", [])
-                ]
-            )
-            response = HttpResponse(
-                output.getvalue(), content_type="txt/csv; charset=utf-8"
-            )
-            response["Content-Disposition"] = "attachment; filename=inactive.csv"
-            return response
-        finally:
-            output.close()
+    def format_row(self, row):
+        email, date_joined = row
+        return email, format_datetime(date_joined)
 
 
-class ContactableAttendeeView(StaffUserMixin, BaseListView):
+class ContactableAttendeeView(StaffUserMixin, StreamingCSVExportView):
     model = User
+    filename = "contactable.csv"
+    header = ("Email",)
+    fields = ("email",)
 
     def get_queryset(self):
         qs = (
@@ -553,23 +555,12 @@ class ContactableAttendeeView(StaffUserMixin, BaseListView):
         )
         return qs
 
-    def render_to_response(self, context):
-        output = StringIO()
-        try:
-            writer = csv.writer(output, delimiter=";")
-            writer.writerow(("Email",))
-            writer.writerows([(u.email,) for u in context.get("object_list", [])])
-            response = HttpResponse(
-                output.getvalue(), content_type="txt/csv; charset=utf-8"
-            )
-            response["Content-Disposition"] = "attachment; filename=contactable.csv"
-            return response
-        finally:
-            output.close()
-
 
-class AttendeeListView(StaffUserMixin, BaseListView):
+class AttendeeListView(StaffUserMixin, StreamingCSVExportView):
     model = Attendee
+    filename = "attendees.csv"
+    header = ("Email", "Date joined", "Contact permission date")
+    fields = ("user__email", "user__date_joined", "user__contact_permission_date")
 
     def get_queryset(self):
         return (
@@ -579,34 +570,13 @@ class AttendeeListView(StaffUserMixin, BaseListView):
             .order_by("user__email")
         )
 
-    def render_to_response(self, context):
-        output = StringIO()
-        try:
-            writer = csv.writer(output, delimiter=";")
-            writer.writerow(("Email", "Date joined", "Contact permission date"))
-            writer.writerows(
-                [
-                    (
-                        attendee.user.email,
-                        attendee.user.date_joined.strftime("%Y-%m-%d %H:%M:%S"),
-                        (
-                            attendee.user.contact_permission_date.strftime(
-                                "%Y-%m-%d %H:%M:%S"
-                            )
-                            if attendee.user.contact_permission_date
-                            else ""
-                        ),
-                    )
-                    for attendee in context.get("object_list", [])
-                ]
-            )
-            response = HttpResponse(
-                output.getvalue(), content_type="txt/csv; charset=utf-8"
-            )
-            response["Content-Disposition"] = "attachment; filename=attendees.csv"
-            return response
-        finally:
-            output.close()
+    def format_row(self, row):
+        email, date_joined, contact_permission_date = row
+        return (
+            email,
+            format_datetime(date_joined),
+            format_datetime(contact_permission_date),
+        )
 
 
 class DevDayUserDeleteView(LoginRequiredMixin, DeleteView):
@@ -634,13 +604,18 @@ class DevDayUserDeleteView(LoginRequiredMixin, DeleteView):
 
 
 def get_reservation_list(attendee):
+    """
+    Render the confirmed reservations of an attendee loaded by
+    :py:func:`attendee.checkin.get_checkin_queryset`.
+    """
     msg = ""
-    reservations = attendee.sessionreservation_set.filter(is_confirmed=True)
+    reservations = attendee.confirmed_reservations
     if len(reservations) > 0:
         msg += "<h4>{}</h4><ul>".format(_("Attendee has confirmed place for"))
         for res in reservations:
+            talk_formats = res.talk.talkformat.all()
             msg += "<li>{} <b>{}</b></li>".format(
-                res.talk.talkformat.first().name, res.talk.title
+                talk_formats[0].name if talk_formats else "", res.talk.title
             )
         msg += "</ul>"
     else:
@@ -653,19 +628,23 @@ class CheckInAttendeeView(StaffUserMixin, SuccessMessageMixin, FormView):
     form_class = CheckInAttendeeForm
     success_message = _("<b>{email}</b> has been checked in successfully to {event}!")
 
+    def get_event(self):
+        if not hasattr(self, "event"):
+            self.event = get_object_or_404(Event, slug=self.kwargs.get("event"))
+        return self.event
+
     def get_form_kwargs(self):
         context = super(CheckInAttendeeView, self).get_form_kwargs()
-        context["event"] = Event.objects.get(slug=self.kwargs.get("event"))
+        context["event"] = self.get_event()
         return context
 
     def form_valid(self, form):
         attendee = form.cleaned_data["attendee"]
         attendee.check_in()
-        attendee.save()
+        attendee.save(update_fields=["checked_in"])
         context = self.get_form_kwargs()
         context["form"] = form
-        event = Event.objects.get(slug=self.kwargs.get("event"))
-        context["is_speaker"] = is_speaker(attendee, event)
+        context["is_speaker"] = attendee.is_speaker
         context["checkin_message"] = self.get_success_message(form.cleaned_data)
         context["checkin_reservations"] = get_reservation_list(attendee)
         return self.render_to_response(context)
@@ -679,9 +658,7 @@ class CheckInAttendeeView(StaffUserMixin, SuccessMessageMixin, FormView):
                 for e in form.errors.as_data()["attendee"]
                 if e.code == "checked_in"
             ][0]
-            attendee = error_data["attendee"]
-            event = Event.objects.get(slug=self.kwargs.get("event"))
-            context["is_speaker"] = is_speaker(attendee, event)
+            context["is_speaker"] = error_data["attendee"].is_speaker
         return self.render_to_response(context)
 
     def get_success_message(self, cleaned_data):
@@ -701,19 +678,12 @@ class CheckInAttendeeQRView(LoginRequiredMixin, AttendeeQRCodeMixIn, TemplateVie
         return context
 
 
-def is_speaker(attendee, event):
-    try:
-        return attendee.user.speaker.publishedspeaker_set.filter(event=event).exists()
-    except ObjectDoesNotExist:
-        return False
-
-
 class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
     template_name = "attendee/checkin_result.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event = Event.objects.get(slug=self.kwargs.get("event"))
+        event = get_object_or_404(Event, slug=self.kwargs.get("event"))
         context["event"] = event
 
         attendee_id = self.kwargs["id"]
@@ -727,9 +697,8 @@ class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
                 }
             )
             return context
-        try:
-            attendee = Attendee.objects.get(id=attendee_id)
-        except ObjectDoesNotExist:
+        attendee = checkin.get_attendee(attendee_id)
+        if attendee is None:
             context.update(
                 {
                     "checkin_code": "notfound",
@@ -738,7 +707,7 @@ class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
                 }
             )
             return context
-        if attendee.event != context["event"]:
+        if attendee.event_id != event.id:
             context.update(
                 {
                     "checkin_code": "wrongevent",
@@ -749,7 +718,7 @@ class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
             return context
         try:
             attendee.check_in()
-            attendee.save()
+            attendee.save(update_fields=["checked_in"])
         except IntegrityError:
             context.update(
                 {
@@ -760,7 +729,7 @@ class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
                     ).format(
                         attendee.user, attendee.checked_in.strftime("%H:%M %d.%m.%y")
                     ),
-                    "is_speaker": is_speaker(attendee, event),
+                    "is_speaker": attendee.is_speaker,
                     "checkin_reservations": get_reservation_list(attendee),
                 }
             )
@@ -773,40 +742,75 @@ class CheckInAttendeeUrlView(StaffUserMixin, TemplateView):
                     "Attendee <b>{}</b> was successfully checked in."
                 ).format(attendee.user),
                 "checkin_reservations": get_reservation_list(attendee),
-                "is_speaker": is_speaker(attendee, event),
+                "is_speaker": attendee.is_speaker,
             }
         )
         return context
 
 
-class CheckInAttendeeSummaryView(StaffUserMixin, DetailView):
+class CheckInSummaryMixin(object):
+    """
+    Compute the check-in numbers of an event with conditional aggregation in
+    two queries, one for the attendees of the event and one for the sessions
+    with limited spots.
+    """
+
+    def get_checkin_summary(self, event):
+        summary = Attendee.objects.filter(event=event).aggregate(
+            attendees_registered=Count("id"),
+            attendees_checked_in=Count("id", filter=Q(checked_in__isnull=False)),
+        )
+        summary["limited_sessions"] = list(
+            Talk.objects.filter(event=event, spots__gt=0).annotate(
+                attendees_registered=F("confirmed_count"),
+                attendees_checked_in=Count(
+                    "sessionreservation",
+                    filter=Q(
+                        sessionreservation__is_confirmed=True,
+                        sessionreservation__attendee__checked_in__isnull=False,
+                    ),
+                ),
+            )
+        )
+        return summary
+
+
+class CheckInAttendeeSummaryView(StaffUserMixin, CheckInSummaryMixin, DetailView):
     model = Event
     template_name_suffix = "attendee_checkin_summary"
     slug_url_kwarg = "event"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        event = context["event"]
-        attendees_for_event = Attendee.objects.filter(event=event)
-        context["attendees_registered"] = attendees_for_event.count()
-        context["attendees_checked_in"] = attendees_for_event.filter(
-            checked_in__isnull=False
-        ).count()
-        limited_sessions = Talk.objects.filter(event=event, spots__gt=0)
-        for talk in limited_sessions:
-            talk_reservations = SessionReservation.objects.filter(
-                is_confirmed=True, talk=talk
-            )
-            setattr(talk, "attendees_registered", talk_reservations.count())
-            setattr(
-                talk,
-                "attendees_checked_in",
-                talk_reservations.filter(attendee__checked_in__isnull=False).count(),
-            )
-        context["limited_sessions"] = limited_sessions
+        context.update(self.get_checkin_summary(context["event"]))
         return context
 
 
+class CheckInAttendeeSummaryJsonView(
+    StaffUserMixin, CheckInSummaryMixin, SingleObjectMixin, View
+):
+    """
+    Check-in numbers of an event as JSON for the check-in desk to poll.
+    """
+
+    model = Event
+    slug_url_kwarg = "event"
+
+    def get(self, request, *args, **kwargs):
+        summary = self.get_checkin_summary(self.get_object())
+        summary["limited_sessions"] = [
+            {
+                "id": talk.id,
+                "title": talk.title,
+                "spots": talk.spots,
+                "attendees_registered": talk.attendees_registered,
+                "attendees_checked_in": talk.attendees_checked_in,
+            }
+            for talk in summary["limited_sessions"]
+        ]
+        return JsonResponse(summary)
+
+
 class AttendeeEventFeedbackView(AttendeeRequiredMixin, ModelFormMixin, FormView):
     form_class = AttendeeEventFeedbackForm
     slug_url_kwarg = "event"
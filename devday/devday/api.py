@@ -0,0 +1,128 @@
+"""
+Building blocks shared by the REST API viewsets of the apps.
+
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.pagination import CursorPagination
+
+from devday.models import ApiVersion
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by the primary key, which is unique and never
+    changes, so clients polling the API neither miss nor repeat entries when
+    entries are added between requests.
+    """
+
+    ordering = "id"
+    page_size_query_param = "page_size"
+
+    def __init__(self):
+        self.page_size = settings.API_PAGE_SIZE
+        self.max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class EventFilterMixin:
+    """
+    Filter the queryset of a viewset by the slug of an event given in the
+    ``event`` query parameter. ``event_filter`` is the lookup of the event
+    slug.
+    """
+
+    event_filter = "event__slug"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        event = self.request.query_params.get("event")
+        if event:
+            queryset = queryset.filter(**{self.event_filter: event})
+        return queryset
+
+
+def get_api_versions(*names):
+    """
+    Return a dictionary of the version tokens and modification timestamps of
+    the API collections ``names``. The versions are read from the database,
+    so all web server processes agree on them, and are created on first use.
+    """
+    versions = {
+        name: (token.hex, modified.timestamp())
+        for name, token, modified in ApiVersion.objects.filter(
+            name__in=names
+        ).values_list("name", "token", "modified")
+    }
+    for name in names:
+        if name not in versions:
+            version, _ = ApiVersion.objects.get_or_create(name=name)
+            versions[name] = (version.token.hex, version.modified.timestamp())
+    return versions
+
+
+def get_api_version(name):
+    """
+    Return the version token and the modification timestamp of the API
+    collection ``name``, see :py:func:`get_api_versions`.
+    """
+    return get_api_versions(name)[name]
+
+
+def invalidate_api_versions(*names):
+    """
+    Replace the versions of the API collections ``names``. Collections that
+    have no version yet get a new one on first use anyway.
+    """
+    ApiVersion.objects.filter(name__in=names).update(
+        token=uuid.uuid4(), modified=timezone.now()
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and detail requests with ``ETag`` and ``Last-Modified``
+    headers derived from the version of the API collection ``api_version``.
+
+    Requests with a matching ``If-None-Match`` or ``If-Modified-Since`` header
+    get a 304 response before the queryset is evaluated. The version has to be
+    replaced by :py:func:`invalidate_api_versions` whenever data that is part
+    of the collection's representation changes.
+    """
+
+    api_version = None
+
+    def get_etag(self, request, token):
+        # the representation depends on the query parameters and the
+        # renderer, the browsable API shows the user name
+        parts = [
+            token,
+            request.get_full_path(),
+            request.accepted_media_type or "",
+            str(request.user.pk),
+        ]
+        return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        token, modified = get_api_version(self.api_version)
+        etag = quote_etag(self.get_etag(request, token))
+        last_modified = int(modified)
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
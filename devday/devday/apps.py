@@ -25,6 +25,14 @@ class DevDayApp(AppConfig):
         super().__init__(app_name, app_module)
 
     def ready(self):
+        # noinspection PyUnresolvedReferences
+        # This import is needed for signal handling
+        import devday.authentication
+
+        # noinspection PyUnresolvedReferences
+        # This import is needed for menu cache invalidation
+        import devday.cms_menus
+
         if "VAULT_URL" in os.environ and not self.job_scheduled:
             from .vault_integration import update_token_scheduler
             update_token_scheduler()
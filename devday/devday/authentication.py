@@ -0,0 +1,101 @@
+"""
+REST API authentication classes that cache successful credential checks.
+
+:py:class:`CachedBasicAuthentication` avoids running the password hasher on
+every request. A successful check is stored in the Django cache under a keyed
+hash of the credentials together with the password hash of the user. A cache
+hit still loads the user, so deactivating the user or changing the password
+takes effect immediately.
+
+:py:class:`CachedTokenAuthentication` keeps the users of recently used tokens
+in process memory. Deleting a token or saving or deleting a user drops the
+affected entries of the current process, other processes notice after at most
+``API_AUTH_CACHE_TIMEOUT`` seconds.
+
+"""
+import copy
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework.authentication import BasicAuthentication, TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+BASIC_AUTH_KEY = "api:auth:basic:{}"
+
+# maximum number of tokens cached per process
+MAX_CACHED_TOKENS = 1000
+
+_tokens = {}
+
+
+class CachedBasicAuthentication(BasicAuthentication):
+    def authenticate_credentials(self, userid, password, request=None):
+        timeout = settings.API_AUTH_CACHE_TIMEOUT
+        if timeout <= 0:
+            return super().authenticate_credentials(userid, password, request)
+
+        credentials = salted_hmac(
+            "devday.authentication.basic", "{}:{}".format(userid, password)
+        )
+        key = BASIC_AUTH_KEY.format(credentials.hexdigest())
+        cached = cache.get(key)
+        if cached is not None:
+            user_id, password_hash = cached
+            user = get_user_model()._default_manager.filter(pk=user_id).first()
+            if (
+                user is not None
+                and user.is_active
+                and constant_time_compare(user.password, password_hash)
+            ):
+                return user, None
+            cache.delete(key)
+
+        user, auth = super().authenticate_credentials(userid, password, request)
+        cache.set(key, (user.pk, user.password), timeout)
+        return user, auth
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        timeout = settings.API_AUTH_CACHE_TIMEOUT
+        if timeout <= 0:
+            return super().authenticate_credentials(key)
+
+        now = time.monotonic()
+        cached = _tokens.get(key)
+        if cached is not None and cached[2] > now:
+            # the instances must not be shared between requests, a shallow
+            # copy would share the related object and permission caches
+            return copy.deepcopy((cached[0], cached[1]))
+
+        user, token = super().authenticate_credentials(key)
+        if len(_tokens) >= MAX_CACHED_TOKENS:
+            _tokens.clear()
+        _tokens[key] = (user, token, now + timeout)
+        return copy.deepcopy((user, token))
+
+
+def forget_tokens_of_user(user_id):
+    for key, (user, _token, _expires) in list(_tokens.items()):
+        if user.pk == user_id:
+            _tokens.pop(key, None)
+
+
+@receiver(post_delete, sender=Token, dispatch_uid="api_auth_token_deleted")
+def forget_deleted_token(sender, instance, **kwargs):
+    _tokens.pop(instance.key, None)
+
+
+@receiver(
+    post_save, sender=settings.AUTH_USER_MODEL, dispatch_uid="api_auth_user_saved"
+)
+@receiver(
+    post_delete, sender=settings.AUTH_USER_MODEL, dispatch_uid="api_auth_user_deleted"
+)
+def forget_tokens_of_changed_user(sender, instance, **kwargs):
+    forget_tokens_of_user(instance.pk)
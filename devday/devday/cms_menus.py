@@ -1,15 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from attendee.capabilities import get_capabilities
 from event.models import Event
 from menus.base import Menu, Modifier, NavigationNode
 from menus.menu_pool import menu_pool
-from talk import COMMITTEE_GROUP
 
 CAN_CHECK_IN = "can_check_in"
 CHILDREN = "children"
 EVENT = "event"
+EVENT_PUBLISHED = "event_published"
 IS_SPEAKER = "is_speaker"
 IS_COMMITTEE_MEMBER = "is_committee_member"
 SUBMISSION_OPEN = "submission_open"
@@ -73,7 +77,15 @@ class DevDayMenu(Menu):
         )
         for e in events.order_by("start_time"):
             archive.children.append(
-                NavigationNode(e.title, e.get_absolute_url(), e.id, attr={EVENT: True})
+                NavigationNode(
+                    e.title,
+                    e.get_absolute_url(),
+                    e.id,
+                    attr={
+                        EVENT: True,
+                        EVENT_PUBLISHED: e.published and e.sessions_published,
+                    },
+                )
             )
         entries.append(archive)
 
@@ -138,34 +150,22 @@ class DevDayModifier(Modifier):
             event
             and event.published
             and event.registration_open
-            and (
-                not request.user.is_authenticated
-                or request.user.get_attendee(event) is None
-            )
+            and not get_capabilities(request).is_attendee(event)
         )
 
     def user_can_check_in(self, request, event):
         return (
-            request.user.is_authenticated
-            and event.published
+            event.published
             and not event.online_event
-            and request.user.get_attendee(event) is not None
-        )
-
-    def user_is_committee_member(self, request):
-        return (
-            request.user.is_authenticated
-            and request.user.groups.filter(name=COMMITTEE_GROUP).exists()
+            and get_capabilities(request).is_attendee(event)
         )
 
     def prune_nodes_with_events(self, nodes, request):
+        if get_capabilities(request).is_staff:
+            return
         for node in nodes[:]:
-            if EVENT in node.attr:
-                e = Event.objects.get(id=node.id)
-                if not request.user.is_staff and (
-                    not e.published or not e.sessions_published
-                ):
-                    nodes.remove(node)
+            if EVENT in node.attr and not node.attr.get(EVENT_PUBLISHED):
+                nodes.remove(node)
 
     def prune_nodes(self, nodes, attr, fn):
         affected_nodes = list(filter(lambda n: attr in n.attr, nodes))
@@ -179,9 +179,10 @@ class DevDayModifier(Modifier):
         self.prune_nodes(
             nodes, CAN_CHECK_IN, lambda: self.user_can_check_in(request, event)
         )
-        self.prune_nodes(nodes, IS_SPEAKER, lambda: hasattr(request.user, "speaker"))
+        capabilities = get_capabilities(request)
+        self.prune_nodes(nodes, IS_SPEAKER, lambda: capabilities.is_speaker)
         self.prune_nodes(
-            nodes, IS_COMMITTEE_MEMBER, lambda: self.user_is_committee_member(request)
+            nodes, IS_COMMITTEE_MEMBER, lambda: capabilities.is_committee_member
         )
         self.prune_nodes(
             nodes, USER_CAN_REGISTER, lambda: self.user_can_register(request, event)
@@ -215,3 +216,19 @@ class DevDayModifier(Modifier):
                     others.append(n)
             nodes = others + ours
         return nodes
+
+
+def _clear_menu_cache():
+    menu_pool.clear(all=True)
+
+
+@receiver(post_save, sender=Event, dispatch_uid="cms_menus_event_saved")
+@receiver(post_delete, sender=Event, dispatch_uid="cms_menus_event_deleted")
+def clear_menu_cache_on_event_change(sender, instance, **kwargs):
+    """
+    The nodes built by :py:class:`DevDayMenu` are kept in the menu cache of
+    Django CMS and depend on the current and the past events.
+    """
+    _clear_menu_cache()
+    # concurrent requests may have cached nodes before the commit
+    transaction.on_commit(_clear_menu_cache)
@@ -1,13 +1,44 @@
 import hashlib
+import os
+import re
+
 import magic
 
 from django.db.models import ImageField
 from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
 
+# base names of files that are named by the SHA-224 hash of their content, see
+# ValidatedImageField.name_image_by_contents and ContentAddressedStorage
+CONTENT_HASH_NAME_RE = re.compile(r'^([0-9a-f]{56})(\.\w+)$')
+
+
+def get_content_hash_from_name(name):
+    """
+    Return the content hash carried by the base name of ``name`` or None if
+    the file is not named by its content.
+    """
+    match = CONTENT_HASH_NAME_RE.match(os.path.basename(name))
+    return match.group(1) if match else None
+
 
-class ValidatedImageField(ImageField):
+class StoredDimensionsImageField(ImageField):
+    """
+    Extends Djangos ImageField to only update the width and height fields when
+    a file is assigned. Djangos ImageField reads the image from the storage
+    whenever an instance with empty dimension fields is loaded.
+    """
+
+    def update_dimension_fields(self, instance, force=False, *args, **kwargs):
+        if force:
+            super().update_dimension_fields(instance, force, *args, **kwargs)
+
+
+class ValidatedImageField(StoredDimensionsImageField):
     """
     Extends Djangos ImageField by validating the uploaded file, setting the
     filename based on a hash of the file, and setting the extension based on
@@ -43,6 +74,67 @@ class ValidatedImageField(ImageField):
         return data
 
 
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores files below ``prefix`` named by the SHA-224 hash of their content.
+    Saving content that is stored already returns the name of the existing
+    file without writing it again, so model instances with identical images
+    share one file. Names that have been set by
+    :py:meth:`ValidatedImageField.name_image_by_contents` are trusted instead
+    of hashing the content again.
+
+    As files may be shared :py:meth:`delete` keeps them,
+    :py:meth:`delete_unreferenced` removes a file for good. Saving content
+    that is stored already updates the modification time of the file, so that
+    a garbage collection that skips recently modified files does not remove a
+    file that has just got a new reference.
+    """
+
+    def __init__(self, prefix='content', **kwargs):
+        self.prefix = prefix
+        super().__init__(**kwargs)
+
+    def get_content_hash(self, name, content):
+        content_hash = get_content_hash_from_name(name)
+        if content_hash:
+            return content_hash
+        h = hashlib.sha224()
+        for chunk in content.chunks():
+            h.update(chunk)
+        return h.hexdigest()
+
+    def get_content_name(self, name, content):
+        content_hash = self.get_content_hash(name, content)
+        return '{}/{}/{}{}'.format(
+            self.prefix, content_hash[:2], content_hash,
+            os.path.splitext(name)[1].lower())
+
+    def is_content_name(self, name):
+        parts = name.split('/')
+        return (
+            len(parts) == 3 and parts[0] == self.prefix
+            and (get_content_hash_from_name(parts[2]) or '').startswith(
+                parts[1]))
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_content_name(name, content)
+        if self.exists(name):
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def delete(self, name):
+        pass
+
+    def delete_unreferenced(self, name):
+        super().delete(name)
+
+
 def show_toolbar_callback(request):
     """
     Custom callback to always show the debug toolbar when the DEBUG setting
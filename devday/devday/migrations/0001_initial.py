@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 14:12
+
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='name')),
+                ('token', models.UUIDField(default=uuid.uuid4, verbose_name='token')),
+                ('modified', models.DateTimeField(default=django.utils.timezone.now, verbose_name='modified')),
+            ],
+            options={
+                'verbose_name': 'API version',
+                'verbose_name_plural': 'API versions',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+
+class ApiVersion(models.Model):
+    """
+    Version of a REST API collection, see :py:mod:`devday.api`. The versions
+    are stored in the database to be shared by all web server processes.
+    """
+
+    name = models.CharField(_("name"), max_length=50, primary_key=True)
+    token = models.UUIDField(_("token"), default=uuid.uuid4)
+    modified = models.DateTimeField(_("modified"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("API version")
+        verbose_name_plural = _("API versions")
+
+    def __str__(self):
+        return self.name
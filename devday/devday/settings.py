@@ -108,6 +108,14 @@ ACCOUNT_ACTIVATION_DAYS = 14
 ALLOWED_HOSTS = get_setting(
     "ALLOWED_HOSTS", split_list, default_value=["0.0.0.0", "127.0.0.1", "localhost"]
 )
+# seconds to cache successful basic and token authentication of API requests,
+# 0 disables the cache
+API_AUTH_CACHE_TIMEOUT = get_setting("API_AUTH_CACHE_TIMEOUT", int, 60)
+# seconds to keep the program bundle of an event for the bundle API endpoint
+API_BUNDLE_TIMEOUT = get_setting("API_BUNDLE_TIMEOUT", int, 86400)
+# default and maximum number of entries per page of the paginated API endpoints
+API_PAGE_SIZE = get_setting("API_PAGE_SIZE", int, 50)
+API_MAX_PAGE_SIZE = get_setting("API_MAX_PAGE_SIZE", int, 200)
 AUTH_USER_MODEL = "attendee.DevDayUser"
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -175,6 +183,8 @@ CMS_TEMPLATES = (
 )
 CMS_PERMISSION = True
 CRISPY_TEMPLATE_PACK = "bootstrap4"
+# seconds to cache the current event per process, 0 disables the cache
+CURRENT_EVENT_CACHE_TTL = get_setting("CURRENT_EVENT_CACHE_TTL", int, 60)
 
 DATA_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 DATABASES = {
@@ -211,6 +221,7 @@ INSTALLED_APPS = [
     "attendee.apps.AttendeeConfig",
     "talk.apps.SessionsConfig",
     "sponsoring",
+    "outbox.apps.OutboxConfig",
     "cms",
     "menus",
     "sekizai",
@@ -247,6 +258,8 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "event.middleware.CurrentEventMiddleware",
+    "attendee.middleware.UserCapabilitiesMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -257,6 +270,9 @@ MIDDLEWARE = [
 ]
 MIGRATION_MODULES = {}
 
+# seconds to cache public event pages for anonymous visitors, 0 disables the cache
+PAGE_CACHE_TIMEOUT = get_setting("PAGE_CACHE_TIMEOUT", int, 300)
+
 CORS_ALLOWED_ORIGINS = get_setting(
     "CORS_ALLOWED_ORIGINS",
     split_list,
@@ -266,9 +282,9 @@ CORS_URLS_REGEX = r"^/api/.*$"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
+        "devday.authentication.CachedBasicAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.TokenAuthentication",
+        "devday.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -298,12 +314,37 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = (os.path.join(BASE_DIR, "devday", "static"),)
 
 TALK_RESERVATION_CONFIRMATION_DAYS = 5
+# seconds between runs of the scheduled job that fills free spots of reservable
+# talks from their waiting lists if RUN_SCHEDULED_JOBS is set
+TALK_WAITING_LIST_INTERVAL = get_setting("TALK_WAITING_LIST_INTERVAL", int, 300)
 CONFIRMATION_SALT = get_setting("CONFIRMATION_SALT")
 
 TALK_PUBLIC_SPEAKER_IMAGE_HEIGHT = 960
 TALK_PUBLIC_SPEAKER_IMAGE_WIDTH = 636
 TALK_THUMBNAIL_HEIGHT = 320
 
+# images derived from speaker portraits, the keys are image fields of the
+# speaker models. Variants with a width are cropped to that size, variants
+# without a width are scaled to the height
+SPEAKER_IMAGE_VARIANTS = {
+    "public_image": {
+        "width": TALK_PUBLIC_SPEAKER_IMAGE_WIDTH,
+        "height": TALK_PUBLIC_SPEAKER_IMAGE_HEIGHT,
+    },
+    "thumbnail": {"height": TALK_THUMBNAIL_HEIGHT},
+    "thumbnail_2x": {"height": 2 * TALK_THUMBNAIL_HEIGHT},
+}
+# pending speaker images are created every SPEAKER_IMAGE_INTERVAL seconds if
+# RUN_SCHEDULED_JOBS is set and on commit otherwise. The process_speaker_images
+# command uses SPEAKER_IMAGE_WORKERS worker processes, 0 creates them in the
+# calling process. Portraits with more than SPEAKER_PORTRAIT_MAX_PIXELS are
+# skipped
+SPEAKER_IMAGE_INTERVAL = get_setting("SPEAKER_IMAGE_INTERVAL", int, 60)
+SPEAKER_IMAGE_WORKERS = get_setting("SPEAKER_IMAGE_WORKERS", int, 2)
+SPEAKER_PORTRAIT_MAX_PIXELS = get_setting(
+    "SPEAKER_PORTRAIT_MAX_PIXELS", int, 50000000
+)
+
 # Feedback for talks is allowed when that many minutes passed since the talk started
 TALK_FEEDBACK_ALLOWED_MINUTES = 30
 
@@ -379,6 +420,23 @@ DEFAULT_FROM_EMAIL = get_setting("DEFAULT_FROM_EMAIL", default_value="info@devda
 EMAIL_HOST = get_setting("EMAIL_HOST", default_value="mail")
 EMAIL_SUBJECT_PREFIX = get_setting("EMAIL_SUBJECT_PREFIX", default_value="[Dev Day] ")
 
+# queued mails are sent every OUTBOX_INTERVAL seconds in batches of
+# OUTBOX_BATCH_SIZE mails, failed deliveries are retried after
+# OUTBOX_RETRY_DELAY seconds doubling with each attempt
+OUTBOX_INTERVAL = get_setting("OUTBOX_INTERVAL", int, 15)
+OUTBOX_BATCH_SIZE = get_setting("OUTBOX_BATCH_SIZE", int, 50)
+OUTBOX_MAX_ATTEMPTS = get_setting("OUTBOX_MAX_ATTEMPTS", int, 6)
+OUTBOX_RETRY_DELAY = get_setting("OUTBOX_RETRY_DELAY", int, 60)
+# number of recipients per SMTP transaction of a bulk mail
+BULK_MAIL_CHUNK_SIZE = get_setting("BULK_MAIL_CHUNK_SIZE", int, 50)
+# external images embedded into HTML mails are cached for
+# HTML_MAIL_IMAGE_CACHE_TIMEOUT seconds if they are not larger than
+# HTML_MAIL_IMAGE_CACHE_MAX_SIZE bytes
+HTML_MAIL_IMAGE_CACHE_TIMEOUT = get_setting("HTML_MAIL_IMAGE_CACHE_TIMEOUT", int, 3600)
+HTML_MAIL_IMAGE_CACHE_MAX_SIZE = get_setting(
+    "HTML_MAIL_IMAGE_CACHE_MAX_SIZE", int, 1024 * 1024
+)
+
 _local_log_names = [
     "django",
     "django.request",
@@ -388,8 +446,12 @@ _local_log_names = [
     "event",
     "speaker",
     "talk",
+    "outbox",
 ]
 
+# run the outbox, speaker image and waiting list jobs in a background scheduler.
+# Without it the send_queued_mail management command has to be run periodically,
+# e.g. from cron, to send the queued mails
 RUN_SCHEDULED_JOBS = get_setting(
     "RUN_SCHEDULED_JOBS", value_type=bool, default_value=False
 )
@@ -0,0 +1,25 @@
+from django.test import TestCase
+
+from devday.api import get_api_version, get_api_versions, invalidate_api_versions
+from devday.models import ApiVersion
+
+
+class ApiVersionTest(TestCase):
+    def test_created_on_first_use(self):
+        token, modified = get_api_version("sessions")
+        self.assertEqual(ApiVersion.objects.get(name="sessions").token.hex, token)
+        self.assertEqual(get_api_version("sessions"), (token, modified))
+
+    def test_get_versions_single_query(self):
+        get_api_versions("events", "sessions")
+        with self.assertNumQueries(1):
+            versions = get_api_versions("events", "sessions")
+        self.assertEqual(set(versions), {"events", "sessions"})
+
+    def test_invalidate(self):
+        events = get_api_version("events")
+        sessions = get_api_version("sessions")
+        invalidate_api_versions("sessions", "speakers")
+        self.assertEqual(get_api_version("events"), events)
+        self.assertNotEqual(get_api_version("sessions")[0], sessions[0])
+        self.assertFalse(ApiVersion.objects.filter(name="speakers").exists())
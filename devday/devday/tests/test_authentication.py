@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from attendee.tests import attendee_testutils
+from devday import authentication
+from devday.authentication import (
+    CachedBasicAuthentication,
+    CachedTokenAuthentication,
+)
+
+
+class CachedBasicAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.password = attendee_testutils.create_test_user()
+        self.authentication = CachedBasicAuthentication()
+
+    def tearDown(self):
+        cache.clear()
+
+    def authenticate(self, password=None):
+        return self.authentication.authenticate_credentials(
+            self.user.email, password or self.password
+        )
+
+    def test_password_checked_once(self):
+        with patch(
+            "rest_framework.authentication.authenticate", wraps=authenticate
+        ) as mock_authenticate:
+            self.assertEqual(self.authenticate()[0], self.user)
+            with self.assertNumQueries(1):
+                self.assertEqual(self.authenticate()[0], self.user)
+        self.assertEqual(mock_authenticate.call_count, 1)
+
+    def test_wrong_password(self):
+        self.authenticate()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate("wrong")
+
+    def test_password_change(self):
+        self.authenticate()
+        self.user.set_password("new password")
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+        self.assertEqual(self.authenticate("new password")[0], self.user)
+
+    def test_deactivated_user(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate()
+
+    @override_settings(API_AUTH_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        with patch(
+            "rest_framework.authentication.authenticate", wraps=authenticate
+        ) as mock_authenticate:
+            self.authenticate()
+            self.authenticate()
+        self.assertEqual(mock_authenticate.call_count, 2)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        authentication._tokens.clear()
+        self.user, _ = attendee_testutils.create_test_user()
+        self.token = Token.objects.create(user=self.user)
+        self.authentication = CachedTokenAuthentication()
+
+    def tearDown(self):
+        authentication._tokens.clear()
+
+    def test_token_cached(self):
+        user, token = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            user, token = self.authentication.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        self.assertEqual(token, self.token)
+
+    def test_cached_instances_are_not_shared(self):
+        first, first_token = self.authentication.authenticate_credentials(
+            self.token.key
+        )
+        first._perm_cache = {"talk.add_vote"}
+        second, second_token = self.authentication.authenticate_credentials(
+            self.token.key
+        )
+        self.assertIsNot(second, first)
+        self.assertIsNot(second._state, first._state)
+        self.assertIsNot(second_token, first_token)
+        self.assertFalse(hasattr(second, "_perm_cache"))
+        self.assertIs(second_token.user, second)
+
+    def test_deleted_token(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_deactivated_user(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authentication.authenticate_credentials(self.token.key)
+
+    def test_expired(self):
+        self.authentication.authenticate_credentials(self.token.key)
+        with patch("devday.authentication.time.monotonic", return_value=1e12):
+            with self.assertNumQueries(1):
+                self.authentication.authenticate_credentials(self.token.key)
@@ -10,6 +10,8 @@ from attendee.tests.attendee_testutils import create_test_user
 from devday import cms_menus
 from devday.utils.devdata import DevData
 from event.models import Event
+from event.tests.event_testutils import create_test_event
+from menus.base import NavigationNode
 from menus.menu_pool import menu_pool
 
 CLASS_UNDER_TEST = "DevDayMenu"
@@ -119,3 +121,45 @@ class DevDayMenuTest(TestCase):
         self.assertEqual(len(children), 2, "profile menu should have two entries")
         self.assertEqual(children[0].url, reverse("user_profile"))
         self.assertEqual(children[1].url, reverse("auth_logout"))
+
+
+class DevDayModifierTest(TestCase):
+    def setUp(self):
+        self.event = create_test_event()
+        self.user, _ = create_test_user()
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_prune_nodes_with_events_without_queries(self):
+        def nodes():
+            return [
+                NavigationNode(
+                    "published",
+                    "/",
+                    1,
+                    attr={cms_menus.EVENT: True, cms_menus.EVENT_PUBLISHED: True},
+                ),
+                NavigationNode(
+                    "unpublished",
+                    "/",
+                    2,
+                    attr={cms_menus.EVENT: True, cms_menus.EVENT_PUBLISHED: False},
+                ),
+            ]
+
+        modifier = cms_menus.DevDayModifier(None)
+        visible = nodes()
+        with self.assertNumQueries(0):
+            modifier.prune_nodes_with_events(visible, self.request)
+        self.assertEqual([n.id for n in visible], [1])
+
+        self.user.is_staff = True
+        visible = nodes()
+        modifier.prune_nodes_with_events(visible, self.request)
+        self.assertEqual([n.id for n in visible], [1, 2])
+
+    def test_event_change_clears_menu_cache(self):
+        with patch("devday.cms_menus.menu_pool.clear") as mock_clear:
+            self.event.title = "Changed"
+            self.event.save()
+        mock_clear.assert_called_with(all=True)
@@ -1,12 +1,21 @@
+import hashlib
+import os
+import shutil
+import tempfile
 from io import BytesIO
 
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
-from django.db.models import Model
+from django.db.models import Model, PositiveIntegerField
 from django.test import TestCase, override_settings
 from django.utils.translation import ugettext as _
 
-from devday.extras import ValidatedImageField
+from devday.extras import (
+    ContentAddressedStorage,
+    StoredDimensionsImageField,
+    ValidatedImageField,
+)
 
 small_gif = (
     b"\x47\x49\x46\x38\x39\x61\x01\x00\x01\x00\x00\x00\x00\x21\xf9\x04"
@@ -68,3 +77,76 @@ class ValidatedImageFieldTest(TestCase):
             ValidationError, _("Unsupported image file format {}").format("image/gif")
         ):
             instance.full_clean()
+
+
+@override_settings(DEFAULT_FILE_STORAGE="inmemorystorage.InMemoryStorage")
+class StoredDimensionsImageFieldTest(TestCase):
+    def test_dimensions_are_stored_on_assignment_only(self):
+        class MockModelWithStoredDimensions(Model):
+            image = StoredDimensionsImageField(
+                width_field="image_width", height_field="image_height"
+            )
+            image_width = PositiveIntegerField(null=True)
+            image_height = PositiveIntegerField(null=True)
+
+        # loading an instance does not open the missing file
+        instance = MockModelWithStoredDimensions(image="missing.gif")
+        self.assertIsNone(instance.image_width)
+
+        gif_file = get_in_memory_gif_file(small_gif)
+        instance.image.save(gif_file.name, gif_file, save=False)
+        self.assertEqual((instance.image_width, instance.image_height), (1, 1))
+
+        instance.image.delete(save=False)
+        self.assertIsNone(instance.image_width)
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.storage = ContentAddressedStorage(prefix="blobs", location=self.location)
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def test_identical_content_is_stored_once(self):
+        first = self.storage.save("first.gif", ContentFile(small_gif))
+        second = self.storage.save("other/second.GIF", ContentFile(small_gif))
+        digest = hashlib.sha224(small_gif).hexdigest()
+        self.assertEqual(first, "blobs/{}/{}.gif".format(digest[:2], digest))
+        self.assertEqual(second, first)
+        self.assertEqual(
+            self.storage.listdir("blobs/{}".format(digest[:2]))[1],
+            ["{}.gif".format(digest)],
+        )
+        self.assertTrue(self.storage.is_content_name(first))
+        self.assertFalse(self.storage.is_content_name("other/second.gif"))
+
+    def test_hashed_name_is_trusted(self):
+        name = "{}.gif".format("ab" * 28)
+        self.assertEqual(
+            self.storage.save(name, ContentFile(small_gif)),
+            "blobs/ab/{}".format(name),
+        )
+
+    def test_saving_stored_content_touches_file(self):
+        name = self.storage.save("image.gif", ContentFile(small_gif))
+        path = self.storage.path(name)
+        os.utime(path, (0, 0))
+        self.assertEqual(self.storage.save("copy.gif", ContentFile(small_gif)), name)
+        self.assertGreater(os.path.getmtime(path), 0)
+
+    def test_name_with_suffix_is_hashed(self):
+        name = "{}_x1Yz2Ab.gif".format("ab" * 28)
+        digest = hashlib.sha224(small_gif).hexdigest()
+        self.assertEqual(
+            self.storage.save(name, ContentFile(small_gif)),
+            "blobs/{}/{}.gif".format(digest[:2], digest),
+        )
+
+    def test_delete_keeps_shared_files(self):
+        name = self.storage.save("image.gif", ContentFile(small_gif))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete_unreferenced(name)
+        self.assertFalse(self.storage.exists(name))
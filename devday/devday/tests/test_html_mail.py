@@ -1,13 +1,31 @@
 from bs4 import BeautifulSoup
 
 from django.core import mail
-from django.test import TestCase
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
 
 from devday.utils.html_mail import create_html_mail
 from mock import Mock, patch
 
+MINI_JPEG = (
+    b"\xff\xd8\xff\xdb\x00C\x00\x03\x02\x02\x02\x02\x02\x03\x02\x02"
+    b"\x02\x03\x03\x03\x03\x04\x06\x04\x04\x04\x04\x04\x08\x06\x06\x05"
+    b"\x06\t\x08\n\n\t\x08\t\t\n\x0c\x0f\x0c\n\x0b\x0e"
+    b"\x0b\t\t\r\x11\r\x0e\x0f\x10\x10\x11\x10\n\x0c\x12\x13"
+    b"\x12\x10\x13\x0f\x10\x10\x10\xff\xc9\x00\x0b\x08\x00\x01\x00\x01"
+    b"\x01\x01\x11\x00\xff\xcc\x00\x06\x00\x10\x10\x05\xff\xda\x00\x08"
+    b"\x01\x01\x00\x00?\x00\xd2\xcf \xff\xd9"
+)
+
+OTHER_JPEG = MINI_JPEG + b"\x00"
+
 
 class CreateHtmlMailTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
     def find_attachment_by_content_id(self, msg, name):
         for a in msg.attachments:
             for (k, v) in a._headers:
@@ -15,6 +33,14 @@ class CreateHtmlMailTests(TestCase):
                     return a
         return None
 
+    def mock_response(self, mock_urlopen, *images):
+        mock_httpresponse = Mock()
+        mock_httpresponse.getheader = Mock()
+        mock_httpresponse.read = Mock()
+        mock_httpresponse.getheader.side_effect = ["image/jpeg"] * len(images)
+        mock_httpresponse.read.side_effect = images
+        mock_urlopen.return_value.__enter__.return_value = mock_httpresponse
+
     @patch("devday.utils.html_mail.urlopen")
     def test_create_html_email(self, mock_urlopen):
         html = """<html><body>
@@ -25,21 +51,7 @@ class CreateHtmlMailTests(TestCase):
 <p>Final paragraph</p>
 </body></html>
 """
-        mini_jpeg = (
-            b"\xff\xd8\xff\xdb\x00C\x00\x03\x02\x02\x02\x02\x02\x03\x02\x02"
-            b"\x02\x03\x03\x03\x03\x04\x06\x04\x04\x04\x04\x04\x08\x06\x06\x05"
-            b"\x06\t\x08\n\n\t\x08\t\t\n\x0c\x0f\x0c\n\x0b\x0e"
-            b"\x0b\t\t\r\x11\r\x0e\x0f\x10\x10\x11\x10\n\x0c\x12\x13"
-            b"\x12\x10\x13\x0f\x10\x10\x10\xff\xc9\x00\x0b\x08\x00\x01\x00\x01"
-            b"\x01\x01\x11\x00\xff\xcc\x00\x06\x00\x10\x10\x05\xff\xda\x00\x08"
-            b"\x01\x01\x00\x00?\x00\xd2\xcf \xff\xd9"
-        )
-        mock_httpresponse = Mock()
-        mock_httpresponse.getheader = Mock()
-        mock_httpresponse.read = Mock()
-        mock_httpresponse.getheader.side_effect = ["image/jpeg", "image/jpeg"]
-        mock_httpresponse.read.side_effect = [mini_jpeg, mini_jpeg]
-        mock_urlopen.return_value.__enter__.return_value = mock_httpresponse
+        self.mock_response(mock_urlopen, MINI_JPEG, OTHER_JPEG)
         msg = create_html_mail("A test mail", html)
         msg.recipientlist = ("foo@example.com",)
         msg.send()
@@ -52,3 +64,53 @@ class CreateHtmlMailTests(TestCase):
             cid = img["src"].split(":")[1]
             att = self.find_attachment_by_content_id(msg, cid)
             self.assertIsNotNone(att, "image tag has a matching attachment")
+
+    @patch("devday.utils.html_mail.urlopen")
+    def test_same_image_attached_once(self, mock_urlopen):
+        html = (
+            "<p><img src='http://example.org/a.jpg'></p>"
+            "<p><img src='http://example.org/a.jpg'></p>"
+            "<p><img src='http://example.org/copy-of-a.jpg'></p>"
+        )
+        self.mock_response(mock_urlopen, MINI_JPEG, MINI_JPEG)
+        msg = create_html_mail("A test mail", html)
+        self.assertEqual(len(msg.attachments), 1)
+        self.assertEqual(mock_urlopen.call_count, 2)
+        soup = BeautifulSoup(msg.alternatives[0][0], "lxml")
+        self.assertEqual(len({img["src"] for img in soup.findAll("img")}), 1)
+
+    @patch("devday.utils.html_mail.urlopen")
+    def test_external_images_are_cached(self, mock_urlopen):
+        html = "<p><img src='http://example.org/a.jpg'></p>"
+        self.mock_response(mock_urlopen, MINI_JPEG)
+        create_html_mail("First mail", html)
+        msg = create_html_mail("Second mail", html)
+        mock_urlopen.assert_called_once_with("http://example.org/a.jpg")
+        self.assertEqual(msg.attachments[0].get_payload(decode=True), MINI_JPEG)
+
+    @override_settings(HTML_MAIL_IMAGE_CACHE_MAX_SIZE=10)
+    @patch("devday.utils.html_mail.urlopen")
+    def test_large_images_are_not_cached(self, mock_urlopen):
+        html = "<p><img src='http://example.org/a.jpg'></p>"
+        self.mock_response(mock_urlopen, MINI_JPEG, MINI_JPEG)
+        create_html_mail("First mail", html)
+        create_html_mail("Second mail", html)
+        self.assertEqual(mock_urlopen.call_count, 2)
+
+    @patch("devday.utils.html_mail.urlopen")
+    def test_local_images_are_read_from_storage(self, mock_urlopen):
+        name = default_storage.save("mail-test/image.jpg", ContentFile(MINI_JPEG))
+        try:
+            html = (
+                "<p><img src='/media/{0}'></p>"
+                "<p><img src='http://testserver/static/favicon.png'></p>"
+            ).format(name)
+            with self.settings(ALLOWED_HOSTS=["testserver"]):
+                msg = create_html_mail("A test mail", html)
+        finally:
+            default_storage.delete(name)
+        mock_urlopen.assert_not_called()
+        self.assertEqual(len(msg.attachments), 2)
+        self.assertEqual(msg.attachments[0].get_content_type(), "image/jpeg")
+        self.assertEqual(msg.attachments[0].get_payload(decode=True), MINI_JPEG)
+        self.assertEqual(msg.attachments[1].get_content_type(), "image/png")
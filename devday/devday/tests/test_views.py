@@ -4,8 +4,8 @@ from django.contrib.auth.models import Group
 from django.core import mail
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
-from django.urls import reverse_lazy
+from django.test import TestCase, override_settings
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
 from django.utils.timezone import datetime
 
@@ -15,6 +15,8 @@ from devday.utils.devdata import DevData
 from devday.utils.html_mail import DevDayEmailMessage
 from devday.views import DevDayEmailRecipients, get_recipient_list_from_file
 from event.models import Event
+from outbox.bulk import send_bulk_mail
+from outbox.models import BulkMail
 from speaker.models import PublishedSpeaker, Speaker
 from speaker.tests import speaker_testutils
 from talk import COMMITTEE_GROUP
@@ -368,7 +370,13 @@ class SendEmailViewTest(TestCase):
                 "sendreal": "",
             },
         )
+        bulk_mail = BulkMail.objects.get()
+        self.assertRedirects(
+            r, reverse("bulk_mail_progress", kwargs={"pk": bulk_mail.pk})
+        )
+        self.assertEqual(len(mail.outbox), 0, "mail should be sent by the worker")
 
+        send_bulk_mail()
         self.assertEqual(len(mail.outbox), 1, "should have one message")
         msg = mail.outbox[0]
         self.assertNotIn(settings.ADMINUSER_EMAIL, msg.recipients())
@@ -396,9 +404,43 @@ class SendEmailViewTest(TestCase):
                 "recipients_file": upload_file,
             },
         )
+        send_bulk_mail()
 
         self.assertEqual(len(mail.outbox), 1, "should have one messages")
         msg = mail.outbox[0]
         self.assertListEqual(
             msg.recipients(), test_recipients + [settings.DEFAULT_FROM_EMAIL]
         )
+
+    @override_settings(BULK_MAIL_CHUNK_SIZE=2)
+    def test_send_email_in_chunks(self):
+        self.client.login(username=settings.ADMINUSER_EMAIL, password="admin")
+
+        test_recipients = [
+            "recipient_a@example.org",
+            "recipient_b@example.org",
+            "Recipient_A@example.org",
+            "recipient_c@example.org",
+        ]
+        upload_file = SimpleUploadedFile(
+            "recipients.txt", "\n".join(test_recipients).encode("UTF-8")
+        )
+        self.client.post(
+            self.url,
+            data={
+                "recipients": "users",
+                "subject": "a message to all users",
+                "body": "<p>a single sentence as the <b>message</b>.",
+                "sendreal": "",
+                "recipients_file": upload_file,
+            },
+        )
+        send_bulk_mail()
+
+        self.assertEqual(
+            [msg.recipients() for msg in mail.outbox],
+            [
+                ["recipient_a@example.org", "recipient_b@example.org"],
+                ["recipient_c@example.org", settings.DEFAULT_FROM_EMAIL],
+            ],
+        )
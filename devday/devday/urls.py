@@ -14,9 +14,11 @@ from drf_spectacular.views import (
 )
 
 from devday.views import SendEmailView, exception_test_view
+from outbox.views import BulkMailProgressView, OutboxStatusView
 from rest_framework import routers
 from rest_framework.authtoken import views
 
+from attendee.api_views import CheckInSyncViewSet
 from event.api_views import EventDetailViewSet
 from speaker.api_views import SpeakerViewSet
 from talk.api_views import SessionViewSet
@@ -27,6 +29,7 @@ router = routers.DefaultRouter()
 router.register(r"sessions", SessionViewSet)
 router.register(r"speakers", SpeakerViewSet)
 router.register(r"events", EventDetailViewSet)
+router.register(r"checkin", CheckInSyncViewSet, basename="checkin")
 
 urlpatterns = [
     url(r"^api/", include(router.urls)),
@@ -45,6 +48,12 @@ urlpatterns = [
     url(r"^api-token-auth/", views.obtain_auth_token),
     url(r"^admin/", admin.site.urls),
     url(r"^admin/send_email/$", SendEmailView.as_view(), name="send_email"),
+    url(
+        r"^admin/send_email/(?P<pk>\d+)/$",
+        BulkMailProgressView.as_view(),
+        name="bulk_mail_progress",
+    ),
+    url(r"^admin/mail_outbox/$", OutboxStatusView.as_view(), name="outbox_status"),
     url(r"^sitemap\.xml$", sitemap_view, {"sitemaps": {"cmspages": CMSSitemap}}),
     url(r"^select2/", include("django_select2.urls")),
     url(r"", include("attendee.urls")),
@@ -0,0 +1,80 @@
+"""
+Streaming CSV exports for the staff ``csvviews`` endpoints.
+
+:py:class:`StreamingCSVExportView` writes the rows of its queryset to a
+:py:class:`django.http.StreamingHttpResponse` one by one. The rows are
+fetched with a ``values_list`` projection through a server side cursor
+(``QuerySet.iterator``), so neither the model instances nor the CSV output of
+the whole export are held in memory at any time.
+
+"""
+import csv
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.views.generic.list import BaseListView
+
+CSV_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_datetime(value):
+    return value.strftime(CSV_DATE_FORMAT) if value else ""
+
+
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most size items.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class _Echo(object):
+    """
+    File like object that returns the written value instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+class StreamingCSVExportView(BaseListView):
+    """
+    Base class for CSV exports of a queryset.
+
+    Subclasses define the ``filename``, the ``header`` row and the ``fields``
+    that are fetched with ``values_list``. Rows can be converted by
+    overriding :py:meth:`format_row`, exports that need data from related
+    tables may override :py:meth:`get_rows`.
+    """
+
+    filename = "export.csv"
+    header = ()
+    fields = ()
+    delimiter = ";"
+    chunk_size = 2000
+
+    def get_rows(self, queryset):
+        return queryset.values_list(*self.fields).iterator(chunk_size=self.chunk_size)
+
+    def format_row(self, row):
+        return row
+
+    def stream_csv(self, queryset):
+        writer = csv.writer(_Echo(), delimiter=self.delimiter)
+        yield writer.writerow(self.header)
+        for row in self.get_rows(queryset):
+            yield writer.writerow(self.format_row(row))
+
+    def render_to_response(self, context):
+        response = StreamingHttpResponse(
+            self.stream_csv(context["object_list"]),
+            content_type="txt/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = "attachment; filename={}".format(
+            self.filename
+        )
+        return response
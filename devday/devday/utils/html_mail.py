@@ -3,17 +3,103 @@
 In addition to creating a text-only version and using multipart/alternative,
 find img tags and convert the URL src to an embedded base64 representation of
 the image.
+
+Images below MEDIA_URL and STATIC_URL of this site are read from the media
+storage and the static files directly. Other images are fetched over HTTP and
+kept in the cache, the URL maps to the SHA-256 hash of the image and the hash
+maps to the image data. Images larger than HTML_MAIL_IMAGE_CACHE_MAX_SIZE bytes
+are not cached. Each distinct image is attached once with a Content-ID derived
+from its hash.
 """
 
+import hashlib
+import mimetypes
 from email.mime.image import MIMEImage
+from urllib.parse import unquote, urlsplit
 from urllib.request import urlopen
 
 from bs4 import BeautifulSoup
 from django.conf import settings
+from django.contrib.sites.models import Site
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.files.storage import default_storage
 from django.core.mail import EmailMultiAlternatives
 from django.utils.translation import ugettext_lazy as _
 from html2text import HTML2Text
 
+IMAGE_URL_KEY = 'html_mail:image_url:{}'
+IMAGE_DATA_KEY = 'html_mail:image:{}'
+
+
+def _is_local_host(host):
+    if not host:
+        return True
+    if host == Site.objects.get_current().domain.split(':')[0]:
+        return True
+    return host in settings.ALLOWED_HOSTS
+
+
+def _read_file(storage, name):
+    if not storage.exists(name):
+        return None
+    with storage.open(name) as f:
+        return f.read()
+
+
+def _read_local_image(url):
+    """
+    Return the data of an image below MEDIA_URL or STATIC_URL of this site or
+    None if the URL does not point to such an image.
+    """
+    parts = urlsplit(url)
+    if not _is_local_host(parts.hostname):
+        return None
+    path = unquote(parts.path)
+    if path.startswith(settings.MEDIA_URL):
+        return _read_file(default_storage, path[len(settings.MEDIA_URL):])
+    if path.startswith(settings.STATIC_URL):
+        name = path[len(settings.STATIC_URL):]
+        found = finders.find(name)
+        if found:
+            with open(found, 'rb') as f:
+                return f.read()
+        return _read_file(staticfiles_storage, name)
+    return None
+
+
+def _fetch_image(url):
+    url_key = IMAGE_URL_KEY.format(hashlib.sha1(url.encode()).hexdigest())
+    digest = cache.get(url_key)
+    if digest is not None:
+        cached = cache.get(IMAGE_DATA_KEY.format(digest))
+        if cached is not None:
+            return (digest, *cached)
+    with urlopen(url) as response:
+        content_type = response.getheader('Content-type')
+        subtype = content_type.split(';')[0].split('/')[1].strip()
+        data = response.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if len(data) <= settings.HTML_MAIL_IMAGE_CACHE_MAX_SIZE:
+        cache.set_many(
+            {url_key: digest, IMAGE_DATA_KEY.format(digest): (subtype, data)},
+            settings.HTML_MAIL_IMAGE_CACHE_TIMEOUT)
+    return digest, subtype, data
+
+
+def get_image(url):
+    """
+    Return a tuple of the SHA-256 hash, the MIME subtype and the data of the
+    image at the given URL.
+    """
+    data = _read_local_image(url)
+    if data is None:
+        return _fetch_image(url)
+    mimetype, _encoding = mimetypes.guess_type(urlsplit(url).path)
+    subtype = mimetype.split('/')[1] if mimetype else None
+    return hashlib.sha256(data).hexdigest(), subtype, data
+
 
 class DevDayEmailMessage(EmailMultiAlternatives):
     def __init__(self, *args, **kwargs):
@@ -25,16 +111,16 @@ class DevDayEmailMessage(EmailMultiAlternatives):
 
     def attach_html(self, html):
         soup = BeautifulSoup(html, 'lxml')
-        i = 0
+        attached = set()
         for tag in soup.findAll('img'):
-            url = tag['src']
-            with urlopen(url) as response:
-                subtype = response.getheader('Content-type').split('/')[1]
-                img = MIMEImage(response.read(), subtype)
-                img.add_header('Content-ID', f'image-{i}')
+            digest, subtype, data = get_image(tag['src'])
+            content_id = f'image-{digest[:16]}'
+            if digest not in attached:
+                img = MIMEImage(data, subtype)
+                img.add_header('Content-ID', content_id)
                 self.attach(img)
-                tag['src'] = f'cid:image-{i}'
-                i += 1
+                attached.add(digest)
+            tag['src'] = f'cid:{content_id}'
         self.attach_alternative(str(soup), 'text/html')
 
 
@@ -5,13 +5,14 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.db.models import Q
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic.edit import FormView
 
 from attendee.views import StaffUserMixin
 from devday.utils.html_mail import create_html_mail
 from event.models import Event
+from outbox.bulk import queue_bulk_mail
 from speaker.models import PublishedSpeaker, Speaker
 from talk.models import Attendee
 
@@ -128,8 +129,15 @@ def get_recipient_list_from_file(uploaded_file):
 
 
 class SendEmailView(StaffUserMixin, SuccessMessageMixin, FormView):
+    """
+    Send a HTML mail to a group of recipients. Test mails to the current user
+    are sent directly, mails to the selected recipients are queued as a bulk
+    mail and delivered in chunks outside of the request.
+    """
+
     template_name = "devday/sendemail.html"
     form_class = SendEmailForm
+    bulk_mail = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -149,10 +157,11 @@ class SendEmailView(StaffUserMixin, SuccessMessageMixin, FormView):
         return context
 
     def get_success_url(self):
+        if self.bulk_mail is not None:
+            return reverse("bulk_mail_progress", kwargs={"pk": self.bulk_mail.pk})
         return reverse_lazy("send_email")
 
     def form_valid(self, form):
-        msg = create_html_mail(form.cleaned_data["subject"], form.cleaned_data["body"])
         recipients = form.cleaned_data["recipients"]
         if form.cleaned_data["recipients_file"]:
             label = _("email addresses from uploaded file")
@@ -160,18 +169,27 @@ class SendEmailView(StaffUserMixin, SuccessMessageMixin, FormView):
             label = self.choices.get_choice_label(recipients)
         if form.cleaned_data.get("sendreal"):
             if form.cleaned_data["recipients_file"]:
-                msg.recipientlist = get_recipient_list_from_file(
+                recipientlist = get_recipient_list_from_file(
                     form.cleaned_data["recipients_file"]
                 )
             else:
-                msg.recipientlist = self.choices.get_email_addresses(recipients)
-            msg.recipientlist += [settings.DEFAULT_FROM_EMAIL]
-            self.success_message = _(
-                "Successfully sent message to {} {} recipients"
-            ).format(len(msg.recipientlist), label)
-            msg.send()
+                recipientlist = self.choices.get_email_addresses(recipients)
+            recipientlist += [settings.DEFAULT_FROM_EMAIL]
+            self.bulk_mail = queue_bulk_mail(
+                form.cleaned_data["subject"],
+                form.cleaned_data["body"],
+                recipientlist,
+                label,
+                created_by=self.request.user,
+            )
+            self.success_message = _("Queued message to {} {} recipients").format(
+                self.bulk_mail.get_progress()["total_recipients"], label
+            )
             return super().form_valid(form)
         else:
+            msg = create_html_mail(
+                form.cleaned_data["subject"], form.cleaned_data["body"]
+            )
             msg.recipientlist = (self.request.user.email,)
             self.success_message = _(
                 "Successfully sent message for {} to yourself"
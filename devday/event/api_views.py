@@ -1,6 +1,15 @@
+import gzip
+
+from django.http import Http404, HttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
 
+from devday.api import ApiCursorPagination, ConditionalGetMixin
 from event.models import Event
+from talk.bundle import get_event_bundle
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -16,7 +25,34 @@ class EventSerializer(serializers.ModelSerializer):
         }
 
 
-class EventDetailViewSet(viewsets.ReadOnlyModelViewSet):
+class EventDetailViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.filter(published=True)
     serializer_class = EventSerializer
+    pagination_class = ApiCursorPagination
+    api_version = "events"
     lookup_field = 'slug'
+
+    @action(detail=True)
+    def bundle(self, request, slug=None):
+        """
+        Return the published program of the event as one gzip compressed JSON
+        document for offline use, see :py:mod:`talk.bundle`. The ETag is the
+        version of the document.
+        """
+        event = self.get_object()
+        if not (event.sessions_published or request.user.is_staff):
+            raise Http404
+        version, data = get_event_bundle(event)
+        etag = quote_etag(version)
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            if re_accepts_gzip.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+                response = HttpResponse(data, content_type="application/json")
+                response["Content-Encoding"] = "gzip"
+            else:
+                response = HttpResponse(
+                    gzip.decompress(data), content_type="application/json"
+                )
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
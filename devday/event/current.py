@@ -0,0 +1,110 @@
+"""
+Cached resolution of the current event.
+
+The current event is needed by context processors, the CMS menu, toolbars and
+many views, so a single page render asks for it several times. Lookups are
+memoized in two layers:
+
+- a request scope that is opened and closed by
+  :py:class:`event.middleware.CurrentEventMiddleware` and returns the very
+  same instance for every call within one request
+
+- a process wide cache that expires after
+  ``settings.CURRENT_EVENT_CACHE_TTL`` seconds
+
+Saving or deleting an :py:class:`event.models.Event` invalidates both layers
+of the process that performed the change. Other worker processes pick up the
+change when their cache entry expires. Events resolved inside of a transaction
+are not put into the process cache because the transaction might be rolled
+back.
+
+"""
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+_NOT_RESOLVED = object()
+
+_request_scope = threading.local()
+
+_process_lock = threading.Lock()
+_process_cache = {"expires": 0.0, "event": _NOT_RESOLVED, "generation": 0}
+
+
+def begin_request_scope():
+    _request_scope.event = _NOT_RESOLVED
+
+
+def end_request_scope():
+    _request_scope.__dict__.pop("event", None)
+
+
+def _in_request_scope():
+    return hasattr(_request_scope, "event")
+
+
+def _in_transaction():
+    return transaction.get_connection().in_atomic_block
+
+
+def _get_cached_for_process():
+    with _process_lock:
+        if _process_cache["expires"] > time.monotonic():
+            return _process_cache["event"], _process_cache["generation"]
+        return _NOT_RESOLVED, _process_cache["generation"]
+
+
+def _set_cached_for_process(event, generation):
+    ttl = getattr(settings, "CURRENT_EVENT_CACHE_TTL", 0)
+    if ttl <= 0:
+        return
+    if _in_transaction():
+        # the result might be based on changes that are rolled back later
+        return
+    with _process_lock:
+        # do not store a result that was resolved before an invalidation
+        if _process_cache["generation"] != generation:
+            return
+        _process_cache["event"] = event
+        _process_cache["expires"] = time.monotonic() + ttl
+
+
+def invalidate():
+    """
+    Drop the cached current event from the process cache and the request
+    scope of the calling thread.
+    """
+    with _process_lock:
+        _process_cache["event"] = _NOT_RESOLVED
+        _process_cache["expires"] = 0.0
+        _process_cache["generation"] += 1
+    if _in_request_scope():
+        _request_scope.event = _NOT_RESOLVED
+
+
+def get_current_event(resolve):
+    """
+    Return the current event, calling ``resolve`` to query the database if
+    neither the request scope nor the process cache holds a value.
+
+    The instance from the process cache is shared between threads, therefore
+    each request gets its own copy.
+
+    :param resolve: callable returning the current event or None
+    :return: current event or None
+    """
+    if _in_request_scope() and _request_scope.event is not _NOT_RESOLVED:
+        return _request_scope.event
+
+    event, generation = _get_cached_for_process()
+    if event is _NOT_RESOLVED:
+        event = resolve()
+        _set_cached_for_process(event, generation)
+    event = copy.deepcopy(event)
+
+    if _in_request_scope():
+        _request_scope.event = event
+    return event
@@ -7,9 +7,12 @@ import argparse
 import csv
 
 from django.core.management import BaseCommand
-from django.db.models import Avg, Count
 
 from event.models import Event
+from talk.committee_export import (
+    get_committee_export_queryset,
+    iter_committee_export_rows,
+)
 
 
 class Command(BaseCommand):
@@ -24,12 +27,8 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        talks = (
-            Event.objects.current_event()
-            .talk_set.all()
-            .prefetch_related("talkcomment_set")
-            .annotate(num_votes=Count("vote"), avg_votes=Avg("vote__score"))
-            .order_by("-avg_votes", "title")
+        talks = get_committee_export_queryset(Event.objects.current_event()).order_by(
+            "-average_score", "title"
         )
 
         if not talks.exists():
@@ -44,18 +43,15 @@ class Command(BaseCommand):
         out.writerow(
             ("Speaker", "Title", "Abstract", "Votes", "Avg. Score", "Comments")
         )
-        for t in talks:
+        for t in iter_committee_export_rows(talks):
             row = (
-                "\n".join([s.name for s in t.draft_speakers.all()]),
+                "\n".join([s.name for s in t.speakers]),
                 t.title,
                 t.abstract,
-                t.num_votes,
-                t.avg_votes,
+                t.vote_count,
+                t.average_score,
                 "\n".join(
-                    [
-                        f"{v.created} {v.commenter.email}: {v.comment}"
-                        for v in t.talkcomment_set.order_by("created").all()
-                    ]
+                    [f"{c.created} {c.commenter}: {c.comment}" for c in t.comments]
                 ),
             )
             out.writerow(row)
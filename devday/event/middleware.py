@@ -0,0 +1,18 @@
+from event import current
+
+
+class CurrentEventMiddleware:
+    """
+    Open a request scope for :py:mod:`event.current`, so that the current
+    event is resolved at most once per request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        current.begin_request_scope()
+        try:
+            return self.get_response(request)
+        finally:
+            current.end_request_scope()
@@ -1,14 +1,20 @@
 from django.apps import apps
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 
+from event import current
+
 
 class EventManager(models.Manager):
     def current_event(self):
-        return self.filter(published=True).order_by("-start_time").first()
+        return current.get_current_event(
+            lambda: self.filter(published=True).order_by("-start_time").first()
+        )
 
     def current_event_id(self):
         e = self.current_event()
@@ -113,3 +119,11 @@ class Event(models.Model):
 
     def __str__(self):
         return self.title
+
+
+@receiver(post_save, sender=Event, dispatch_uid="event_invalidate_current_on_save")
+@receiver(post_delete, sender=Event, dispatch_uid="event_invalidate_current_on_delete")
+def invalidate_current_event(sender, **kwargs):
+    current.invalidate()
+    # concurrent requests may have cached the state before the commit
+    transaction.on_commit(current.invalidate)
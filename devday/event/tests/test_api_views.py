@@ -0,0 +1,109 @@
+import gzip
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from attendee.tests import attendee_testutils
+from event.models import Event
+from event.tests import event_testutils
+from talk.models import Track
+
+
+class EventDetailViewSetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, _ = attendee_testutils.create_test_user()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_list_constant_queries(self):
+        published = Event.objects.filter(published=True).count()
+        for index in range(2):
+            event_testutils.create_test_event('Event {}'.format(index))
+        # the first request loads the CMS URL configuration
+        self.client.get('/api/events/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/events/', {'page_size': 200})
+        self.assertEqual(len(response.json()['results']), published + 2)
+        for index in range(2, 4):
+            event_testutils.create_test_event('Event {}'.format(index))
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/api/events/', {'page_size': 200})
+        self.assertEqual(len(response.json()['results']), published + 4)
+
+    def test_list_published_only(self):
+        unpublished = event_testutils.create_test_event(
+            'Unpublished', published=False)
+        data = self.client.get('/api/events/', {'page_size': 200}).json()
+        self.assertNotIn(
+            unpublished.slug, [event['id'] for event in data['results']])
+
+    def test_not_modified_until_event_changes(self):
+        event = event_testutils.create_test_event('Conditional')
+        url = '/api/events/{}/'.format(event.slug)
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        event.location = 'Elsewhere'
+        event.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['location'], 'Elsewhere')
+
+
+@patch('talk.bundle._in_transaction', return_value=False)
+class EventBundleTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, _ = attendee_testutils.create_test_user()
+        cls.event = event_testutils.create_test_event(
+            'Bundle', sessions_published=True)
+        cls.url = '/api/events/{}/bundle/'.format(cls.event.slug)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_gzip(self, _):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        document = json.loads(gzip.decompress(response.content))
+        self.assertEqual(document['event']['id'], self.event.slug)
+        self.assertEqual(response['ETag'], '"{}"'.format(document['version']))
+
+    def test_without_gzip(self, _):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(
+            json.loads(response.content)['event']['id'], self.event.slug)
+
+    def test_not_modified(self, _):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        with patch(
+                'talk.api_versions.transaction.on_commit',
+                side_effect=lambda func: func()):
+            Track.objects.create(name='New Track', event=self.event)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_sessions_not_published(self, _):
+        event = event_testutils.create_test_event(
+            'Unpublished Sessions', sessions_published=False)
+        url = '/api/events/{}/bundle/'.format(event.slug)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        staff, _ = attendee_testutils.create_test_user(
+            'staff@example.org', is_staff=True)
+        self.client.force_authenticate(staff)
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase, override_settings
+
+from event import current
+from event.middleware import CurrentEventMiddleware
+from event.models import Event
+
+from .event_testutils import create_test_event, update_event
+
+
+class CurrentEventRequestScopeTest(TestCase):
+    def setUp(self):
+        self.event = create_test_event()
+        current.begin_request_scope()
+
+    def tearDown(self):
+        current.end_request_scope()
+
+    def test_current_event_queried_once(self):
+        with self.assertNumQueries(1):
+            first = Event.objects.current_event()
+            second = Event.objects.current_event()
+            Event.objects.current_event_id()
+            Event.objects.current_registration_open()
+            Event.objects.current_submission_open()
+        self.assertEqual(first, self.event)
+        self.assertIs(first, second)
+
+    def test_save_invalidates_request_scope(self):
+        Event.objects.current_event()
+        update_event(self.event, submission_open=False)
+        with self.assertNumQueries(1):
+            self.assertFalse(Event.objects.current_submission_open())
+
+    def test_end_request_scope(self):
+        current.end_request_scope()
+        with self.assertNumQueries(2):
+            Event.objects.current_event()
+            Event.objects.current_event()
+
+
+@patch("event.current._in_transaction")
+class CurrentEventProcessCacheTest(TestCase):
+    def setUp(self):
+        self.event = create_test_event()
+        current.invalidate()
+
+    def tearDown(self):
+        current.invalidate()
+
+    def test_current_event_cached(self, in_transaction):
+        in_transaction.return_value = False
+        with self.assertNumQueries(1):
+            first = Event.objects.current_event()
+            second = Event.objects.current_event()
+        self.assertEqual(first, self.event)
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second, "each caller should get a copy")
+
+    def test_no_current_event_cached(self, in_transaction):
+        in_transaction.return_value = False
+        Event.objects.all().delete()
+        with self.assertNumQueries(1):
+            self.assertIsNone(Event.objects.current_event())
+            self.assertIsNone(Event.objects.current_event_id())
+
+    def test_not_cached_inside_transaction(self, in_transaction):
+        in_transaction.return_value = True
+        with self.assertNumQueries(2):
+            Event.objects.current_event()
+            Event.objects.current_event()
+
+    @override_settings(CURRENT_EVENT_CACHE_TTL=0)
+    def test_cache_disabled(self, in_transaction):
+        in_transaction.return_value = False
+        with self.assertNumQueries(2):
+            Event.objects.current_event()
+            Event.objects.current_event()
+
+    def test_save_invalidates_cache(self, in_transaction):
+        in_transaction.return_value = False
+        self.assertTrue(Event.objects.current_submission_open())
+        update_event(self.event, submission_open=False)
+        self.assertFalse(Event.objects.current_submission_open())
+
+    def test_delete_invalidates_cache(self, in_transaction):
+        in_transaction.return_value = False
+        self.assertEqual(Event.objects.current_event(), self.event)
+        self.event.delete()
+        self.assertNotEqual(Event.objects.current_event_id(), self.event.id)
+
+
+class CurrentEventMiddlewareTest(TestCase):
+    def setUp(self):
+        create_test_event()
+
+    def test_request_scope(self):
+        def get_response(request):
+            with self.assertNumQueries(1):
+                Event.objects.current_event()
+                Event.objects.current_event()
+            return "response"
+
+        middleware = CurrentEventMiddleware(get_response)
+        self.assertEqual(middleware(RequestFactory().get("/")), "response")
+        self.assertFalse(current._in_request_scope())
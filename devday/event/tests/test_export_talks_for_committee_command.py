@@ -4,10 +4,12 @@ import os
 from django.core.files.temp import NamedTemporaryFile
 from django.test import TestCase
 
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 
 from devday.utils.devdata import DevData
 from event.models import Event
+from talk.models import TalkComment
 
 
 class TestExportTalksForCommitteeCommand(TestCase):
@@ -56,3 +58,19 @@ class TestExportTalksForCommitteeCommand(TestCase):
                 self.assertEqual(talks.count() + 1, len(output_lines))
         finally:
             os.unlink(tempfile.name)
+
+    def test_export_query_count(self):
+        dev_data = DevData()
+        dev_data.SPEAKERS_PER_EVENT = 2
+        events = [Event.objects.current_event()]
+        dev_data.create_users_and_attendees(10, events=events)
+        dev_data.create_speakers(events)
+        dev_data.create_talk_formats()
+        dev_data.create_talks(events=events)
+        commenter = get_user_model().objects.first()
+        for talk in Event.objects.current_event().talk_set.all():
+            TalkComment.objects.create(commenter=commenter, talk=talk, comment="Ok")
+        outbuf = io.StringIO()
+        # current event, exists check, talks, speakers, formats and comments
+        with self.assertNumQueries(6):
+            call_command("export_talks_for_committee", stdout=outbuf)
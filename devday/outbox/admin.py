@@ -0,0 +1,56 @@
+from django.contrib import admin
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.translation import ngettext_lazy
+from django.utils.translation import ugettext_lazy as _
+
+from outbox.models import BulkMail, QueuedEmail
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipients", "status", "attempts", "created", "sent"]
+    list_filter = ["status"]
+    search_fields = ["subject", "to"]
+    date_hierarchy = "created"
+    readonly_fields = ["created", "modified", "attempts", "last_error", "sent"]
+    actions = ["retry_mails"]
+
+    def recipients(self, obj):
+        return ", ".join(obj.to)
+
+    recipients.short_description = _("recipients")
+
+    def retry_mails(self, request, queryset):
+        count = queryset.exclude(status=QueuedEmail.STATUS_SENT).update(
+            status=QueuedEmail.STATUS_PENDING, attempts=0, next_attempt=timezone.now()
+        )
+        self.message_user(
+            request,
+            ngettext_lazy(
+                "One mail has been scheduled for delivery.",
+                "%(count)d mails have been scheduled for delivery.",
+                count,
+            )
+            % {"count": count},
+        )
+
+    retry_mails.short_description = _("Retry delivery of selected mails")
+
+
+@admin.register(BulkMail)
+class BulkMailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "recipient_label", "created", "created_by", "progress"]
+    list_select_related = ["created_by"]
+    readonly_fields = ["created", "modified", "created_by"]
+    date_hierarchy = "created"
+
+    def progress(self, obj):
+        return format_html(
+            '<a href="{}">{}</a>',
+            reverse("bulk_mail_progress", kwargs={"pk": obj.pk}),
+            _("Show progress"),
+        )
+
+    progress.short_description = _("progress")
@@ -0,0 +1,23 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.translation import ugettext_lazy as _
+
+
+class OutboxConfig(AppConfig):
+    name = "outbox"
+    verbose_name = _("Mail outbox")
+
+    def ready(self):
+        if settings.RUN_SCHEDULED_JOBS:
+            from devday.apps import get_scheduler
+            from outbox.jobs import send_mail_job
+
+            get_scheduler().add_job(
+                send_mail_job,
+                "interval",
+                seconds=settings.OUTBOX_INTERVAL,
+                id="send_queued_mail",
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1,
+            )
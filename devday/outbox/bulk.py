@@ -0,0 +1,97 @@
+"""
+Delivery of HTML mails to large groups of recipients.
+
+:py:func:`queue_bulk_mail` stores a mail and splits its deduplicated
+recipients into chunks of ``BULK_MAIL_CHUNK_SIZE`` addresses. Every chunk is
+delivered as a separate SMTP transaction, so a refused recipient or a timeout
+only affects the chunk it happened in. The delivery state is recorded per
+chunk: failed chunks are retried with the same backoff as transactional mail
+and an interrupted delivery resumes with the chunks that have not been sent.
+
+:py:func:`send_bulk_mail` delivers the due chunks, it is run by the same job
+and management command as :py:func:`outbox.mail.send_queued_mail`. One of
+them is required, the request that queues a bulk mail does not send it.
+
+"""
+import copy
+
+from django.conf import settings
+from django.db import transaction
+
+from devday.utils.csv_export import chunked
+from devday.utils.html_mail import create_html_mail
+from outbox.mail import deliver_due
+from outbox.models import BulkMail, BulkMailChunk
+
+
+def deduplicate_recipients(addresses):
+    """
+    Return the addresses in their original order without blank entries and
+    without duplicates. Addresses that only differ in case are considered
+    duplicates.
+    """
+    seen = set()
+    recipients = []
+    for address in addresses:
+        address = address.strip()
+        key = address.lower()
+        if address and key not in seen:
+            seen.add(key)
+            recipients.append(address)
+    return recipients
+
+
+@transaction.atomic
+def queue_bulk_mail(
+    subject, html_body, recipients, recipient_label, created_by=None, chunk_size=None
+):
+    """
+    Create a :py:class:`BulkMail` with its recipients split into chunks of
+    ``chunk_size`` addresses, defaulting to ``BULK_MAIL_CHUNK_SIZE``.
+    """
+    if chunk_size is None:
+        chunk_size = settings.BULK_MAIL_CHUNK_SIZE
+    bulk_mail = BulkMail.objects.create(
+        subject=subject,
+        html_body=html_body,
+        recipient_label=recipient_label,
+        created_by=created_by,
+    )
+    BulkMailChunk.objects.bulk_create(
+        BulkMailChunk(
+            bulk_mail=bulk_mail,
+            number=number,
+            recipients=chunk,
+            recipient_count=len(chunk),
+        )
+        for number, chunk in enumerate(
+            chunked(deduplicate_recipients(recipients), chunk_size), start=1
+        )
+    )
+    return bulk_mail
+
+
+def send_bulk_mail(batch_size=None):
+    """
+    Send all due bulk mail chunks in batches of ``batch_size`` chunks over
+    one connection per batch. The message of a bulk mail is built once and
+    reused for all of its chunks. Returns the number of chunks that have been
+    processed.
+    """
+    messages = {}
+
+    def send(chunk, connection):
+        message = messages.get(chunk.bulk_mail_id)
+        if message is None:
+            message = create_html_mail(
+                chunk.bulk_mail.subject, chunk.bulk_mail.html_body
+            )
+            messages[chunk.bulk_mail_id] = message
+        chunk_message = copy.copy(message)
+        chunk_message.recipientlist = list(chunk.recipients)
+        chunk_message.connection = connection
+        chunk_message.send()
+
+    return deliver_due(
+        BulkMailChunk.objects.select_related("bulk_mail"), send, batch_size
+    )
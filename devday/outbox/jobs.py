@@ -0,0 +1,26 @@
+"""
+Scheduled job that drains the outbox, see :py:class:`outbox.apps.OutboxConfig`.
+
+"""
+import logging
+
+from django.db import connections
+
+from outbox.bulk import send_bulk_mail
+from outbox.mail import send_queued_mail
+
+logger = logging.getLogger(__name__)
+
+
+def send_mail_job():
+    """
+    Send due transactional mails first and bulk mail chunks afterwards.
+    Closes the scheduler thread's database connection when done.
+    """
+    try:
+        send_queued_mail()
+        send_bulk_mail()
+    except Exception:
+        logger.exception("sending queued mail failed")
+    finally:
+        connections.close_all()
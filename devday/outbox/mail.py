@@ -0,0 +1,173 @@
+"""
+Persistent outbox for outgoing mail.
+
+Views and signal handlers put mails into the outbox with :py:func:`queue_mail`
+or :py:func:`queue_message` instead of talking to the mail relay during the
+request. The mails are stored in the same transaction as the data they refer
+to, so a rolled back request does not send any mail.
+
+:py:func:`send_queued_mail` drains the outbox. It is run periodically by the
+job in :py:mod:`outbox.jobs` if ``RUN_SCHEDULED_JOBS`` is set, or by the
+``send_queued_mail`` management command. Mails are sent in batches over a
+single SMTP connection. Failed deliveries are retried with exponential backoff
+until ``OUTBOX_MAX_ATTEMPTS`` is reached.
+
+Requests never talk to the mail relay themselves. Installations that do not
+set ``RUN_SCHEDULED_JOBS`` have to run the ``send_queued_mail`` management
+command periodically, e.g. from cron, otherwise queued mails are not sent.
+
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from outbox.models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+
+def queue_mail(subject, message, from_email, recipient_list, html_message=None):
+    """
+    Put a mail into the outbox. The parameters match those of
+    :py:func:`django.core.mail.send_mail`.
+    """
+    queued = QueuedEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(recipient_list),
+    )
+    return queued
+
+
+def queue_message(message):
+    """
+    Put an :py:class:`django.core.mail.EmailMessage` into the outbox.
+    Attachments are not supported, HTML alternatives of an
+    :py:class:`django.core.mail.EmailMultiAlternatives` are kept.
+    """
+    if message.attachments:
+        raise ValueError("mails with attachments cannot be queued")
+    html_body = ""
+    for content, mimetype in getattr(message, "alternatives", []):
+        if mimetype == "text/html":
+            html_body = content
+        else:
+            raise ValueError("unsupported alternative {}".format(mimetype))
+    queued = QueuedEmail.objects.create(
+        subject=message.subject,
+        body=message.body,
+        html_body=html_body,
+        from_email=message.from_email,
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+    return queued
+
+
+def get_retry_delay(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def _record_failure(delivery, error, now):
+    delivery.attempts += 1
+    delivery.last_error = "{}: {}".format(type(error).__name__, error)
+    if delivery.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        delivery.status = delivery.STATUS_FAILED
+        logger.error(
+            "giving up on %s %d after %d attempts: %s",
+            delivery._meta.model_name,
+            delivery.id,
+            delivery.attempts,
+            delivery.last_error,
+        )
+    else:
+        delivery.next_attempt = now + get_retry_delay(delivery.attempts)
+        logger.warning(
+            "delivery of %s %d failed, retrying at %s: %s",
+            delivery._meta.model_name,
+            delivery.id,
+            delivery.next_attempt,
+            delivery.last_error,
+        )
+
+
+def _deliver_batch(queryset, batch_size, send):
+    """
+    Call ``send(delivery, connection)`` for up to ``batch_size`` due
+    deliveries from ``queryset`` sharing one connection and record the
+    outcome. Returns the number of deliveries that have been processed.
+    """
+    with transaction.atomic():
+        batch = list(
+            queryset.due()
+            .select_for_update(skip_locked=True, of=("self",))
+            .order_by("next_attempt", "id")[:batch_size]
+        )
+        if not batch:
+            return 0
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            now = timezone.now()
+            for delivery in batch:
+                _record_failure(delivery, e, now)
+        else:
+            try:
+                for delivery in batch:
+                    try:
+                        send(delivery, connection)
+                    except Exception as e:
+                        _record_failure(delivery, e, timezone.now())
+                    else:
+                        delivery.status = delivery.STATUS_SENT
+                        delivery.sent = timezone.now()
+                        delivery.attempts += 1
+                        delivery.last_error = ""
+            finally:
+                connection.close()
+        queryset.model.objects.bulk_update(
+            batch, ["status", "attempts", "next_attempt", "last_error", "sent"]
+        )
+        return len(batch)
+
+
+def deliver_due(queryset, send, batch_size=None):
+    """
+    Deliver all due entries of ``queryset`` in batches of ``batch_size``,
+    defaulting to ``OUTBOX_BATCH_SIZE``. Returns the number of deliveries
+    that have been processed.
+
+    Rows are locked while their batch is sent and locked rows are skipped, so
+    several workers can drain the outbox concurrently.
+    """
+    if batch_size is None:
+        batch_size = settings.OUTBOX_BATCH_SIZE
+    processed = 0
+    while True:
+        count = _deliver_batch(queryset, batch_size, send)
+        processed += count
+        if count < batch_size:
+            return processed
+
+
+def _send_queued_email(mail, connection):
+    mail.to_message(connection).send()
+
+
+def send_queued_mail(batch_size=None):
+    """
+    Send all due mails from the outbox in batches of ``batch_size`` mails
+    over one connection per batch. Returns the number of mails that have been
+    processed.
+    """
+    return deliver_due(QueuedEmail.objects.all(), _send_queued_email, batch_size)
@@ -0,0 +1,35 @@
+"""
+Send the due mails and bulk mail chunks from the outbox. This is an
+alternative to the scheduled job for installations that do not set
+``RUN_SCHEDULED_JOBS``.
+
+"""
+from django.core.management import BaseCommand, CommandError
+
+from outbox.bulk import send_bulk_mail
+from outbox.mail import send_queued_mail
+
+
+class Command(BaseCommand):
+    help = "Send the due mails and bulk mail chunks from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Number of mails or bulk mail chunks to send over one SMTP"
+            " connection",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size is not None and batch_size < 1:
+            raise CommandError("--batch-size must be positive")
+        mails = send_queued_mail(batch_size)
+        chunks = send_bulk_mail(batch_size)
+        if options["verbosity"] > 0:
+            self.stdout.write(
+                "processed {} queued mails and {} bulk mail chunks".format(
+                    mails, chunks
+                )
+            )
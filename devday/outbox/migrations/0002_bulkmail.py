@@ -0,0 +1,64 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:17
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BulkMail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('subject', models.TextField(verbose_name='subject')),
+                ('html_body', models.TextField(verbose_name='HTML body')),
+                ('recipient_label', models.CharField(max_length=255, verbose_name='recipients')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='created by')),
+            ],
+            options={
+                'verbose_name': 'Bulk mail',
+                'verbose_name_plural': 'Bulk mails',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BulkMailChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('sent', 'sent'), ('failed', 'failed')], default='pending', max_length=10, verbose_name='status')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='delivery attempts')),
+                ('next_attempt', models.DateTimeField(default=django.utils.timezone.now, verbose_name='next attempt')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='sent')),
+                ('number', models.PositiveIntegerField(verbose_name='number')),
+                ('recipients', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=254), size=None, verbose_name='recipients')),
+                ('recipient_count', models.PositiveIntegerField(verbose_name='number of recipients')),
+                ('bulk_mail', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='outbox.BulkMail')),
+            ],
+            options={
+                'verbose_name': 'Bulk mail chunk',
+                'verbose_name_plural': 'Bulk mail chunks',
+                'ordering': ['bulk_mail', 'number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bulkmailchunk',
+            index=models.Index(fields=['status', 'next_attempt'], name='outbox_bulk_status_88c236_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bulkmailchunk',
+            unique_together={('bulk_mail', 'number')},
+        ),
+    ]
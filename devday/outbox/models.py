@@ -0,0 +1,164 @@
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+from model_utils.models import TimeStampedModel
+
+
+class DeliveryQuerySet(models.QuerySet):
+    def due(self):
+        """
+        Return the pending deliveries whose next attempt is due.
+        """
+        return self.filter(
+            status=self.model.STATUS_PENDING, next_attempt__lte=timezone.now()
+        )
+
+
+class DeliveryState(models.Model):
+    """
+    Delivery state of a mail or a chunk of a bulk mail.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_SENT = "sent"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_PENDING, _("pending")),
+        (STATUS_SENT, _("sent")),
+        (STATUS_FAILED, _("failed")),
+    )
+
+    status = models.CharField(
+        _("status"), max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(_("delivery attempts"), default=0)
+    next_attempt = models.DateTimeField(_("next attempt"), default=timezone.now)
+    last_error = models.TextField(_("last error"), blank=True)
+    sent = models.DateTimeField(_("sent"), null=True, blank=True)
+
+    objects = DeliveryQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class QueuedEmail(DeliveryState, TimeStampedModel):
+    subject = models.TextField(_("subject"))
+    body = models.TextField(_("body"))
+    html_body = models.TextField(_("HTML body"), blank=True)
+    from_email = models.CharField(_("sender"), max_length=254)
+    to = ArrayField(models.CharField(max_length=254), verbose_name=_("recipients"))
+    cc = ArrayField(
+        models.CharField(max_length=254), verbose_name=_("CC"), blank=True, default=list
+    )
+    bcc = ArrayField(
+        models.CharField(max_length=254),
+        verbose_name=_("BCC"),
+        blank=True,
+        default=list,
+    )
+    reply_to = ArrayField(
+        models.CharField(max_length=254),
+        verbose_name=_("reply to"),
+        blank=True,
+        default=list,
+    )
+    headers = JSONField(_("extra headers"), blank=True, default=dict)
+
+    class Meta:
+        verbose_name = _("Queued email")
+        verbose_name_plural = _("Queued emails")
+        ordering = ["-created"]
+        indexes = [models.Index(fields=["status", "next_attempt"])]
+
+    def __str__(self):
+        return "{} to {}".format(self.subject, ", ".join(self.to))
+
+    def to_message(self, connection=None):
+        """
+        Return an :py:class:`EmailMultiAlternatives` instance for this mail.
+        """
+        message = EmailMultiAlternatives(
+            subject=self.subject,
+            body=self.body,
+            from_email=self.from_email,
+            to=self.to,
+            cc=self.cc,
+            bcc=self.bcc,
+            reply_to=self.reply_to,
+            headers=self.headers,
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body, "text/html")
+        return message
+
+
+class BulkMail(TimeStampedModel):
+    """
+    A HTML mail to a large group of recipients. The recipients are split into
+    chunks that are delivered independently.
+    """
+
+    subject = models.TextField(_("subject"))
+    html_body = models.TextField(_("HTML body"))
+    recipient_label = models.CharField(_("recipients"), max_length=255)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        verbose_name=_("created by"),
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+
+    class Meta:
+        verbose_name = _("Bulk mail")
+        verbose_name_plural = _("Bulk mails")
+        ordering = ["-created"]
+
+    def __str__(self):
+        return "{} to {}".format(self.subject, self.recipient_label)
+
+    def get_progress(self):
+        """
+        Return the number of chunks and recipients per delivery status.
+        """
+        aggregates = {}
+        for status, _label in BulkMailChunk.STATUS_CHOICES:
+            aggregates["{}_chunks".format(status)] = Count(
+                "id", filter=Q(status=status)
+            )
+            aggregates["{}_recipients".format(status)] = Sum(
+                "recipient_count", filter=Q(status=status)
+            )
+        progress = self.chunks.aggregate(
+            total_chunks=Count("id"),
+            total_recipients=Sum("recipient_count"),
+            **aggregates
+        )
+        return {key: value or 0 for key, value in progress.items()}
+
+
+class BulkMailChunk(DeliveryState):
+    bulk_mail = models.ForeignKey(
+        BulkMail, related_name="chunks", on_delete=models.CASCADE
+    )
+    number = models.PositiveIntegerField(_("number"))
+    recipients = ArrayField(
+        models.CharField(max_length=254), verbose_name=_("recipients")
+    )
+    recipient_count = models.PositiveIntegerField(_("number of recipients"))
+
+    class Meta:
+        verbose_name = _("Bulk mail chunk")
+        verbose_name_plural = _("Bulk mail chunks")
+        ordering = ["bulk_mail", "number"]
+        unique_together = [("bulk_mail", "number")]
+        indexes = [models.Index(fields=["status", "next_attempt"])]
+
+    def __str__(self):
+        return "{} #{}".format(self.bulk_mail, self.number)
@@ -0,0 +1,34 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from attendee.tests import attendee_testutils
+from outbox.mail import queue_mail
+from outbox.models import QueuedEmail
+
+
+class QueuedEmailAdminTest(TestCase):
+    def setUp(self):
+        self.user, self.password = attendee_testutils.create_test_user(
+            "admin@example.org", is_staff=True, is_superuser=True
+        )
+
+    def test_retry_mails(self):
+        failed = queue_mail("Failed", "Body", None, ["failed@example.org"])
+        sent = queue_mail("Sent", "Body", None, ["sent@example.org"])
+        QueuedEmail.objects.filter(id=failed.id).update(
+            status=QueuedEmail.STATUS_FAILED, attempts=6
+        )
+        QueuedEmail.objects.filter(id=sent.id).update(status=QueuedEmail.STATUS_SENT)
+
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.post(
+            reverse("admin:outbox_queuedemail_changelist"),
+            {"action": "retry_mails", "_selected_action": [failed.id, sent.id]},
+            follow=True,
+        )
+        self.assertContains(response, "One mail has been scheduled for delivery.")
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, QueuedEmail.STATUS_PENDING)
+        self.assertEqual(failed.attempts, 0)
+        sent.refresh_from_db()
+        self.assertEqual(sent.status, QueuedEmail.STATUS_SENT)
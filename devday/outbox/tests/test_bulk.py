@@ -0,0 +1,127 @@
+from smtplib import SMTPRecipientsRefused
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from attendee.tests import attendee_testutils
+from devday.utils.html_mail import DevDayEmailMessage
+from outbox import bulk
+from outbox.bulk import deduplicate_recipients, queue_bulk_mail, send_bulk_mail
+from outbox.models import BulkMailChunk
+
+
+class DeduplicateRecipientsTest(TestCase):
+    def test_deduplicate_recipients(self):
+        self.assertEqual(
+            deduplicate_recipients(
+                [
+                    "b@example.org",
+                    " a@example.org",
+                    "",
+                    "B@example.org",
+                    "c@example.org",
+                ]
+            ),
+            ["b@example.org", "a@example.org", "c@example.org"],
+        )
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3)
+class BulkMailTest(TestCase):
+    def setUp(self):
+        self.user, _ = attendee_testutils.create_test_user(
+            "staff@example.org", is_staff=True
+        )
+        self.recipients = ["test{}@example.org".format(i) for i in range(5)]
+
+    def queue(self, chunk_size=2):
+        return queue_bulk_mail(
+            "Newsletter",
+            "<p>Hello <b>world</b></p>",
+            self.recipients + ["test0@example.org"],
+            "test recipients",
+            created_by=self.user,
+            chunk_size=chunk_size,
+        )
+
+    def test_queue_bulk_mail(self):
+        bulk_mail = self.queue()
+        self.assertEqual(
+            list(bulk_mail.chunks.values_list("number", "recipients")),
+            [
+                (1, ["test0@example.org", "test1@example.org"]),
+                (2, ["test2@example.org", "test3@example.org"]),
+                (3, ["test4@example.org"]),
+            ],
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        progress = bulk_mail.get_progress()
+        self.assertEqual(progress["total_chunks"], 3)
+        self.assertEqual(progress["total_recipients"], 5)
+        self.assertEqual(progress["pending_recipients"], 5)
+        self.assertEqual(progress["sent_recipients"], 0)
+
+    def test_send_bulk_mail(self):
+        bulk_mail = self.queue()
+        with mock.patch.object(
+            bulk, "create_html_mail", wraps=bulk.create_html_mail
+        ) as create_html_mail:
+            self.assertEqual(send_bulk_mail(batch_size=2), 3)
+        # the message is built once for all chunks
+        create_html_mail.assert_called_once_with(
+            "Newsletter", "<p>Hello <b>world</b></p>"
+        )
+        self.assertEqual(
+            [msg.recipients() for msg in mail.outbox],
+            [
+                ["test0@example.org", "test1@example.org"],
+                ["test2@example.org", "test3@example.org"],
+                ["test4@example.org"],
+            ],
+        )
+        for msg in mail.outbox:
+            self.assertIsInstance(msg, DevDayEmailMessage)
+            self.assertEqual(msg.subject, "Newsletter")
+        progress = bulk_mail.get_progress()
+        self.assertEqual(progress["sent_chunks"], 3)
+        self.assertEqual(progress["sent_recipients"], 5)
+        self.assertEqual(send_bulk_mail(), 0)
+
+    @override_settings(RUN_SCHEDULED_JOBS=False)
+    def test_not_sent_in_request(self):
+        with mock.patch(
+            "outbox.mail.transaction.on_commit", side_effect=lambda func: func()
+        ):
+            bulk_mail = self.queue()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(bulk_mail.get_progress()["sent_recipients"], 0)
+
+    def test_failed_chunk_does_not_affect_others(self):
+        bulk_mail = self.queue()
+        original_send = DevDayEmailMessage.send
+
+        def send(message, *args, **kwargs):
+            if "test2@example.org" in message.recipients():
+                raise SMTPRecipientsRefused({"test2@example.org": (550, b"unknown")})
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(DevDayEmailMessage, "send", send):
+            self.assertEqual(send_bulk_mail(), 3)
+        self.assertEqual(len(mail.outbox), 2)
+        failed = bulk_mail.chunks.get(number=2)
+        self.assertEqual(failed.status, BulkMailChunk.STATUS_PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", failed.last_error)
+        progress = bulk_mail.get_progress()
+        self.assertEqual(progress["sent_recipients"], 3)
+        self.assertEqual(progress["pending_recipients"], 2)
+
+        # the delivery resumes with the remaining chunk
+        bulk_mail.chunks.filter(number=2).update(next_attempt=timezone.now())
+        self.assertEqual(send_bulk_mail(), 1)
+        self.assertEqual(
+            mail.outbox[-1].recipients(), ["test2@example.org", "test3@example.org"]
+        )
+        self.assertEqual(bulk_mail.get_progress()["sent_chunks"], 3)
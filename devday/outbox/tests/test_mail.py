@@ -0,0 +1,191 @@
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from outbox.mail import (
+    get_retry_delay,
+    queue_mail,
+    queue_message,
+    send_queued_mail,
+)
+from outbox.models import QueuedEmail
+
+
+class CountingBackend(EmailBackend):
+    opened = 0
+
+    def open(self):
+        CountingBackend.opened += 1
+        return super().open()
+
+
+class FailingOpenBackend(EmailBackend):
+    def open(self):
+        raise SMTPServerDisconnected("relay unavailable")
+
+
+class QueueMailTest(TestCase):
+    def test_queue_mail(self):
+        queued = queue_mail(
+            "Subject", "Body", None, ["test@example.org"], html_message="<p>Body</p>"
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedEmail.STATUS_PENDING)
+        self.assertEqual(queued.from_email, "info@devday.de")
+        self.assertEqual(queued.to, ["test@example.org"])
+        self.assertEqual(queued.html_body, "<p>Body</p>")
+
+    def test_queue_message(self):
+        message = EmailMultiAlternatives(
+            subject="Subject",
+            body="Body",
+            from_email="sender@example.org",
+            to=["to@example.org"],
+            cc=["cc@example.org"],
+            bcc=["bcc@example.org"],
+            reply_to=["reply@example.org"],
+            headers={"From": "info@example.org"},
+        )
+        message.attach_alternative("<p>Body</p>", "text/html")
+        queued = queue_message(message)
+        queued.refresh_from_db()
+        self.assertEqual(queued.cc, ["cc@example.org"])
+        self.assertEqual(queued.bcc, ["bcc@example.org"])
+        self.assertEqual(queued.reply_to, ["reply@example.org"])
+        self.assertEqual(queued.headers, {"From": "info@example.org"})
+        self.assertEqual(queued.html_body, "<p>Body</p>")
+
+    def test_queue_message_with_attachment(self):
+        message = EmailMessage("Subject", "Body", to=["to@example.org"])
+        message.attach("test.txt", "content", "text/plain")
+        with self.assertRaises(ValueError):
+            queue_message(message)
+        self.assertFalse(QueuedEmail.objects.exists())
+
+    @override_settings(RUN_SCHEDULED_JOBS=False)
+    def test_not_sent_in_request(self):
+        with mock.patch(
+            "outbox.mail.transaction.on_commit", side_effect=lambda func: func()
+        ):
+            queued = queue_mail("Subject", "Body", None, ["test@example.org"])
+        self.assertEqual(len(mail.outbox), 0)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedEmail.STATUS_PENDING)
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_DELAY=60)
+class SendQueuedMailTest(TestCase):
+    def queue(self, count):
+        return [
+            queue_mail(
+                "Subject {}".format(index),
+                "Body",
+                None,
+                ["test{}@example.org".format(index)],
+            )
+            for index in range(count)
+        ]
+
+    def test_send_queued_mail(self):
+        queued = self.queue(3)[0]
+        self.assertEqual(send_queued_mail(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(m.subject for m in mail.outbox),
+            ["Subject 0", "Subject 1", "Subject 2"],
+        )
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedEmail.STATUS_SENT)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIsNotNone(queued.sent)
+        self.assertEqual(send_queued_mail(), 0)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_html_body_and_headers(self):
+        message = EmailMessage(
+            "Subject",
+            "Body",
+            "sender@example.org",
+            ["to@example.org"],
+            reply_to=["reply@example.org"],
+            headers={"From": "info@example.org"},
+        )
+        queue_message(message)
+        queue_mail("HTML", "Text", None, ["to@example.org"], html_message="<p>x</p>")
+        send_queued_mail()
+        sent = {m.subject: m for m in mail.outbox}
+        self.assertEqual(sent["Subject"].reply_to, ["reply@example.org"])
+        self.assertIn("From: info@example.org", sent["Subject"].message().as_string())
+        self.assertEqual(sent["HTML"].alternatives, [("<p>x</p>", "text/html")])
+
+    @override_settings(EMAIL_BACKEND="outbox.tests.test_mail.CountingBackend")
+    def test_batches_share_a_connection(self):
+        CountingBackend.opened = 0
+        self.queue(5)
+        self.assertEqual(send_queued_mail(batch_size=2), 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 3)
+
+    def test_future_mails_are_not_sent(self):
+        queued = self.queue(1)[0]
+        QueuedEmail.objects.filter(id=queued.id).update(
+            next_attempt=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(send_queued_mail(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_retry_with_backoff(self):
+        failing, working = self.queue(2)
+        original_send = EmailMessage.send
+
+        def send(message, *args, **kwargs):
+            if message.to == failing.to:
+                raise SMTPRecipientsRefused({failing.to[0]: (550, b"unknown")})
+            return original_send(message, *args, **kwargs)
+
+        with mock.patch.object(EmailMessage, "send", send):
+            before = timezone.now()
+            self.assertEqual(send_queued_mail(), 2)
+        self.assertEqual(len(mail.outbox), 1)
+        failing.refresh_from_db()
+        working.refresh_from_db()
+        self.assertEqual(working.status, QueuedEmail.STATUS_SENT)
+        self.assertEqual(failing.status, QueuedEmail.STATUS_PENDING)
+        self.assertEqual(failing.attempts, 1)
+        self.assertIn("SMTPRecipientsRefused", failing.last_error)
+        self.assertGreaterEqual(failing.next_attempt, before + timedelta(seconds=60))
+
+        # not due yet
+        self.assertEqual(send_queued_mail(), 0)
+        QueuedEmail.objects.filter(id=failing.id).update(next_attempt=timezone.now())
+        self.assertEqual(send_queued_mail(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, QueuedEmail.STATUS_SENT)
+        self.assertEqual(failing.attempts, 2)
+        self.assertEqual(failing.last_error, "")
+
+    def test_retry_delay_doubles(self):
+        self.assertEqual(
+            [get_retry_delay(attempts).total_seconds() for attempts in (1, 2, 3)],
+            [60, 120, 240],
+        )
+
+    @override_settings(EMAIL_BACKEND="outbox.tests.test_mail.FailingOpenBackend")
+    def test_give_up_after_max_attempts(self):
+        queued = self.queue(1)[0]
+        for attempt in range(3):
+            QueuedEmail.objects.filter(id=queued.id).update(next_attempt=timezone.now())
+            self.assertEqual(send_queued_mail(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedEmail.STATUS_FAILED)
+        self.assertEqual(queued.attempts, 3)
+        self.assertIn("relay unavailable", queued.last_error)
+        QueuedEmail.objects.filter(id=queued.id).update(next_attempt=timezone.now())
+        self.assertEqual(send_queued_mail(), 0)
@@ -0,0 +1,26 @@
+import io
+
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from outbox.mail import queue_mail
+from outbox.models import QueuedEmail
+
+
+class TestSendQueuedMailCommand(TestCase):
+    def test_send_queued_mail(self):
+        for index in range(3):
+            queue_mail("Subject", "Body", None, ["test{}@example.org".format(index)])
+        outbuf = io.StringIO()
+        call_command("send_queued_mail", "--batch-size", "2", stdout=outbuf)
+        self.assertEqual(
+            "processed 3 queued mails and 0 bulk mail chunks",
+            outbuf.getvalue().strip(),
+        )
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(QueuedEmail.objects.due().exists())
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(CommandError):
+            call_command("send_queued_mail", "--batch-size", "0")
@@ -0,0 +1,108 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from attendee.tests import attendee_testutils
+from outbox.bulk import queue_bulk_mail
+from outbox.mail import queue_mail
+from outbox.models import BulkMailChunk, QueuedEmail
+
+
+class OutboxStatusViewTest(TestCase):
+    def setUp(self):
+        self.url = reverse("outbox_status")
+        self.user, self.password = attendee_testutils.create_test_user(
+            "staff@example.org", is_staff=True
+        )
+
+    def test_needs_staff(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, "/accounts/login/?next={}".format(self.url))
+
+        user, password = attendee_testutils.create_test_user()
+        self.client.login(username=user.get_username(), password=password)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_context_data(self):
+        queue_mail("Pending", "Body", None, ["pending@example.org"])
+        retrying = queue_mail("Retrying", "Body", None, ["retry@example.org"])
+        failed = queue_mail("Failed", "Body", None, ["failed@example.org"])
+        sent = queue_mail("Sent", "Body", None, ["sent@example.org"])
+        QueuedEmail.objects.filter(id=retrying.id).update(
+            attempts=1, last_error="SMTPServerDisconnected: timeout"
+        )
+        QueuedEmail.objects.filter(id=failed.id).update(
+            status=QueuedEmail.STATUS_FAILED, attempts=6
+        )
+        QueuedEmail.objects.filter(id=sent.id).update(
+            status=QueuedEmail.STATUS_SENT, attempts=1
+        )
+
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "outbox/status.html")
+        self.assertEqual(
+            [count for _, count in response.context["status_counts"]], [2, 1, 1]
+        )
+        self.assertEqual(response.context["due_count"], 2)
+        self.assertIsNotNone(response.context["oldest_pending"])
+        self.assertEqual(
+            {mail.subject for mail in response.context["problems"]},
+            {"Retrying", "Failed"},
+        )
+        self.assertContains(response, "SMTPServerDisconnected: timeout")
+
+
+class BulkMailProgressViewTest(TestCase):
+    def setUp(self):
+        self.user, self.password = attendee_testutils.create_test_user(
+            "staff@example.org", is_staff=True
+        )
+        self.bulk_mail = queue_bulk_mail(
+            "Newsletter",
+            "<p>Hello</p>",
+            ["test{}@example.org".format(i) for i in range(5)],
+            "test recipients",
+            chunk_size=2,
+        )
+        self.url = reverse("bulk_mail_progress", kwargs={"pk": self.bulk_mail.pk})
+
+    def test_needs_staff(self):
+        response = self.client.get(self.url)
+        self.assertRedirects(response, "/accounts/login/?next={}".format(self.url))
+
+    def test_progress(self):
+        self.bulk_mail.chunks.filter(number=1).update(status=BulkMailChunk.STATUS_SENT)
+        self.bulk_mail.chunks.filter(number=2).update(
+            status=BulkMailChunk.STATUS_FAILED, attempts=6, last_error="timeout"
+        )
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "outbox/bulkmail_progress.html")
+        progress = response.context["progress"]
+        self.assertEqual(progress["sent_recipients"], 2)
+        self.assertEqual(progress["failed_recipients"], 2)
+        self.assertEqual(progress["pending_recipients"], 1)
+        self.assertFalse(response.context["finished"])
+        self.assertContains(response, 'http-equiv="refresh"')
+        self.assertContains(response, "timeout")
+
+    def test_finished(self):
+        self.bulk_mail.chunks.update(status=BulkMailChunk.STATUS_SENT)
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.get(self.url)
+        self.assertTrue(response.context["finished"])
+        self.assertNotContains(response, 'http-equiv="refresh"')
+
+    def test_retry_failed_chunks(self):
+        self.bulk_mail.chunks.filter(number=2).update(
+            status=BulkMailChunk.STATUS_FAILED, attempts=6
+        )
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.post(self.url)
+        self.assertRedirects(response, self.url)
+        chunk = self.bulk_mail.chunks.get(number=2)
+        self.assertEqual(chunk.status, BulkMailChunk.STATUS_PENDING)
+        self.assertEqual(chunk.attempts, 0)
@@ -0,0 +1,73 @@
+from django.db.models import Count, Min
+from django.shortcuts import redirect
+from django.utils import timezone
+from django.views.generic import DetailView, TemplateView
+
+from attendee.views import StaffUserMixin
+from outbox.models import BulkMail, BulkMailChunk, QueuedEmail
+
+
+class OutboxStatusView(StaffUserMixin, TemplateView):
+    """
+    Show the delivery state of the mail outbox.
+    """
+
+    template_name = "outbox/status.html"
+    problem_limit = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        counts = dict(
+            QueuedEmail.objects.order_by()
+            .values_list("status")
+            .annotate(count=Count("id"))
+        )
+        context.update(
+            {
+                "status_counts": [
+                    (label, counts.get(status, 0))
+                    for status, label in QueuedEmail.STATUS_CHOICES
+                ],
+                "due_count": QueuedEmail.objects.due().count(),
+                "oldest_pending": QueuedEmail.objects.filter(
+                    status=QueuedEmail.STATUS_PENDING
+                ).aggregate(oldest=Min("created"))["oldest"],
+                "problems": QueuedEmail.objects.filter(attempts__gt=0)
+                .exclude(status=QueuedEmail.STATUS_SENT)
+                .order_by("-created")[: self.problem_limit],
+            }
+        )
+        return context
+
+
+class BulkMailProgressView(StaffUserMixin, DetailView):
+    """
+    Show the delivery progress of a bulk mail. Posting to this view schedules
+    the failed chunks for another delivery attempt.
+    """
+
+    model = BulkMail
+    template_name = "outbox/bulkmail_progress.html"
+    refresh_interval = 5
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        progress = self.object.get_progress()
+        context.update(
+            {
+                "progress": progress,
+                "finished": progress["pending_chunks"] == 0,
+                "refresh_interval": self.refresh_interval,
+                "failed_chunks": self.object.chunks.filter(
+                    status=BulkMailChunk.STATUS_FAILED
+                ),
+            }
+        )
+        return context
+
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        self.object.chunks.filter(status=BulkMailChunk.STATUS_FAILED).update(
+            status=BulkMailChunk.STATUS_PENDING, attempts=0, next_attempt=timezone.now()
+        )
+        return redirect("bulk_mail_progress", pk=self.object.pk)
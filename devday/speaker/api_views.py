@@ -1,5 +1,6 @@
 from rest_framework import serializers, viewsets
 
+from devday.api import ApiCursorPagination, ConditionalGetMixin, EventFilterMixin
 from speaker.models import Speaker
 
 
@@ -25,7 +26,12 @@ class SpeakerSerializer(serializers.HyperlinkedModelSerializer):
         return representation
 
 
-class SpeakerViewSet(viewsets.ReadOnlyModelViewSet):
+class SpeakerViewSet(
+    ConditionalGetMixin, EventFilterMixin, viewsets.ReadOnlyModelViewSet
+):
     queryset = Speaker.objects.all()
     serializer_class = SpeakerSerializer
+    pagination_class = ApiCursorPagination
+    api_version = "speakers"
+    event_filter = "publishedspeaker__event__slug"
     lookup_field = "slug"
@@ -1,7 +1,26 @@
 from django.apps import AppConfig
+from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
 
 class SpeakerConfig(AppConfig):
     name = 'speaker'
     verbose_name = _('Speaker management')
+
+    def ready(self):
+        # noinspection PyUnresolvedReferences
+        # This import is needed for signal handling
+        import speaker.images
+
+        if settings.RUN_SCHEDULED_JOBS:
+            from devday.apps import get_scheduler
+
+            get_scheduler().add_job(
+                speaker.images.speaker_images_job,
+                'interval',
+                seconds=settings.SPEAKER_IMAGE_INTERVAL,
+                id='process_speaker_images',
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1,
+            )
@@ -0,0 +1,277 @@
+"""
+Background creation of the images derived from speaker portraits.
+
+Saving a speaker or a published speaker with a changed portrait deletes the
+derived images, see :py:func:`speaker.models.check_derived_images`, and
+leaves the speaker pending until :py:func:`process_pending_speaker_images`
+has created the variants configured in ``SPEAKER_IMAGE_VARIANTS``. Templates
+show a placeholder in the meantime.
+
+Pending images are processed in the scheduler right after the portrait has
+been saved and periodically if ``RUN_SCHEDULED_JOBS`` is set. Otherwise only
+the images of the saved speaker are created in the saving process once the
+transaction has been committed. The images of other pending speakers and
+variants that have been added to ``SPEAKER_IMAGE_VARIANTS`` later are created
+by the ``process_speaker_images`` management command. The command decodes the
+portraits in a pool of ``SPEAKER_IMAGE_WORKERS`` processes. The pool is not
+used inside the web server because spawned workers are started from
+``sys.executable``, which is the uwsgi binary there.
+
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, models, transaction
+from django.dispatch import receiver
+
+from devday.apps import get_scheduler
+from speaker.imaging import render_variants
+from speaker.models import (
+    PublishedSpeaker,
+    Speaker,
+    get_pil_type_and_extension,
+    get_portrait_key,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """
+    Return the process pool that renders the derived images. The workers are
+    spawned instead of forked to not inherit the database connections and
+    threads of the Django process.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.SPEAKER_IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _reset_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def get_pending_speakers(model):
+    return model.objects.exclude(portrait="").filter(derived_images_key="")
+
+
+def _get_source(portrait):
+    """
+    Return the file name of the portrait if it is stored in the local file
+    system to avoid passing the data to the worker process.
+    """
+    try:
+        return portrait.path
+    except NotImplementedError:
+        with portrait.open("rb") as f:
+            return f.read()
+
+
+def _render(sources, use_pool):
+    """
+    Render the variants for a list of ``(source, pil_type)`` tuples and return
+    a list of dictionaries of encoded images or the raised exceptions.
+    """
+    args = (settings.SPEAKER_IMAGE_VARIANTS, settings.SPEAKER_PORTRAIT_MAX_PIXELS)
+    if not use_pool or not settings.SPEAKER_IMAGE_WORKERS:
+        results = []
+        for source, pil_type in sources:
+            try:
+                results.append(render_variants(source, pil_type, *args))
+            except Exception as e:
+                results.append(e)
+        return results
+    futures = [
+        get_executor().submit(render_variants, source, pil_type, *args)
+        for source, pil_type in sources
+    ]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result())
+        except BrokenProcessPool as e:
+            # a worker died, e.g. because it ran out of memory
+            _reset_executor()
+            results.append(e)
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def _store_variants(instance, key, rendered):
+    """
+    Save the rendered variants unless the portrait has been changed or the
+    images have been created by another worker in the meantime. Returns
+    whether the images have been saved.
+    """
+    model = type(instance)
+    with transaction.atomic():
+        current = model.objects.select_for_update().filter(pk=instance.pk).first()
+        if (
+            current is None
+            or current.portrait.name != instance.portrait.name
+            or current.derived_images_key
+        ):
+            return False
+        basename = os.path.splitext(os.path.basename(current.portrait.name))[0]
+        _, extension = get_pil_type_and_extension(current.portrait.name)
+        update_fields = ["derived_images_key"]
+        for field_name, data in rendered.items():
+            field = model._meta.get_field(field_name)
+            update_fields.extend(
+                name
+                for name in (field_name, field.width_field, field.height_field)
+                if name
+            )
+            derived_image = getattr(current, field_name)
+            if derived_image:
+                derived_image.delete(save=False)
+            derived_image.save(
+                "{}_{}.{}".format(basename, field_name, extension),
+                ContentFile(data),
+                save=False,
+            )
+        current.derived_images_key = key
+        current.save(update_fields=update_fields)
+    return True
+
+
+def _process_batch(batch, use_pool):
+    jobs = []
+    for instance in batch:
+        try:
+            pil_type, _ = get_pil_type_and_extension(instance.portrait.name)
+            jobs.append(
+                (
+                    instance,
+                    get_portrait_key(instance.portrait),
+                    (_get_source(instance.portrait), pil_type),
+                )
+            )
+        except Exception:
+            logger.exception(
+                "cannot read portrait of %s %d",
+                instance._meta.model_name,
+                instance.pk,
+            )
+    results = _render([source for _instance, _key, source in jobs], use_pool)
+    processed = 0
+    for (instance, key, _source), rendered in zip(jobs, results):
+        if isinstance(rendered, Exception):
+            logger.error(
+                "cannot create images for %s %d: %s",
+                instance._meta.model_name,
+                instance.pk,
+                rendered,
+            )
+            # do not try again until the portrait is saved again
+            type(instance).objects.filter(
+                pk=instance.pk, portrait=instance.portrait.name
+            ).update(derived_images_key=key)
+        elif _store_variants(instance, key, rendered):
+            processed += 1
+    return processed
+
+
+def process_pending_speaker_images(use_pool=False):
+    """
+    Create the derived images of all pending speakers and published speakers.
+    With ``use_pool`` the portraits are rendered in the process pool in
+    batches of one portrait per worker, otherwise one by one in the calling
+    process. Returns the number of speakers and published speakers that have
+    been processed.
+    """
+    batch_size = max(settings.SPEAKER_IMAGE_WORKERS, 1) if use_pool else 1
+    processed = 0
+    for model in (Speaker, PublishedSpeaker):
+        last_pk = 0
+        while True:
+            batch = list(
+                get_pending_speakers(model)
+                .filter(pk__gt=last_pk)
+                .order_by("pk")[:batch_size]
+            )
+            if not batch:
+                break
+            processed += _process_batch(batch, use_pool)
+            last_pk = batch[-1].pk
+    return processed
+
+
+def speaker_images_job():
+    """
+    Scheduled job wrapper of :py:func:`process_pending_speaker_images` that
+    closes the scheduler thread's database connection when done.
+    """
+    try:
+        process_pending_speaker_images()
+    except Exception:
+        logger.exception("processing speaker images failed")
+    finally:
+        connections.close_all()
+
+
+def process_speaker_images(model, pk):
+    """
+    Create the derived images of a single speaker or published speaker in the
+    calling process if they are still pending. Returns whether the images
+    have been created.
+    """
+    instance = get_pending_speakers(model).filter(pk=pk).first()
+    if instance is None:
+        return False
+    return _process_batch([instance], use_pool=False) == 1
+
+
+def schedule_speaker_images(instance):
+    """
+    Run :py:func:`speaker_images_job` in the scheduler right away. A job that
+    is already running is not started twice, the periodic job picks up the
+    images that are left.
+
+    Without a scheduler only the images of ``instance`` are created in the
+    calling process, failures are logged instead of breaking the committed
+    request.
+    """
+    if settings.RUN_SCHEDULED_JOBS:
+        get_scheduler().add_job(
+            speaker_images_job, id="process_speaker_images_now", replace_existing=True
+        )
+        return
+    try:
+        process_speaker_images(type(instance), instance.pk)
+    except Exception:
+        logger.exception(
+            "processing images of %s %d failed",
+            instance._meta.model_name,
+            instance.pk,
+        )
+
+
+@receiver(
+    models.signals.post_save,
+    sender=Speaker,
+    dispatch_uid="schedule_derived_speaker_images",
+)
+@receiver(
+    models.signals.post_save,
+    sender=PublishedSpeaker,
+    dispatch_uid="schedule_derived_published_speaker_images",
+)
+def schedule_derived_images(sender, instance, **kwargs):
+    if instance.derived_images_pending:
+        transaction.on_commit(lambda: schedule_speaker_images(instance))
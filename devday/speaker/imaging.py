@@ -0,0 +1,75 @@
+"""
+Rendering of the derived speaker images from a portrait.
+
+This module only depends on Pillow so that :py:func:`render_variants` can run
+in the worker processes started by :py:mod:`speaker.images` without setting
+up Django.
+
+"""
+import math
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+
+def get_required_scale(size, variants):
+    """
+    Return the smallest factor the portrait of the given size can be scaled
+    down by without scaling up any of the variants afterwards.
+    """
+    width, height = size
+    scale = 0
+    for variant in variants.values():
+        scale = max(scale, variant["height"] / height)
+        if "width" in variant:
+            scale = max(scale, variant["width"] / width)
+    return scale
+
+
+def render_variant(image, variant):
+    """
+    Scale the image for a variant. Variants with a width are scaled and
+    cropped to the exact size, variants without a width are scaled to the
+    height keeping the aspect ratio.
+    """
+    if "width" in variant:
+        return ImageOps.fit(image, (variant["width"], variant["height"]))
+    scaled = image.copy()
+    scaled.thumbnail(
+        (int(variant["height"] * image.width / image.height), variant["height"]),
+        Image.LANCZOS,
+    )
+    return scaled
+
+
+def render_variants(source, pil_type, variants, max_pixels=None):
+    """
+    Decode the portrait from ``source``, a file name or the image data, once
+    and return a dictionary mapping the names of ``variants`` to the encoded
+    images.
+
+    JPEG portraits are decoded in draft mode at the smallest DCT scale that
+    is still large enough for all variants, which keeps the memory usage for
+    large photos low. Portraits with more than ``max_pixels`` pixels are
+    rejected before decoding.
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+    with Image.open(source) as image:
+        if max_pixels and image.width * image.height > max_pixels:
+            raise ValueError(
+                "portrait of {}x{} pixels is too large".format(*image.size)
+            )
+        scale = get_required_scale(image.size, variants)
+        if scale < 1:
+            image.draft(
+                image.mode,
+                (math.ceil(image.width * scale), math.ceil(image.height * scale)),
+            )
+        image.load()
+        rendered = {}
+        for name, variant in variants.items():
+            buffer = BytesIO()
+            render_variant(image, variant).save(buffer, pil_type)
+            rendered[name] = buffer.getvalue()
+        return rendered
@@ -0,0 +1,137 @@
+"""
+Move speaker images into the content addressed storage and delete image
+files that are not referenced anymore.
+
+Images of speakers and published speakers that have been stored before
+``speaker_image_storage`` was introduced are stored again under the hash of
+their content, so identical images share one file afterwards. Files below the
+speaker image directories that are referenced by no speaker or published
+speaker are deleted if they are older than ``--min-age`` seconds to not
+remove uploads that are not committed yet.
+
+"""
+import os
+from datetime import timedelta
+
+from django.core.management import BaseCommand
+from django.db.models import ImageField
+from django.utils import timezone
+
+from devday.api import invalidate_api_versions
+from speaker.models import PublishedSpeaker, Speaker, speaker_image_storage
+
+# directories used for speaker images before the content addressed storage
+LEGACY_DIRECTORIES = ["speaker_original", "speaker_thumbs", "speaker_public", "speaker"]
+
+
+def get_image_fields(model):
+    return [
+        field for field in model._meta.get_fields() if isinstance(field, ImageField)
+    ]
+
+
+class Command(BaseCommand):
+    help = "Deduplicate speaker images and delete unreferenced image files"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be moved and deleted",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=3600,
+            help="Minimum age in seconds of unreferenced files to be deleted",
+        )
+
+    def get_images(self, model, field):
+        return (
+            model.objects.exclude(**{field.name: ""})
+            .exclude(**{"{}__isnull".format(field.name): True})
+            .values_list("pk", field.name)
+        )
+
+    def dedupe(self, model, field, dry_run):
+        moved = 0
+        for pk, name in self.get_images(model, field).iterator():
+            if speaker_image_storage.is_content_name(name):
+                continue
+            if not dry_run:
+                try:
+                    with speaker_image_storage.open(name) as image:
+                        content_name = speaker_image_storage.save(name, image)
+                except OSError as e:
+                    self.stderr.write(
+                        "cannot read {} of {} {}: {}".format(
+                            field.name, model._meta.model_name, pk, e
+                        )
+                    )
+                    continue
+                model.objects.filter(pk=pk, **{field.name: name}).update(
+                    **{field.name: content_name}
+                )
+            moved += 1
+        return moved
+
+    def get_referenced_names(self):
+        names = set()
+        for model in (Speaker, PublishedSpeaker):
+            for field in get_image_fields(model):
+                names.update(
+                    name for _pk, name in self.get_images(model, field).iterator()
+                )
+        return names
+
+    def walk(self, directory):
+        directories, files = speaker_image_storage.listdir(directory)
+        for name in files:
+            yield "{}/{}".format(directory, name)
+        for name in directories:
+            yield from self.walk("{}/{}".format(directory, name))
+
+    def collect_garbage(self, min_age, dry_run, verbosity):
+        # the modification time is checked after the references have been
+        # loaded: the storage touches a file when it is referenced again, so a
+        # file that got a new reference in the meantime is not old enough
+        referenced = self.get_referenced_names()
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+        deleted = 0
+        for directory in [speaker_image_storage.prefix, *LEGACY_DIRECTORIES]:
+            if not os.path.isdir(speaker_image_storage.path(directory)):
+                continue
+            for name in self.walk(directory):
+                if (
+                    name in referenced
+                    or speaker_image_storage.get_modified_time(name) > cutoff
+                ):
+                    continue
+                if dry_run or verbosity > 1:
+                    self.stdout.write("unreferenced file {}".format(name))
+                if not dry_run:
+                    speaker_image_storage.delete_unreferenced(name)
+                deleted += 1
+        return deleted
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        moved = 0
+        for model in (Speaker, PublishedSpeaker):
+            for field in get_image_fields(model):
+                moved += self.dedupe(model, field, dry_run)
+        if moved and not dry_run:
+            # the image URLs of the API have changed
+            invalidate_api_versions("sessions", "speakers")
+        deleted = self.collect_garbage(
+            options["min_age"], dry_run, options["verbosity"]
+        )
+        if options["verbosity"] > 0:
+            self.stdout.write(
+                "{} {} images and {} {} unreferenced files".format(
+                    "would move" if dry_run else "moved",
+                    moved,
+                    "would delete" if dry_run else "deleted",
+                    deleted,
+                )
+            )
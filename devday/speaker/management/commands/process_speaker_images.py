@@ -0,0 +1,32 @@
+"""
+Create the pending derived images of speakers and published speakers in a pool
+of ``SPEAKER_IMAGE_WORKERS`` processes. With ``--all`` the images of all
+speakers are created again, e.g. after ``SPEAKER_IMAGE_VARIANTS`` has been
+changed. Installations that do not set ``RUN_SCHEDULED_JOBS`` only create the
+images of the saved speaker during a request and have to run this command
+after such changes.
+
+"""
+from django.core.management import BaseCommand
+
+from speaker.images import process_pending_speaker_images
+from speaker.models import PublishedSpeaker, Speaker
+
+
+class Command(BaseCommand):
+    help = "Create the pending derived images of speaker portraits"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Create the derived images of all speaker portraits again",
+        )
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            for model in (Speaker, PublishedSpeaker):
+                model.objects.exclude(portrait="").update(derived_images_key="")
+        processed = process_pending_speaker_images(use_pool=True)
+        if options["verbosity"] > 0:
+            self.stdout.write("processed {} speaker portraits".format(processed))
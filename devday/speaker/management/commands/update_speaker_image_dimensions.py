@@ -0,0 +1,55 @@
+"""
+Store the width and the height of speaker images that have been uploaded or
+created before the dimension fields existed. With ``--all`` the dimensions of
+all speaker images are read again.
+
+"""
+from django.core.files.images import get_image_dimensions
+from django.core.management import BaseCommand
+from django.db.models import ImageField
+
+from speaker.models import PublishedSpeaker, Speaker
+
+
+class Command(BaseCommand):
+    help = "Store the width and the height of speaker images"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Read the dimensions of images that have dimensions already",
+        )
+
+    def update_dimensions(self, model, field, update_all):
+        queryset = model.objects.exclude(**{field.name: ""}).exclude(
+            **{"{}__isnull".format(field.name): True}
+        )
+        if not update_all:
+            queryset = queryset.filter(**{"{}__isnull".format(field.width_field): True})
+        updated = 0
+        for pk, name in queryset.values_list("pk", field.name).iterator():
+            try:
+                with field.storage.open(name) as image:
+                    width, height = get_image_dimensions(image)
+            except OSError as e:
+                self.stderr.write(
+                    "cannot read {} of {} {}: {}".format(
+                        field.name, model._meta.model_name, pk, e
+                    )
+                )
+                continue
+            model.objects.filter(pk=pk).update(
+                **{field.width_field: width, field.height_field: height}
+            )
+            updated += 1
+        return updated
+
+    def handle(self, *args, **options):
+        updated = 0
+        for model in (Speaker, PublishedSpeaker):
+            for field in model._meta.get_fields():
+                if isinstance(field, ImageField) and field.width_field:
+                    updated += self.update_dimensions(model, field, options["all"])
+        if options["verbosity"] > 0:
+            self.stdout.write("updated the dimensions of {} images".format(updated))
@@ -0,0 +1,23 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speaker', '0003_auto_20181019_0948'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='derived_images_key',
+            field=models.CharField(blank=True, editable=False, max_length=56, verbose_name='portrait hash of the derived images'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='derived_images_key',
+            field=models.CharField(blank=True, editable=False, max_length=56, verbose_name='portrait hash of the derived images'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:32
+
+from django.db import migrations, models
+import speaker.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speaker', '0004_speaker_derived_images_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='thumbnail_2x',
+            field=models.ImageField(blank=True, max_length=500, null=True, upload_to=speaker.models.event_speaker_thumbnail_directory, verbose_name='Speaker image thumbnail for high resolution displays'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='thumbnail_2x',
+            field=models.ImageField(blank=True, max_length=500, null=True, upload_to='speaker_thumbs', verbose_name='Speaker image thumbnail for high resolution displays'),
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:37
+
+import devday.extras
+from django.db import migrations, models
+import speaker.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speaker', '0005_speaker_thumbnail_2x'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='portrait_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='portrait height'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='portrait_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='portrait width'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='public_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='public image height'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='public_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='public image width'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='thumbnail_2x_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='high resolution thumbnail height'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='thumbnail_2x_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='high resolution thumbnail width'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='thumbnail_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='thumbnail height'),
+        ),
+        migrations.AddField(
+            model_name='publishedspeaker',
+            name='thumbnail_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='thumbnail width'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='portrait_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='portrait height'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='portrait_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='portrait width'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='public_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='public image height'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='public_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='public image width'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='thumbnail_2x_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='high resolution thumbnail height'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='thumbnail_2x_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='high resolution thumbnail width'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='thumbnail_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='thumbnail height'),
+        ),
+        migrations.AddField(
+            model_name='speaker',
+            name='thumbnail_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='thumbnail width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='portrait',
+            field=devday.extras.ValidatedImageField(height_field='portrait_height', upload_to=speaker.models.event_speaker_image_directory, verbose_name='Speaker image', width_field='portrait_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='public_image',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='public_image_height', max_length=500, null=True, upload_to=speaker.models.event_public_speaker_image_directory, verbose_name='Public speaker image', width_field='public_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='thumbnail',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_height', max_length=500, null=True, upload_to=speaker.models.event_speaker_thumbnail_directory, verbose_name='Speaker image thumbnail', width_field='thumbnail_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='thumbnail_2x',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_2x_height', max_length=500, null=True, upload_to=speaker.models.event_speaker_thumbnail_directory, verbose_name='Speaker image thumbnail for high resolution displays', width_field='thumbnail_2x_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='portrait',
+            field=devday.extras.ValidatedImageField(height_field='portrait_height', upload_to='speaker_original', verbose_name='Speaker image', width_field='portrait_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='public_image',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='public_image_height', max_length=500, null=True, upload_to='speaker_public', verbose_name='Public speaker image', width_field='public_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='thumbnail',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_height', max_length=500, null=True, upload_to='speaker_thumbs', verbose_name='Speaker image thumbnail', width_field='thumbnail_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='thumbnail_2x',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_2x_height', max_length=500, null=True, upload_to='speaker_thumbs', verbose_name='Speaker image thumbnail for high resolution displays', width_field='thumbnail_2x_width'),
+        ),
+    ]
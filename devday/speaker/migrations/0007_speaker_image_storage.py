@@ -0,0 +1,55 @@
+# Generated by Django 2.2.28 on 2026-10-18 08:42
+
+import devday.extras
+from django.db import migrations
+import speaker.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('speaker', '0006_speaker_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='portrait',
+            field=devday.extras.ValidatedImageField(height_field='portrait_height', storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to=speaker.models.event_speaker_image_directory, verbose_name='Speaker image', width_field='portrait_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='public_image',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='public_image_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to=speaker.models.event_public_speaker_image_directory, verbose_name='Public speaker image', width_field='public_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='thumbnail',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to=speaker.models.event_speaker_thumbnail_directory, verbose_name='Speaker image thumbnail', width_field='thumbnail_width'),
+        ),
+        migrations.AlterField(
+            model_name='publishedspeaker',
+            name='thumbnail_2x',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_2x_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to=speaker.models.event_speaker_thumbnail_directory, verbose_name='Speaker image thumbnail for high resolution displays', width_field='thumbnail_2x_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='portrait',
+            field=devday.extras.ValidatedImageField(height_field='portrait_height', storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to='speaker_original', verbose_name='Speaker image', width_field='portrait_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='public_image',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='public_image_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to='speaker_public', verbose_name='Public speaker image', width_field='public_image_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='thumbnail',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to='speaker_thumbs', verbose_name='Speaker image thumbnail', width_field='thumbnail_width'),
+        ),
+        migrations.AlterField(
+            model_name='speaker',
+            name='thumbnail_2x',
+            field=devday.extras.StoredDimensionsImageField(blank=True, height_field='thumbnail_2x_height', max_length=500, null=True, storage=devday.extras.ContentAddressedStorage(prefix='speaker_images'), upload_to='speaker_thumbs', verbose_name='Speaker image thumbnail for high resolution displays', width_field='thumbnail_2x_width'),
+        ),
+    ]
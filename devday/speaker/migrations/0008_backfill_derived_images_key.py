@@ -0,0 +1,57 @@
+import hashlib
+
+from django.db import migrations
+
+from devday.extras import get_content_hash_from_name
+
+# the variants that existed before derived_images_key was introduced
+EXISTING_VARIANTS = ("public_image", "thumbnail")
+
+
+def get_portrait_key(portrait):
+    key = get_content_hash_from_name(portrait.name)
+    if key:
+        return key
+    h = hashlib.sha224()
+    with portrait.open("rb") as f:
+        for chunk in f.chunks():
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def backfill_derived_images_key(apps, schema_editor):
+    """
+    Mark the images of speakers that have been created before
+    derived_images_key was introduced as created, so that the first save of a
+    speaker does not create the images of all speakers again. Variants that
+    are missing, like thumbnail_2x, are created by the process_speaker_images
+    management command with --all.
+    """
+    db_alias = schema_editor.connection.alias
+    for model_name in ("Speaker", "PublishedSpeaker"):
+        model = apps.get_model("speaker", model_name)
+        speakers = model.objects.using(db_alias).exclude(portrait="")
+        for field_name in EXISTING_VARIANTS:
+            speakers = speakers.exclude(**{field_name: ""}).exclude(
+                **{"{}__isnull".format(field_name): True}
+            )
+        for speaker in speakers.filter(derived_images_key="").iterator():
+            try:
+                key = get_portrait_key(speaker.portrait)
+            except OSError:
+                # missing portraits stay pending
+                continue
+            model.objects.using(db_alias).filter(pk=speaker.pk).update(
+                derived_images_key=key
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("speaker", "0007_speaker_image_storage"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_derived_images_key, migrations.RunPython.noop),
+    ]
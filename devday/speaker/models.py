@@ -1,5 +1,4 @@
-import os
-from io import BytesIO
+import hashlib
 from mimetypes import MimeTypes
 
 from django.conf import settings
@@ -9,9 +8,17 @@ from django.utils import timezone
 from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 
-from devday.extras import ValidatedImageField
+from devday.extras import (
+    ContentAddressedStorage,
+    StoredDimensionsImageField,
+    ValidatedImageField,
+    get_content_hash_from_name,
+)
 from event.models import Event
-from PIL import Image, ImageOps
+
+# speaker images are stored once per content and shared between speakers and
+# their published copies
+speaker_image_storage = ContentAddressedStorage(prefix="speaker_images")
 
 T_SHIRT_SIZES = (
     (1, _("XS")),
@@ -45,9 +52,41 @@ class SpeakerBase(models.Model):
     )
     short_biography = models.TextField(verbose_name=_("Short biography"))
 
+    portrait_width = models.PositiveIntegerField(
+        _("portrait width"), null=True, blank=True, editable=False
+    )
+    portrait_height = models.PositiveIntegerField(
+        _("portrait height"), null=True, blank=True, editable=False
+    )
+    thumbnail_width = models.PositiveIntegerField(
+        _("thumbnail width"), null=True, blank=True, editable=False
+    )
+    thumbnail_height = models.PositiveIntegerField(
+        _("thumbnail height"), null=True, blank=True, editable=False
+    )
+    thumbnail_2x_width = models.PositiveIntegerField(
+        _("high resolution thumbnail width"), null=True, blank=True, editable=False
+    )
+    thumbnail_2x_height = models.PositiveIntegerField(
+        _("high resolution thumbnail height"), null=True, blank=True, editable=False
+    )
+    public_image_width = models.PositiveIntegerField(
+        _("public image width"), null=True, blank=True, editable=False
+    )
+    public_image_height = models.PositiveIntegerField(
+        _("public image height"), null=True, blank=True, editable=False
+    )
+
     class Meta:
         abstract = True
 
+    @property
+    def derived_images_pending(self):
+        """
+        Whether the images derived from the portrait are not created yet.
+        """
+        return bool(self.portrait) and not self.derived_images_key
+
     def save(self, **kwargs):
         if self.slug is None or self.slug.strip() == "":
             self.slug = slugify(self.name)
@@ -62,21 +101,47 @@ class Speaker(SpeakerBase):
         _("registered as speaker"), default=timezone.now
     )
     portrait = ValidatedImageField(
-        verbose_name=_("Speaker image"), upload_to="speaker_original"
+        verbose_name=_("Speaker image"),
+        upload_to="speaker_original",
+        width_field="portrait_width",
+        height_field="portrait_height",
+        storage=speaker_image_storage,
     )
-    thumbnail = models.ImageField(
+    thumbnail = StoredDimensionsImageField(
         verbose_name=_("Speaker image thumbnail"),
         upload_to="speaker_thumbs",
         max_length=500,
         null=True,
         blank=True,
+        width_field="thumbnail_width",
+        height_field="thumbnail_height",
+        storage=speaker_image_storage,
     )
-    public_image = models.ImageField(
+    thumbnail_2x = StoredDimensionsImageField(
+        verbose_name=_("Speaker image thumbnail for high resolution displays"),
+        upload_to="speaker_thumbs",
+        max_length=500,
+        null=True,
+        blank=True,
+        width_field="thumbnail_2x_width",
+        height_field="thumbnail_2x_height",
+        storage=speaker_image_storage,
+    )
+    public_image = StoredDimensionsImageField(
         verbose_name=_("Public speaker image"),
         upload_to="speaker_public",
         max_length=500,
         null=True,
         blank=True,
+        width_field="public_image_width",
+        height_field="public_image_height",
+        storage=speaker_image_storage,
+    )
+    derived_images_key = models.CharField(
+        _("portrait hash of the derived images"),
+        max_length=56,
+        blank=True,
+        editable=False,
     )
     shirt_size = models.PositiveSmallIntegerField(
         verbose_name=_("T-shirt size"), choices=T_SHIRT_SIZES
@@ -112,55 +177,40 @@ def get_pil_type_and_extension(filename):
     raise ValueError("unsupported file type")
 
 
-def create_public_image(portrait, public_image):
-    if not portrait:
-        return
-
-    public_image_width = settings.TALK_PUBLIC_SPEAKER_IMAGE_WIDTH
-    public_image_height = settings.TALK_PUBLIC_SPEAKER_IMAGE_HEIGHT
-    pil_type, file_extension = get_pil_type_and_extension(portrait.name)
-
-    portrait.seek(0)
-    image = Image.open(portrait.file)
-    scaled = ImageOps.fit(image, (public_image_width, public_image_height))
-
-    temp_handle = BytesIO()
-    scaled.save(temp_handle, pil_type)
-    temp_handle.seek(0)
-
-    public_image.save(
-        "{0}_thumbnail.{1}".format(os.path.splitext(portrait.name)[0], file_extension),
-        temp_handle,
-        save=False,
-    )
-    temp_handle.close()
-
-
-def create_thumbnail(portrait, thumbnail):
-    if not portrait:
-        return
-
-    thumbnail_height = settings.TALK_THUMBNAIL_HEIGHT
-    pil_type, file_extension = get_pil_type_and_extension(portrait.name)
-
-    portrait.seek(0)
-    image = Image.open(portrait.file)
-    thumbnail_size = (
-        int(thumbnail_height * image.width / image.height),
-        thumbnail_height,
-    )
-    image.thumbnail(thumbnail_size, Image.ANTIALIAS)
-
-    temp_handle = BytesIO()
-    image.save(temp_handle, pil_type)
-    temp_handle.seek(0)
-
-    thumbnail.save(
-        "{0}_thumbnail.{1}".format(os.path.splitext(portrait.name)[0], file_extension),
-        temp_handle,
-        save=False,
-    )
-    temp_handle.close()
+def get_portrait_key(portrait):
+    """
+    Return the SHA-224 hash of the portrait's content. Portraits that have
+    been named by :py:meth:`ValidatedImageField.name_image_by_contents` carry
+    the hash in their name already, other portraits are hashed.
+    """
+    key = get_content_hash_from_name(portrait.name)
+    if key:
+        return key
+    h = hashlib.sha224()
+    portrait.open("rb")
+    for chunk in portrait.chunks():
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def check_derived_images(instance):
+    """
+    Delete the images derived from the portrait of a speaker if the portrait
+    has changed. The derived images are created in the background by
+    :py:func:`speaker.images.process_pending_speaker_images`.
+    """
+    if instance.portrait:
+        key = get_portrait_key(instance.portrait)
+        if key == instance.derived_images_key and all(
+            getattr(instance, field_name)
+            for field_name in settings.SPEAKER_IMAGE_VARIANTS
+        ):
+            return
+    for field_name in settings.SPEAKER_IMAGE_VARIANTS:
+        derived_image = getattr(instance, field_name)
+        if derived_image:
+            derived_image.delete(save=False)
+    instance.derived_images_key = ""
 
 
 @receiver(models.signals.pre_save, sender=Speaker)
@@ -168,18 +218,18 @@ def create_derived_speaker_images(sender, instance, **kwargs):
     if not instance.pk:
         return False
 
-    if instance.portrait:
-        create_public_image(instance.portrait, instance.public_image)
-        create_thumbnail(instance.portrait, instance.thumbnail)
-    else:
-        if instance.public_image:
-            instance.public_image.delete()
-        if instance.thumbnail:
-            instance.thumbnail.delete()
+    check_derived_images(instance)
 
 
 class PublishedSpeakerManager(models.Manager):
     def copy_from_speaker(self, speaker, event):
+        # the image files are shared with the speaker, see speaker_image_storage
+        images = {}
+        for field_name in ["portrait", *settings.SPEAKER_IMAGE_VARIANTS]:
+            field = Speaker._meta.get_field(field_name)
+            images[field_name] = getattr(speaker, field_name).name
+            for dimension_field in (field.width_field, field.height_field):
+                images[dimension_field] = getattr(speaker, dimension_field)
         published_speaker = self.model(
             speaker=speaker,
             date_published=timezone.now(),
@@ -193,25 +243,9 @@ class PublishedSpeakerManager(models.Manager):
             short_biography=speaker.short_biography,
             email=speaker.user.email,
             slug=speaker.slug,
+            derived_images_key=speaker.derived_images_key,
+            **images
         )
-        if speaker.portrait:
-            published_speaker.portrait.save(
-                os.path.basename(speaker.portrait.name),
-                speaker.portrait.file,
-                save=False,
-            )
-        if speaker.thumbnail:
-            published_speaker.thumbnail.save(
-                os.path.basename(speaker.thumbnail.name),
-                speaker.thumbnail.file,
-                save=False,
-            )
-        if speaker.public_image:
-            published_speaker.public_image.save(
-                os.path.basename(speaker.public_image.name),
-                speaker.public_image.file,
-                save=False,
-            )
         published_speaker.save()
         return published_speaker
 
@@ -237,21 +271,47 @@ class PublishedSpeaker(SpeakerBase):
     )
     event = models.ForeignKey(Event, null=False, on_delete=models.CASCADE)
     portrait = ValidatedImageField(
-        verbose_name=_("Speaker image"), upload_to=event_speaker_image_directory
+        verbose_name=_("Speaker image"),
+        upload_to=event_speaker_image_directory,
+        width_field="portrait_width",
+        height_field="portrait_height",
+        storage=speaker_image_storage,
     )
-    thumbnail = models.ImageField(
+    thumbnail = StoredDimensionsImageField(
         verbose_name=_("Speaker image thumbnail"),
         upload_to=event_speaker_thumbnail_directory,
         max_length=500,
         null=True,
         blank=True,
+        width_field="thumbnail_width",
+        height_field="thumbnail_height",
+        storage=speaker_image_storage,
     )
-    public_image = models.ImageField(
+    thumbnail_2x = StoredDimensionsImageField(
+        verbose_name=_("Speaker image thumbnail for high resolution displays"),
+        upload_to=event_speaker_thumbnail_directory,
+        max_length=500,
+        null=True,
+        blank=True,
+        width_field="thumbnail_2x_width",
+        height_field="thumbnail_2x_height",
+        storage=speaker_image_storage,
+    )
+    public_image = StoredDimensionsImageField(
         verbose_name=_("Public speaker image"),
         upload_to=event_public_speaker_image_directory,
         max_length=500,
         null=True,
         blank=True,
+        width_field="public_image_width",
+        height_field="public_image_height",
+        storage=speaker_image_storage,
+    )
+    derived_images_key = models.CharField(
+        _("portrait hash of the derived images"),
+        max_length=56,
+        blank=True,
+        editable=False,
     )
     email = models.EmailField(_("email address"), blank=False)
 
@@ -272,11 +332,4 @@ def create_derived_published_speaker_images(sender, instance, **kwargs):
     if not instance.pk:
         return False
 
-    if instance.portrait:
-        create_public_image(instance.portrait, instance.public_image)
-        create_thumbnail(instance.portrait, instance.thumbnail)
-    else:
-        if instance.public_image:
-            instance.public_image.delete()
-        if instance.thumbnail:
-            instance.thumbnail.delete()
+    check_derived_images(instance)
@@ -0,0 +1,53 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.models import PublishedSpeaker
+from speaker.tests import speaker_testutils
+
+
+class SpeakerViewSetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = event_testutils.create_test_event()
+        cls.user, _ = attendee_testutils.create_test_user()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create_speakers(self, count, start=0):
+        return [
+            speaker_testutils.create_test_speaker(
+                'speaker{}@example.org'.format(index),
+                'Speaker {}'.format(index))[0]
+            for index in range(start, start + count)]
+
+    def test_list_constant_queries(self):
+        self.create_speakers(2)
+        # the first request loads the CMS URL configuration
+        self.client.get('/api/speakers/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/speakers/')
+        self.assertEqual(len(response.json()['results']), 2)
+        self.create_speakers(2, start=2)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/api/speakers/')
+        self.assertEqual(len(response.json()['results']), 4)
+
+    def test_list_filter_by_event(self):
+        speakers = self.create_speakers(2)
+        PublishedSpeaker.objects.copy_from_speaker(speakers[1], self.event)
+        data = self.client.get(
+            '/api/speakers/', {'event': self.event.slug}).json()
+        self.assertEqual(
+            [speaker['id'] for speaker in data['results']], [speakers[1].slug])
+
+    def test_list_pagination(self):
+        self.create_speakers(3)
+        data = self.client.get('/api/speakers/', {'page_size': 2}).json()
+        self.assertEqual(len(data['results']), 2)
+        data = self.client.get(data['next']).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNone(data['next'])
@@ -0,0 +1,78 @@
+import os
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+
+from event.tests import event_testutils
+from speaker.models import PublishedSpeaker, Speaker, speaker_image_storage
+from speaker.tests.speaker_testutils import (
+    TemporaryMediaTestCase, create_test_speaker)
+
+IMAGE_DATA = b'image data'
+
+
+class TestDedupeSpeakerImagesCommand(TemporaryMediaTestCase):
+    def setUp(self):
+        self.speaker, _, _ = create_test_speaker()
+        self.published = PublishedSpeaker.objects.copy_from_speaker(
+            self.speaker, event_testutils.create_test_event())
+        # images stored per event before the content addressed storage
+        self.legacy_names = [
+            default_storage.save(name, ContentFile(IMAGE_DATA))
+            for name in ('speaker_original/portrait.jpg',
+                         'speaker/test-event/original/portrait.jpg')]
+        Speaker.objects.filter(pk=self.speaker.pk).update(
+            portrait=self.legacy_names[0])
+        PublishedSpeaker.objects.filter(pk=self.published.pk).update(
+            portrait=self.legacy_names[1])
+
+    def make_old(self, name):
+        old = time.time() - 7200
+        os.utime(default_storage.path(name), (old, old))
+
+    def call_command(self, *args):
+        out = StringIO()
+        call_command('dedupe_speaker_images', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dedupe_and_collect_garbage(self):
+        for name in self.legacy_names:
+            self.make_old(name)
+        orphan = default_storage.save(
+            'speaker_thumbs/orphan.jpg', ContentFile(b'orphan'))
+        self.make_old(orphan)
+        recent = default_storage.save(
+            'speaker_thumbs/recent.jpg', ContentFile(b'recent'))
+
+        output = self.call_command()
+
+        self.assertIn('moved 2 images and deleted 3 unreferenced files', output)
+        self.speaker.refresh_from_db()
+        self.published.refresh_from_db()
+        self.assertTrue(
+            speaker_image_storage.is_content_name(self.speaker.portrait.name))
+        self.assertEqual(self.published.portrait.name, self.speaker.portrait.name)
+        with self.speaker.portrait.open('rb') as portrait:
+            self.assertEqual(portrait.read(), IMAGE_DATA)
+        for name in [*self.legacy_names, orphan]:
+            self.assertFalse(default_storage.exists(name))
+        self.assertTrue(default_storage.exists(recent))
+
+    def test_dry_run(self):
+        for name in self.legacy_names:
+            self.make_old(name)
+        orphan = default_storage.save(
+            'speaker_thumbs/orphan.jpg', ContentFile(b'orphan'))
+        self.make_old(orphan)
+
+        output = self.call_command('--dry-run')
+
+        self.assertIn('unreferenced file {}'.format(orphan), output)
+        self.assertIn(
+            'would move 2 images and would delete 1 unreferenced files', output)
+        self.speaker.refresh_from_db()
+        self.assertEqual(self.speaker.portrait.name, self.legacy_names[0])
+        self.assertTrue(default_storage.exists(orphan))
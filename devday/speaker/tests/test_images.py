@@ -0,0 +1,195 @@
+import os
+from io import StringIO
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from event.tests import event_testutils
+from speaker.imaging import render_variants
+from speaker.images import process_pending_speaker_images, speaker_images_job
+from speaker.models import PublishedSpeaker, Speaker
+from speaker.tests.speaker_testutils import (
+    TemporaryMediaTestCase, create_test_speaker)
+
+
+def set_portrait(speaker):
+    with open(os.path.join(
+            os.path.dirname(__file__), 'mu_at_mil_house.jpg'), 'rb') as f:
+        speaker.portrait.save('mu_at_mil_house.jpg', f, save=False)
+    speaker.save()
+
+
+@override_settings(SPEAKER_IMAGE_WORKERS=0)
+class TestProcessPendingSpeakerImages(TemporaryMediaTestCase):
+    def setUp(self):
+        self.speaker, _, _ = create_test_speaker()
+
+    def test_speakers_and_published_speakers(self):
+        set_portrait(self.speaker)
+        published = self.speaker.publish(event_testutils.create_test_event())
+        self.assertTrue(published.derived_images_pending)
+        self.assertEqual(process_pending_speaker_images(), 2)
+        published.refresh_from_db()
+        self.assertFalse(published.derived_images_pending)
+        # the 285x285 pixels portrait is not scaled up for the thumbnails
+        self.assertEqual(published.thumbnail_height, 285)
+        self.assertEqual(published.thumbnail_2x_height, 285)
+        self.assertEqual(
+            (published.public_image_width, published.public_image_height),
+            (636, 960))
+        self.assertEqual(published.portrait_width, 285)
+        self.assertEqual(process_pending_speaker_images(), 0)
+
+    @override_settings(SPEAKER_IMAGE_WORKERS=1)
+    def test_process_pool(self):
+        set_portrait(self.speaker)
+        self.assertEqual(process_pending_speaker_images(use_pool=True), 1)
+        self.speaker.refresh_from_db()
+        self.assertTrue(self.speaker.thumbnail_2x)
+
+    def test_failure_is_not_retried(self):
+        self.speaker.portrait.save(
+            'broken.jpg', ContentFile(b'no image'), save=False)
+        self.speaker.save()
+        with mock.patch('speaker.images.logger') as logger:
+            self.assertEqual(process_pending_speaker_images(), 0)
+        logger.error.assert_called_once()
+        self.speaker.refresh_from_db()
+        self.assertFalse(self.speaker.derived_images_pending)
+        self.assertFalse(self.speaker.thumbnail)
+        with mock.patch('speaker.images.render_variants') as render:
+            process_pending_speaker_images()
+        render.assert_not_called()
+
+    @override_settings(SPEAKER_PORTRAIT_MAX_PIXELS=1000)
+    def test_too_large_portrait(self):
+        set_portrait(self.speaker)
+        with mock.patch('speaker.images.logger') as logger:
+            process_pending_speaker_images()
+        self.assertIn('too large', str(logger.error.call_args[0][-1]))
+
+    def test_changed_portrait_is_not_overwritten(self):
+        set_portrait(self.speaker)
+
+        def render_and_change_portrait(*args, **kwargs):
+            Speaker.objects.filter(pk=self.speaker.pk).update(
+                portrait='speaker_original/other.jpg')
+            return render_variants(*args, **kwargs)
+
+        with mock.patch(
+                'speaker.images.render_variants',
+                side_effect=render_and_change_portrait):
+            self.assertEqual(process_pending_speaker_images(), 0)
+        self.assertEqual(
+            Speaker.objects.filter(pk=self.speaker.pk).values_list(
+                'derived_images_key', 'thumbnail').get(),
+            ('', ''))
+
+    def test_job_closes_connections(self):
+        with mock.patch(
+                'speaker.images.process_pending_speaker_images') as process, \
+                mock.patch('speaker.images.connections') as connections:
+            speaker_images_job()
+        process.assert_called_once_with()
+        connections.close_all.assert_called_once_with()
+
+    def test_command(self):
+        set_portrait(self.speaker)
+        out = StringIO()
+        call_command('process_speaker_images', stdout=out)
+        self.assertIn('processed 1 speaker portraits', out.getvalue())
+        self.speaker.refresh_from_db()
+        thumbnail_name = self.speaker.thumbnail.name
+
+        out = StringIO()
+        call_command('process_speaker_images', '--all', stdout=out)
+        self.assertIn('processed 1 speaker portraits', out.getvalue())
+        self.speaker.refresh_from_db()
+        self.assertEqual(self.speaker.thumbnail.name, thumbnail_name)
+        self.assertFalse(self.speaker.derived_images_pending)
+
+
+class TestScheduleDerivedImages(TemporaryMediaTestCase):
+    def setUp(self):
+        self.speaker, _, _ = create_test_speaker()
+
+    @override_settings(RUN_SCHEDULED_JOBS=True)
+    def test_changed_portrait_schedules_job(self):
+        with mock.patch('speaker.images.get_scheduler') as get_scheduler, \
+                mock.patch('speaker.images.transaction.on_commit') as on_commit:
+            set_portrait(self.speaker)
+            on_commit.call_args[0][0]()
+        get_scheduler.return_value.add_job.assert_called_once_with(
+            speaker_images_job, id='process_speaker_images_now',
+            replace_existing=True)
+
+    @override_settings(RUN_SCHEDULED_JOBS=True)
+    def test_unchanged_speaker_does_not_schedule_job(self):
+        with mock.patch('speaker.images.get_scheduler') as get_scheduler:
+            self.speaker.save()
+            PublishedSpeaker.objects.copy_from_speaker(
+                self.speaker, event_testutils.create_test_event())
+        get_scheduler.assert_not_called()
+
+    @override_settings(RUN_SCHEDULED_JOBS=False)
+    def test_processed_on_commit_without_scheduled_jobs(self):
+        other, _, _ = create_test_speaker('other@example.org', 'Other')
+        set_portrait(other)
+        with mock.patch('speaker.images.get_scheduler') as get_scheduler, \
+                mock.patch('speaker.images.get_executor') as get_executor, \
+                mock.patch(
+                    'speaker.images.transaction.on_commit',
+                    side_effect=lambda func: func()):
+            set_portrait(self.speaker)
+        get_scheduler.assert_not_called()
+        get_executor.assert_not_called()
+        self.speaker.refresh_from_db()
+        self.assertFalse(self.speaker.derived_images_pending)
+        self.assertTrue(self.speaker.thumbnail)
+        # only the saved speaker is processed during the request
+        other.refresh_from_db()
+        self.assertTrue(other.derived_images_pending)
+
+    @override_settings(RUN_SCHEDULED_JOBS=False)
+    def test_processing_errors_are_logged(self):
+        with mock.patch(
+                'speaker.images.process_speaker_images',
+                side_effect=OSError('disk full')), \
+                mock.patch('speaker.images.logger') as logger, \
+                mock.patch(
+                    'speaker.images.transaction.on_commit',
+                    side_effect=lambda func: func()):
+            set_portrait(self.speaker)
+        logger.exception.assert_called_once()
+
+
+class TestUpdateSpeakerImageDimensions(TemporaryMediaTestCase):
+    def setUp(self):
+        self.speaker, _, _ = create_test_speaker()
+        set_portrait(self.speaker)
+
+    def test_command(self):
+        Speaker.objects.filter(pk=self.speaker.pk).update(
+            portrait_width=None, portrait_height=None)
+        out = StringIO()
+        call_command('update_speaker_image_dimensions', stdout=out)
+        self.assertIn('updated the dimensions of 1 images', out.getvalue())
+        self.speaker.refresh_from_db()
+        self.assertEqual(
+            (self.speaker.portrait_width, self.speaker.portrait_height),
+            (285, 285))
+
+        out = StringIO()
+        call_command('update_speaker_image_dimensions', stdout=out)
+        self.assertIn('updated the dimensions of 0 images', out.getvalue())
+
+    def test_missing_file(self):
+        Speaker.objects.filter(pk=self.speaker.pk).update(
+            portrait='speaker_original/missing.jpg', portrait_width=None)
+        out, err = StringIO(), StringIO()
+        call_command(
+            'update_speaker_image_dimensions', '--all', stdout=out, stderr=err)
+        self.assertIn('updated the dimensions of 0 images', out.getvalue())
+        self.assertIn('cannot read portrait of speaker', err.getvalue())
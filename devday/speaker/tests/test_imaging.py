@@ -0,0 +1,72 @@
+from io import BytesIO
+from unittest import mock
+
+from django.test import SimpleTestCase
+from PIL import Image, JpegImagePlugin
+
+from speaker.imaging import get_required_scale, render_variants
+
+VARIANTS = {
+    'public_image': {'width': 60, 'height': 90},
+    'thumbnail': {'height': 30},
+    'thumbnail_2x': {'height': 60},
+}
+
+
+def create_image(size, image_format='jpeg'):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 100, 50)).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+class TestGetRequiredScale(SimpleTestCase):
+    def test_largest_variant_wins(self):
+        self.assertEqual(get_required_scale((1000, 1000), VARIANTS), 0.09)
+
+    def test_width_of_cropped_variant(self):
+        self.assertEqual(
+            get_required_scale((600, 3000), {'public': VARIANTS['public_image']}),
+            0.1)
+
+
+class TestRenderVariants(SimpleTestCase):
+    def sizes(self, rendered):
+        return {
+            name: Image.open(BytesIO(data)).size
+            for name, data in rendered.items()}
+
+    def test_render_variants(self):
+        rendered = render_variants(create_image((800, 1200)), 'jpeg', VARIANTS)
+        self.assertEqual(self.sizes(rendered), {
+            'public_image': (60, 90),
+            'thumbnail': (20, 30),
+            'thumbnail_2x': (40, 60),
+        })
+
+    def test_png(self):
+        rendered = render_variants(
+            create_image((200, 300), 'png'), 'png', VARIANTS)
+        self.assertEqual(
+            Image.open(BytesIO(rendered['thumbnail'])).format, 'PNG')
+        self.assertEqual(self.sizes(rendered)['thumbnail'], (20, 30))
+
+    def test_large_jpeg_is_decoded_in_draft_mode(self):
+        draft_jpeg = JpegImagePlugin.JpegImageFile.draft
+        with mock.patch.object(
+                JpegImagePlugin.JpegImageFile, 'draft', autospec=True,
+                side_effect=draft_jpeg) as draft:
+            render_variants(create_image((1600, 2400)), 'jpeg', VARIANTS)
+        draft.assert_called_once_with(mock.ANY, 'RGB', (60, 90))
+
+    def test_small_portrait_is_not_drafted(self):
+        with mock.patch.object(
+                JpegImagePlugin.JpegImageFile, 'draft') as draft:
+            rendered = render_variants(
+                create_image((40, 60)), 'jpeg', VARIANTS)
+        draft.assert_not_called()
+        self.assertEqual(self.sizes(rendered)['thumbnail_2x'], (40, 60))
+
+    def test_too_many_pixels(self):
+        with self.assertRaisesMessage(ValueError, 'too large'):
+            render_variants(
+                create_image((100, 100)), 'jpeg', VARIANTS, max_pixels=9999)
@@ -1,16 +1,19 @@
+import hashlib
 import os
 from datetime import timedelta
+from unittest import mock
 
 from django.contrib.staticfiles import finders
-from django.test import TestCase
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from django.utils.text import slugify
 
 from attendee.tests import attendee_testutils
 from event.tests import event_testutils
+from speaker.images import process_pending_speaker_images
 from speaker.models import (
-    PublishedSpeaker, Speaker, get_pil_type_and_extension, create_public_image,
-    create_thumbnail)
+    PublishedSpeaker, Speaker, get_pil_type_and_extension, get_portrait_key)
 from speaker.tests.speaker_testutils import TemporaryMediaTestCase
 
 
@@ -126,12 +129,40 @@ class TestPublishedSpeakerManager(TemporaryMediaTestCase):
         self.assertEqual(published.organization, speaker.organization)
         self.assertEqual(published.video_permission, speaker.video_permission)
         self.assertEqual(published.short_biography, speaker.short_biography)
-        self.assertTrue(os.path.dirname(published.portrait.path).endswith(
-            'speaker/test-event/original'))
-        self.assertTrue(os.path.dirname(published.thumbnail.path).endswith(
-            'speaker/test-event/thumbs'))
-        self.assertTrue(os.path.dirname(published.public_image.path).endswith(
-            'speaker/test-event/public'))
+        self.assertEqual(published.portrait.name, speaker.portrait.name)
+        self.assertEqual(published.thumbnail.name, speaker.thumbnail.name)
+        self.assertEqual(
+            published.public_image.name, speaker.public_image.name)
+        self.assertEqual(published.portrait_width, speaker.portrait_width)
+        self.assertTrue(os.path.exists(published.portrait.path))
+
+    def test_copy_from_speaker_keeps_derived_images(self):
+        user, _ = attendee_testutils.create_test_user()
+        speaker = Speaker.objects.create(
+            name='Mr. Speaker',
+            video_permission=True,
+            shirt_size=3,
+            user=user,
+        )
+        copy_speaker_image(speaker.portrait)
+        speaker.save()
+        with self.settings(SPEAKER_IMAGE_WORKERS=0):
+            process_pending_speaker_images()
+        speaker.refresh_from_db()
+
+        event = event_testutils.create_test_event()
+        with mock.patch('speaker.images.render_variants') as render:
+            published = PublishedSpeaker.objects.copy_from_speaker(
+                speaker, event)
+            published.short_biography = 'An updated biography'
+            published.save()
+            self.assertEqual(process_pending_speaker_images(), 0)
+        render.assert_not_called()
+        self.assertEqual(
+            published.derived_images_key, speaker.derived_images_key)
+        self.assertTrue(published.thumbnail)
+        self.assertTrue(published.thumbnail_2x)
+        self.assertTrue(published.public_image)
 
     def test_copy_from_speaker_without_images(self):
         user, _ = attendee_testutils.create_test_user()
@@ -172,36 +203,7 @@ class TestGetPILTypeAndExtension(TestCase):
                     'img', 'speaker-at-a-conference-svgrepo-com.svg'))
 
 
-class TestCreatePublicImage(TestCase):
-    def setUp(self):
-        user, _ = attendee_testutils.create_test_user()
-        self.speaker = Speaker.objects.create(
-            user=user,
-            name='Test speaker',
-            shirt_size=3,
-            video_permission=False,
-        )
-
-    def test_create_public_image_no_image(self):
-        create_public_image(self.speaker.portrait, self.speaker.public_image)
-        self.assertFalse(self.speaker.public_image)
-
-
-class TestCreateThumbnail(TestCase):
-    def setUp(self):
-        user, _ = attendee_testutils.create_test_user()
-        self.speaker = Speaker.objects.create(
-            user=user,
-            name='Test speaker',
-            shirt_size=3,
-            video_permission=False,
-        )
-
-    def test_create_thumbnail_no_image(self):
-        create_thumbnail(self.speaker.portrait, self.speaker.thumbnail)
-        self.assertFalse(self.speaker.thumbnail)
-
-
+@override_settings(SPEAKER_IMAGE_WORKERS=0)
 class TestCreateDerivedSpeakerImages(TemporaryMediaTestCase):
     def setUp(self):
         user, _ = attendee_testutils.create_test_user()
@@ -221,8 +223,14 @@ class TestCreateDerivedSpeakerImages(TemporaryMediaTestCase):
         copy_speaker_image(self.speaker.portrait)
         self.speaker.save()
         self.assertTrue(self.speaker.portrait)
+        self.assertTrue(self.speaker.derived_images_pending)
+        self.assertFalse(self.speaker.public_image)
+        self.assertEqual(process_pending_speaker_images(), 1)
+        self.speaker.refresh_from_db()
+        self.assertFalse(self.speaker.derived_images_pending)
         self.assertTrue(self.speaker.public_image)
         self.assertTrue(self.speaker.thumbnail)
+        self.assertTrue(self.speaker.thumbnail_2x)
 
     def test_no_portrait_deletes_other_fields(self):
         copy_speaker_image(self.speaker.public_image)
@@ -245,6 +253,98 @@ class TestCreateDerivedSpeakerImages(TemporaryMediaTestCase):
         self.assertFalse(self.speaker.thumbnail)
 
 
+    def test_unchanged_portrait_is_not_decoded_again(self):
+        copy_speaker_image(self.speaker.portrait)
+        self.speaker.save()
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        thumbnail_name = self.speaker.thumbnail.name
+        self.assertEqual(
+            self.speaker.derived_images_key,
+            get_portrait_key(self.speaker.portrait))
+
+        self.speaker.name = 'Renamed speaker'
+        self.speaker.short_biography = 'A new biography'
+        with mock.patch('speaker.images.render_variants') as render:
+            self.speaker.save()
+            Speaker.objects.get(pk=self.speaker.pk).save()
+            self.assertEqual(process_pending_speaker_images(), 0)
+        render.assert_not_called()
+        self.assertEqual(self.speaker.thumbnail.name, thumbnail_name)
+
+    def test_changed_portrait_creates_derived_images(self):
+        copy_speaker_image(self.speaker.portrait)
+        self.speaker.save()
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        old_key = self.speaker.derived_images_key
+        old_thumbnail = self.speaker.thumbnail.name
+
+        with open(os.path.join(
+                os.path.dirname(__file__), 'mu_at_mil_house.jpg'),
+                'rb') as portrait:
+            self.speaker.portrait.save(
+                'mu_at_mil_house.jpg', portrait, save=False)
+        self.speaker.save()
+        self.assertTrue(self.speaker.derived_images_pending)
+        self.assertFalse(self.speaker.thumbnail)
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        self.assertNotEqual(self.speaker.derived_images_key, old_key)
+        self.assertNotEqual(self.speaker.thumbnail.name, old_thumbnail)
+
+    def test_missing_derived_image_is_recreated(self):
+        copy_speaker_image(self.speaker.portrait)
+        self.speaker.save()
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        self.speaker.thumbnail.delete(save=False)
+        self.speaker.save()
+        self.assertTrue(self.speaker.derived_images_pending)
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        self.assertTrue(self.speaker.thumbnail)
+
+    def test_removed_portrait_resets_key(self):
+        copy_speaker_image(self.speaker.portrait)
+        self.speaker.save()
+        process_pending_speaker_images()
+        self.speaker.refresh_from_db()
+        self.speaker.portrait.delete(save=False)
+        self.speaker.save()
+        self.assertEqual(self.speaker.derived_images_key, '')
+        self.assertFalse(self.speaker.thumbnail)
+        self.assertFalse(self.speaker.thumbnail_2x)
+        self.assertFalse(self.speaker.derived_images_pending)
+
+
+class TestGetPortraitKey(TemporaryMediaTestCase):
+    def setUp(self):
+        user, _ = attendee_testutils.create_test_user()
+        self.speaker = Speaker(
+            user=user,
+            name='Test speaker',
+            shirt_size=3,
+            video_permission=False,
+        )
+
+    def test_hash_from_name(self):
+        name = '{}.jpg'.format('0123456789abcdef' * 3 + '01234567')
+        self.speaker.portrait.name = name
+        with mock.patch.object(
+                self.speaker.portrait, 'chunks') as chunks:
+            self.assertEqual(get_portrait_key(self.speaker.portrait), name[:56])
+        chunks.assert_not_called()
+
+    def test_hash_of_content(self):
+        self.speaker.portrait.save(
+            'portrait.png', ContentFile(b'image data'), save=False)
+        self.assertEqual(
+            get_portrait_key(self.speaker.portrait),
+            hashlib.sha224(b'image data').hexdigest())
+
+
+@override_settings(SPEAKER_IMAGE_WORKERS=0)
 class TestCreateDerivedPublishedSpeakerImages(TemporaryMediaTestCase):
     def setUp(self):
         user, _ = attendee_testutils.create_test_user()
@@ -265,8 +365,14 @@ class TestCreateDerivedPublishedSpeakerImages(TemporaryMediaTestCase):
         copy_speaker_image(self.speaker.portrait)
         self.speaker.save()
         self.assertTrue(self.speaker.portrait)
+        self.assertTrue(self.speaker.derived_images_pending)
+        self.assertFalse(self.speaker.public_image)
+        self.assertEqual(process_pending_speaker_images(), 1)
+        self.speaker.refresh_from_db()
+        self.assertFalse(self.speaker.derived_images_pending)
         self.assertTrue(self.speaker.public_image)
         self.assertTrue(self.speaker.thumbnail)
+        self.assertTrue(self.speaker.thumbnail_2x)
 
     def test_no_portrait_deletes_other_fields(self):
         copy_speaker_image(self.speaker.public_image)
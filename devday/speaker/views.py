@@ -16,6 +16,7 @@ from event.models import Event
 from speaker.forms import CreateSpeakerForm, EditSpeakerForm, UserSpeakerPortraitForm
 from speaker.models import PublishedSpeaker, Speaker
 from talk.models import Talk
+from talk.page_cache import AnonymousPageCacheMixin
 
 
 class NoSpeakerYetMixin(object):
@@ -144,7 +145,7 @@ class UserSpeakerPortraitDeleteView(
         return redirect(self.success_url)
 
 
-class PublishedSpeakerDetailView(DetailView):
+class PublishedSpeakerDetailView(AnonymousPageCacheMixin, DetailView):
     model = PublishedSpeaker
 
     def dispatch(self, request, *args, **kwargs):
@@ -190,7 +191,7 @@ class PublishedSpeakerDetailView(DetailView):
         return context
 
 
-class PublishedSpeakerListView(ListView):
+class PublishedSpeakerListView(AnonymousPageCacheMixin, ListView):
     model = PublishedSpeaker
     event = None
 
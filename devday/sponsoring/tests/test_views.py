@@ -2,6 +2,7 @@ from django.core import mail
 from django.test import TestCase, override_settings
 
 from event.models import Event
+from outbox.mail import send_queued_mail
 from sponsoring.forms import SponsoringContactForm
 from sponsoring.models import SponsoringPackage
 
@@ -74,6 +75,7 @@ class SponsoringViewTest(TestCase):
         }
         response = self.client.post(self.url, data)
         self.assertRedirects(response, "/sponsoring/thanks/")
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         message = mail.outbox[0]
         self.assertIn(self.event.title, message.subject)
@@ -7,6 +7,7 @@ from django.urls import reverse, reverse_lazy
 from django.views.generic import FormView, TemplateView, RedirectView
 
 from event.models import Event
+from outbox.mail import queue_message
 from sponsoring.forms import SponsoringContactForm
 from sponsoring.models import SponsoringPackage
 
@@ -59,7 +60,7 @@ class SponsoringView(FormView):
             reply_to=[context['contact_email']],
             headers={'From': settings.SPONSORING_FROM_EMAIL},
         )
-        email.send(fail_silently=False)
+        queue_message(email)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -1 +1,3 @@
 COMMITTEE_GROUP = 'talk_committee'
+# permissions required by the views of the program committee
+COMMITTEE_PERMISSIONS = ('talk.add_vote', 'talk.add_talkcomment')
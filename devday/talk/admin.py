@@ -18,7 +18,7 @@ from talk.forms import (
     SessionReservationForm,
     TalkSlotForm,
 )
-from talk.signals import send_reservation_confirmation_mail
+from talk.signals import promote_waiting_list
 
 from .models import (
     AttendeeFeedback,
@@ -163,29 +163,14 @@ class TalkAdmin(PrefetchAdmin, admin.ModelAdmin):
     publish_talks.short_description = _("Publish selected sessions")
 
     def process_waiting_list(self, request, queryset):
-        mailcount = 0
-        attendees = set()
-        for talk in queryset.filter(
-            spots__gt=0, event_id=Event.objects.current_event_id()
-        ):
-            confirmed_reservations = SessionReservation.objects.filter(
-                talk=talk, is_confirmed=True
-            ).count()
-            if talk.spots > confirmed_reservations:
-                waiting_reservations = (
-                    SessionReservation.objects.filter(talk=talk, is_waiting=True)
-                    .select_related("attendee", "attendee__user")
-                    .order_by("created")
-                )
-                for reservation in waiting_reservations[
-                    : talk.spots - confirmed_reservations
-                ]:
-                    user = reservation.attendee.user
-                    reservation.is_waiting = False
-                    reservation.save()
-                    send_reservation_confirmation_mail(request, reservation, user)
-                    attendees.add(user.email)
-                    mailcount += 1
+        promoted = promote_waiting_list(
+            queryset.filter(
+                spots__gt=0, event_id=Event.objects.current_event_id()
+            ).values_list("pk", flat=True),
+            request,
+        )
+        mailcount = len(promoted)
+        attendees = {reservation.attendee.user.email for reservation in promoted}
         if mailcount > 0:
             self.message_user(
                 request,
@@ -0,0 +1,83 @@
+"""
+Invalidation of the versions of the REST API collections.
+
+The sessions, speakers and events endpoints answer conditional requests
+based on the versions maintained by :py:mod:`devday.api`. Saving or deleting
+one of the models that is part of the representation of an endpoint replaces
+the version of that endpoint when the transaction is committed. Requests read
+the version before the data, so a request that has seen the old data also
+has seen the old version. Replacing the version on commit only keeps the
+version rows from being locked for the rest of the transaction.
+
+Bulk updates by querysets do not send signals and have to call
+:py:func:`devday.api.invalidate_api_versions` themselves.
+
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from devday.api import invalidate_api_versions
+from event.models import Event
+from speaker.models import PublishedSpeaker, Speaker
+from talk.models import Room, Talk, TalkPublishedSpeaker, TalkSlot, TimeSlot, Track
+
+
+def _invalidate_on_commit(*names):
+    transaction.on_commit(lambda: invalidate_api_versions(*names))
+
+
+@receiver(post_save, sender=Event, dispatch_uid="api_version_event_saved")
+@receiver(post_delete, sender=Event, dispatch_uid="api_version_event_deleted")
+def invalidate_on_event_change(sender, instance, **kwargs):
+    _invalidate_on_commit("events", "sessions", "speakers")
+
+
+@receiver(post_save, sender=Talk, dispatch_uid="api_version_talk_saved")
+@receiver(post_delete, sender=Talk, dispatch_uid="api_version_talk_deleted")
+@receiver(
+    post_save,
+    sender=TalkPublishedSpeaker,
+    dispatch_uid="api_version_talk_published_speaker_saved",
+)
+@receiver(
+    post_delete,
+    sender=TalkPublishedSpeaker,
+    dispatch_uid="api_version_talk_published_speaker_deleted",
+)
+def invalidate_on_talk_change(sender, instance, **kwargs):
+    _invalidate_on_commit("sessions")
+
+
+@receiver(post_save, sender=Speaker, dispatch_uid="api_version_speaker_saved")
+@receiver(post_delete, sender=Speaker, dispatch_uid="api_version_speaker_deleted")
+def invalidate_on_speaker_change(sender, instance, **kwargs):
+    _invalidate_on_commit("speakers")
+
+
+@receiver(
+    post_save,
+    sender=PublishedSpeaker,
+    dispatch_uid="api_version_published_speaker_saved",
+)
+@receiver(
+    post_delete,
+    sender=PublishedSpeaker,
+    dispatch_uid="api_version_published_speaker_deleted",
+)
+def invalidate_on_published_speaker_change(sender, instance, **kwargs):
+    # published speakers are nested into sessions and filter speakers by event
+    _invalidate_on_commit("sessions", "speakers")
+
+
+@receiver(post_save, sender=Room, dispatch_uid="api_version_room_saved")
+@receiver(post_delete, sender=Room, dispatch_uid="api_version_room_deleted")
+@receiver(post_save, sender=TimeSlot, dispatch_uid="api_version_time_slot_saved")
+@receiver(post_delete, sender=TimeSlot, dispatch_uid="api_version_time_slot_deleted")
+@receiver(post_save, sender=Track, dispatch_uid="api_version_track_saved")
+@receiver(post_delete, sender=Track, dispatch_uid="api_version_track_deleted")
+@receiver(post_save, sender=TalkSlot, dispatch_uid="api_version_talk_slot_saved")
+@receiver(post_delete, sender=TalkSlot, dispatch_uid="api_version_talk_slot_deleted")
+def invalidate_on_program_change(sender, instance, **kwargs):
+    # only part of the program bundle, see talk.bundle
+    _invalidate_on_commit("program")
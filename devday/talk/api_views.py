@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.relations import StringRelatedField
 from rest_framework.response import Response
 
+from devday.api import ApiCursorPagination, ConditionalGetMixin, EventFilterMixin
 from speaker.models import Speaker
 from talk.models import Talk
 
@@ -54,9 +55,18 @@ class SessionSerializer(serializers.HyperlinkedModelSerializer):
         return ret
 
 
-class SessionViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Talk.objects.filter(published_speakers__isnull=False)
+class SessionViewSet(
+    ConditionalGetMixin, EventFilterMixin, viewsets.ReadOnlyModelViewSet
+):
+    queryset = (
+        Talk.objects.filter(published_speakers__isnull=False)
+        .distinct()
+        .select_related("event")
+        .prefetch_related("published_speakers")
+    )
     serializer_class = SessionSerializer
+    pagination_class = ApiCursorPagination
+    api_version = "sessions"
     lookup_field = 'slug'
 
     @action(detail=True, methods=['put'])
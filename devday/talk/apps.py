@@ -1,4 +1,5 @@
 from django.apps import AppConfig, apps
+from django.conf import settings
 from django.db.models.signals import post_migrate
 from talk import COMMITTEE_GROUP
 
@@ -13,6 +14,28 @@ class SessionsConfig(AppConfig):
         # This import is needed for signal handling
         import talk.signals
 
+        # noinspection PyUnresolvedReferences
+        # This import is needed for page cache invalidation
+        import talk.page_cache
+
+        # noinspection PyUnresolvedReferences
+        # This import is needed for API version invalidation
+        import talk.api_versions
+
+        if settings.RUN_SCHEDULED_JOBS:
+            from devday.apps import get_scheduler
+            from talk.jobs import promote_waiting_list_job
+
+            get_scheduler().add_job(
+                promote_waiting_list_job,
+                "interval",
+                seconds=settings.TALK_WAITING_LIST_INTERVAL,
+                id="promote_waiting_list",
+                replace_existing=True,
+                coalesce=True,
+                max_instances=1,
+            )
+
 
 def create_talk_committee(**kwargs):
     Group = apps.get_model("auth", "Group")
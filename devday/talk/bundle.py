@@ -0,0 +1,135 @@
+"""
+Program bundle of an event for offline schedule apps.
+
+The bundle is a single JSON document with the event, its tracks, rooms, time
+slots, sessions and speakers. Apps download it once and keep it for the
+conference day instead of paging through the sessions and speakers endpoints.
+
+The document is built and gzip compressed once per version of the program and
+stored in the Django cache. The cache key contains the tokens of the API
+versions, see :py:mod:`talk.api_versions`. These are read from the database,
+so any change to the program leads to a new bundle on the next request in
+every web server process, even though each process has a cache of its own.
+The ``version`` of the document is a hash of its content, unchanged content
+keeps its version even if the bundle has been rebuilt.
+
+"""
+import gzip
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from devday.api import get_api_versions
+from talk.models import Room, Talk, TimeSlot, Track
+
+BUNDLE_KEY = "api:bundle:{}:{}"
+
+# API versions that cover all data of the bundle
+BUNDLE_VERSIONS = ["events", "sessions", "program"]
+
+
+def _image_url(image):
+    return image.url if image else ""
+
+
+def build_event_bundle(event):
+    """
+    Return the published program of the event as a dictionary of JSON
+    serializable data. Images are referenced by URLs relative to the host.
+    """
+    talks = list(
+        Talk.objects.filter(event=event, track__isnull=False)
+        .select_related("talkslot")
+        .prefetch_related("published_speakers")
+        .order_by("title")
+    )
+    speakers = {}
+    sessions = []
+    for talk in talks:
+        talk_speakers = list(talk.published_speakers.all())
+        for speaker in talk_speakers:
+            speakers.setdefault(speaker.slug, speaker)
+        talk_slot = getattr(talk, "talkslot", None)
+        sessions.append(
+            {
+                "id": talk.slug,
+                "title": talk.title,
+                "description": talk.abstract,
+                "track": talk.track_id,
+                "room": talk_slot.room_id if talk_slot else None,
+                "time_slot": talk_slot.time_id if talk_slot else None,
+                "speakers": [speaker.slug for speaker in talk_speakers],
+            }
+        )
+    return {
+        "event": {
+            "id": event.slug,
+            "title": event.title,
+            "description": event.description,
+            "location": event.location,
+            "full_day_event": event.full_day,
+            "start_time": event.start_time,
+            "end_time": event.end_time,
+        },
+        "tracks": list(
+            Track.objects.filter(event=event).order_by("name").values("id", "name")
+        ),
+        "rooms": list(Room.objects.for_event(event).values("id", "name", "priority")),
+        "time_slots": list(
+            TimeSlot.objects.filter(event=event)
+            .order_by("block", "start_time", "end_time")
+            .values("id", "name", "start_time", "end_time", "text_body", "block")
+        ),
+        "sessions": sessions,
+        "speakers": [
+            {
+                "id": speaker.slug,
+                "name": speaker.name,
+                "position": speaker.position,
+                "organization": speaker.organization,
+                "short_biography": speaker.short_biography,
+                "image": _image_url(speaker.public_image),
+                "thumbnail": _image_url(speaker.thumbnail),
+            }
+            for speaker in sorted(speakers.values(), key=lambda s: s.name)
+        ],
+    }
+
+
+def encode_event_bundle(bundle):
+    """
+    Return the version and the gzip compressed JSON document of a bundle
+    built by :py:func:`build_event_bundle`.
+    """
+    content = json.dumps(bundle, cls=DjangoJSONEncoder, sort_keys=True)
+    version = hashlib.sha1(content.encode()).hexdigest()
+    document = json.dumps(
+        {"version": version, **bundle}, cls=DjangoJSONEncoder, sort_keys=True
+    )
+    # a fixed modification time makes the compressed data reproducible
+    return version, gzip.compress(document.encode(), mtime=0)
+
+
+def _in_transaction():
+    return transaction.get_connection().in_atomic_block
+
+
+def get_event_bundle(event):
+    """
+    Return the version and the gzip compressed JSON document of the bundle of
+    the event from the cache or build it if the program has changed.
+    """
+    versions = get_api_versions(*BUNDLE_VERSIONS)
+    tokens = "".join(versions[name][0] for name in BUNDLE_VERSIONS)
+    key = BUNDLE_KEY.format(event.slug, hashlib.md5(tokens.encode()).hexdigest())
+    bundle = cache.get(key)
+    if bundle is None:
+        bundle = encode_event_bundle(build_event_bundle(event))
+        # data read inside of a transaction might be rolled back
+        if not _in_transaction():
+            cache.set(key, bundle, settings.API_BUNDLE_TIMEOUT)
+    return bundle
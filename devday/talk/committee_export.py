@@ -0,0 +1,117 @@
+"""
+Export data of the sessions submitted for an event for the program committee.
+
+:py:func:`get_committee_export_queryset` annotates the vote statistics to the
+talks of an event. :py:func:`iter_committee_export_rows` iterates over such
+a queryset and adds the draft speakers, talk formats and comments of the
+talks. The related data is fetched with one query per chunk of talks, an
+export of up to ``chunk_size`` talks therefore needs four queries no matter
+how many speakers, votes and comments there are.
+
+"""
+from collections import namedtuple
+
+from django.db.models import Avg, Count, Sum
+
+from devday.utils.csv_export import chunked
+from talk.models import Talk, TalkComment, TalkDraftSpeaker
+
+CommitteeExportRow = namedtuple(
+    "CommitteeExportRow",
+    [
+        "id",
+        "title",
+        "abstract",
+        "remarks",
+        "average_score",
+        "vote_sum",
+        "vote_count",
+        "speakers",
+        "formats",
+        "comments",
+    ],
+)
+
+CommitteeExportSpeaker = namedtuple("CommitteeExportSpeaker", ["name", "organization"])
+
+CommitteeExportComment = namedtuple(
+    "CommitteeExportComment", ["created", "modified", "commenter", "comment"]
+)
+
+_TALK_FIELDS = (
+    "id",
+    "title",
+    "abstract",
+    "remarks",
+    "average_score",
+    "vote_sum",
+    "vote_count",
+)
+
+
+def get_committee_export_queryset(event):
+    """
+    Return the talks of the given event annotated with ``average_score``,
+    ``vote_sum`` and ``vote_count``.
+    """
+    return Talk.objects.filter(event=event).annotate(
+        average_score=Avg("vote__score"),
+        vote_sum=Sum("vote__score"),
+        vote_count=Count("vote"),
+    )
+
+
+def _group_by_talk(rows):
+    grouped = {}
+    for talk_id, *values in rows:
+        grouped.setdefault(talk_id, []).append(values)
+    return grouped
+
+
+def iter_committee_export_rows(queryset, chunk_size=500):
+    """
+    Yield a :py:class:`CommitteeExportRow` for each talk of a queryset
+    returned by :py:func:`get_committee_export_queryset`.
+
+    Speakers are listed in their configured order, formats in their default
+    order and comments ordered by creation time.
+    """
+    talk_rows = queryset.values_list(*_TALK_FIELDS).iterator(chunk_size=chunk_size)
+    for chunk in chunked(talk_rows, chunk_size):
+        talk_ids = [row[0] for row in chunk]
+        speakers = _group_by_talk(
+            TalkDraftSpeaker.objects.filter(talk_id__in=talk_ids)
+            .order_by("order")
+            .values_list(
+                "talk_id", "draft_speaker__name", "draft_speaker__organization"
+            )
+        )
+        formats = _group_by_talk(
+            (talk_format.talk_id, str(talk_format.talkformat))
+            for talk_format in Talk.talkformat.through.objects.filter(
+                talk_id__in=talk_ids
+            )
+            .select_related("talkformat")
+            .order_by("talkformat__duration", "talkformat__name")
+        )
+        comments = _group_by_talk(
+            TalkComment.objects.filter(talk_id__in=talk_ids)
+            .order_by("created")
+            .values_list(
+                "talk_id", "created", "modified", "commenter__email", "comment"
+            )
+        )
+        for row in chunk:
+            talk_id = row[0]
+            yield CommitteeExportRow(
+                *row,
+                speakers=[
+                    CommitteeExportSpeaker(*values)
+                    for values in speakers.get(talk_id, [])
+                ],
+                formats=[values[0] for values in formats.get(talk_id, [])],
+                comments=[
+                    CommitteeExportComment(*values)
+                    for values in comments.get(talk_id, [])
+                ]
+            )
@@ -1,16 +1,10 @@
+from attendee.capabilities import get_capabilities
 from event.models import Event
 from talk.models import Talk
 
 
 def committee_member_context_processor(request):
-    if request.user.is_authenticated:
-        return {
-            "is_committee_member": request.user.has_perms(
-                ("talk.add_vote", "talk.add_talkcomment")
-            )
-        }
-    else:
-        return {"is_committee_member": False}
+    return {"is_committee_member": get_capabilities(request).is_committee_member}
 
 
 def reservation_context_processor(request):
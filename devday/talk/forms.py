@@ -261,10 +261,7 @@ class TalkAddReservationForm(forms.ModelForm):
         self.instance.attendee = self.attendee
         self.instance.talk = self.talk
         self.instance.is_confirmed = False
-        if (
-            self.instance.talk.sessionreservation_set.filter(is_confirmed=True).count()
-            >= self.instance.talk.spots
-        ):
+        if self.instance.talk.is_fully_booked:
             self.instance.is_waiting = True
         return super().save(commit)
 
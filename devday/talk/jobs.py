@@ -0,0 +1,25 @@
+"""
+Scheduled job that promotes waiting reservations, see
+:py:class:`talk.apps.SessionsConfig`.
+
+"""
+import logging
+
+from django.db import connections
+
+from talk.signals import promote_waiting_list
+
+logger = logging.getLogger(__name__)
+
+
+def promote_waiting_list_job():
+    """
+    Fill free spots of all reservable talks from their waiting lists.
+    Closes the scheduler thread's database connection when done.
+    """
+    try:
+        promote_waiting_list()
+    except Exception:
+        logger.exception("promoting waiting reservations failed")
+    finally:
+        connections.close_all()
@@ -0,0 +1,108 @@
+"""
+A management command to measure the session grid layout with synthetic events
+that are much larger than a typical Dev Day.
+"""
+
+import timeit
+from datetime import datetime, timedelta
+
+from django.core.management import BaseCommand
+from django.utils import timezone
+
+from talk.models import Room, Talk, TalkSlot, TimeSlot
+from talk.schedule import layout_schedule
+
+
+def create_synthetic_schedule(time_slot_count, room_count, block_count):
+    """
+    Create unsaved time slots, talk slots and rooms for a synthetic event.
+
+    Each block is a day with consecutive 30 minute time slots that have a talk
+    in every room. Every fifth time slot is accompanied by a two hour workshop
+    slot that overlaps the following time slots.
+
+    :return: tuple of time slots, talk slots and rooms
+    """
+    rooms = [
+        Room(id=room_id, name="Room {}".format(room_id), priority=room_id)
+        for room_id in range(1, room_count + 1)
+    ]
+    start = timezone.make_aware(datetime(2030, 5, 1, 9, 0))
+    per_block = max(1, time_slot_count // block_count)
+    time_slots = []
+    talk_slots = []
+    for index in range(time_slot_count):
+        block = min(index // per_block, block_count - 1)
+        slot_start = start + timedelta(
+            days=block, minutes=30 * (index - block * per_block)
+        )
+        if index % 5 == 4:
+            slot_end = slot_start + timedelta(hours=2)
+            slot_rooms = rooms[-1:]
+        else:
+            slot_end = slot_start + timedelta(minutes=30)
+            slot_rooms = rooms[:-1] or rooms
+        time_slot = TimeSlot(
+            id=index + 1,
+            name="Slot {}".format(index + 1),
+            start_time=slot_start,
+            end_time=slot_end,
+            block=block,
+        )
+        time_slots.append(time_slot)
+        for room in slot_rooms:
+            talk_id = len(talk_slots) + 1
+            talk_slots.append(
+                TalkSlot(
+                    id=talk_id,
+                    talk=Talk(id=talk_id, title="Talk {}".format(talk_id)),
+                    room=room,
+                    time=time_slot,
+                )
+            )
+    return time_slots, talk_slots, rooms
+
+
+class Command(BaseCommand):
+    help = "Measure the session grid layout for synthetic large events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--time-slots",
+            dest="time_slots",
+            type=int,
+            nargs="+",
+            default=[50, 200, 800],
+            help="Numbers of time slots to measure",
+        )
+        parser.add_argument(
+            "--rooms", dest="rooms", type=int, default=24, help="Number of rooms"
+        )
+        parser.add_argument(
+            "--blocks", dest="blocks", type=int, default=3, help="Number of blocks"
+        )
+        parser.add_argument(
+            "--repeat",
+            dest="repeat",
+            type=int,
+            default=5,
+            help="Number of layout runs per measurement",
+        )
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        for time_slot_count in options["time_slots"]:
+            time_slots, talk_slots, rooms = create_synthetic_schedule(
+                time_slot_count, options["rooms"], options["blocks"]
+            )
+            duration = timeit.timeit(
+                lambda: layout_schedule(time_slots, talk_slots, rooms), number=repeat
+            )
+            self.stdout.write(
+                "{:d} time slots, {:d} talk slots, {:d} rooms: {:.2f} ms".format(
+                    len(time_slots),
+                    len(talk_slots),
+                    len(rooms),
+                    duration * 1000 / repeat,
+                )
+            )
@@ -0,0 +1,18 @@
+"""
+Fill free spots of reservable talks from their waiting lists and send the
+confirmation mails. This is an alternative to the scheduled job for
+installations that do not set ``RUN_SCHEDULED_JOBS``.
+
+"""
+from django.core.management import BaseCommand
+
+from talk.signals import promote_waiting_list
+
+
+class Command(BaseCommand):
+    help = "Promote waiting reservations to free spots of reservable talks"
+
+    def handle(self, *args, **options):
+        promoted = promote_waiting_list()
+        if options["verbosity"] > 0:
+            self.stdout.write("promoted {} reservations".format(len(promoted)))
@@ -0,0 +1,20 @@
+"""
+Count the confirmed and waiting reservations of all talks again and correct
+the reservation counters of the talks, e.g. after reservations have been
+changed directly in the database.
+
+"""
+from django.core.management import BaseCommand
+
+from talk.reservation import recount_reservations
+
+
+class Command(BaseCommand):
+    help = "Correct the reservation counters of all talks"
+
+    def handle(self, *args, **options):
+        corrected = recount_reservations()
+        if options["verbosity"] > 0:
+            self.stdout.write(
+                "corrected the reservation counters of {} talks".format(corrected)
+            )
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_reservations(apps, schema_editor):
+    Talk = apps.get_model("talk", "Talk")
+    SessionReservation = apps.get_model("talk", "SessionReservation")
+
+    db_alias = schema_editor.connection.alias
+    counts = (
+        SessionReservation.objects.using(db_alias)
+        .values("talk_id")
+        .annotate(
+            confirmed=Count("id", filter=Q(is_confirmed=True)),
+            waiting=Count("id", filter=Q(is_waiting=True)),
+        )
+        .values_list("talk_id", "confirmed", "waiting")
+    )
+    for talk_id, confirmed, waiting in counts:
+        Talk.objects.using(db_alias).filter(pk=talk_id).update(
+            confirmed_count=confirmed, waiting_count=waiting
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("talk", "0047_use_links_for_talk_media_drop_old_fields"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="talk",
+            name="confirmed_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of confirmed reservations, maintained automatically",
+                verbose_name="Confirmed reservations",
+            ),
+        ),
+        migrations.AddField(
+            model_name="talk",
+            name="waiting_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Number of waiting reservations, maintained automatically",
+                verbose_name="Waiting reservations",
+            ),
+        ),
+        migrations.RunPython(count_reservations, migrations.RunPython.noop),
+    ]
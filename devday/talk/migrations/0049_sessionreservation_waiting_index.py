@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("talk", "0048_talk_reservation_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sessionreservation",
+            index=models.Index(
+                fields=["talk", "is_waiting", "created"],
+                name="talk_sessres_waiting_idx",
+            ),
+        ),
+    ]
@@ -4,7 +4,8 @@ from datetime import timedelta
 from django.conf import settings
 from django.core import signing
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.db.models.signals import m2m_changed, pre_delete, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
@@ -56,6 +57,10 @@ class TalkManager(models.Manager):
         return talk
 
 
+# fields of Talk that are only changed by update_reservation_counters
+RESERVATION_COUNTERS = ("confirmed_count", "waiting_count")
+
+
 class Talk(models.Model):
     draft_speakers = models.ManyToManyField(
         speaker_models.Speaker,
@@ -90,6 +95,18 @@ class Talk(models.Model):
         verbose_name=_("Spots"),
         help_text=_("Maximum number of attendees for this talk"),
     )
+    confirmed_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Confirmed reservations"),
+        help_text=_("Number of confirmed reservations, maintained automatically"),
+    )
+    waiting_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Waiting reservations"),
+        help_text=_("Number of waiting reservations, maintained automatically"),
+    )
 
     objects = TalkManager()
     reservable = ReservableTalkManager()
@@ -115,6 +132,22 @@ class Talk(models.Model):
     ):
         if not self.slug:
             self.slug = slugify(self.title)
+        if (
+            update_fields is None
+            and not force_insert
+            and not self._state.adding
+            and self.pk is not None
+        ):
+            # the reservation counters are maintained by UPDATE queries, a
+            # talk that has been loaded earlier must not overwrite them
+            deferred = self.get_deferred_fields()
+            update_fields = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RESERVATION_COUNTERS
+                and field.attname not in deferred
+            ]
         super(Talk, self).save(force_insert, force_update, using, update_fields)
 
     def __str__(self):
@@ -143,6 +176,14 @@ class Talk(models.Model):
     def is_limited(self):
         return self.spots > 0
 
+    @property
+    def is_fully_booked(self):
+        return self.confirmed_count >= self.spots
+
+    @property
+    def remaining_spots(self):
+        return max(self.spots - self.confirmed_count, 0)
+
     @property
     def is_reservation_available(self):
         return self.is_limited and not self.event.is_started()
@@ -403,6 +444,12 @@ class SessionReservation(TimeStampedModel):
         verbose_name = _("Session reservation")
         verbose_name_plural = _("Session reservations")
         unique_together = [("attendee", "talk")]
+        indexes = [
+            models.Index(
+                fields=["talk", "is_waiting", "created"],
+                name="talk_sessres_waiting_idx",
+            )
+        ]
 
     def get_confirmation_key(self):
         return signing.dumps(
@@ -410,6 +457,93 @@ class SessionReservation(TimeStampedModel):
             salt=settings.CONFIRMATION_SALT,
         )
 
+    def save(self, *args, **kwargs):
+        """
+        Save the reservation and adjust the reservation counters of the
+        affected talks by the change of its state.
+
+        The previous state is read from the locked database row, so concurrent
+        saves of the same reservation cannot count it twice. The talks are
+        locked before the reservation, in the same order as the confirmation
+        and the promotion of reservations lock them, to not deadlock with them.
+        """
+        with transaction.atomic():
+            previous = None
+            if self._state.adding:
+                lock_talks(self.talk_id)
+            else:
+                lock_talks(
+                    self.talk_id,
+                    SessionReservation.objects.filter(pk=self.pk)
+                    .values_list("talk_id", flat=True)
+                    .first(),
+                )
+                previous = (
+                    SessionReservation.objects.select_for_update()
+                    .filter(pk=self.pk)
+                    .values_list("talk_id", "is_confirmed", "is_waiting")
+                    .first()
+                )
+            super().save(*args, **kwargs)
+            current = (self.talk_id, self.is_confirmed, self.is_waiting)
+            if previous == current:
+                return
+            if previous is not None:
+                update_reservation_counters(*previous, delta=-1)
+            update_reservation_counters(*current, delta=1)
+
+
+def lock_talks(*talk_ids):
+    """
+    Lock the rows of the talks with the given ids in the order of their ids.
+    Ids that are None are ignored.
+    """
+    talk_ids = sorted({talk_id for talk_id in talk_ids if talk_id is not None})
+    if talk_ids:
+        list(
+            Talk.objects.select_for_update()
+            .filter(pk__in=talk_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+
+def update_reservation_counters(talk_id, is_confirmed, is_waiting, delta):
+    """
+    Add ``delta`` to the counters of the talk that match the given reservation
+    state. The counters are changed with a single ``UPDATE`` using ``F()``
+    expressions.
+    """
+    changes = {}
+    if is_confirmed:
+        changes["confirmed_count"] = F("confirmed_count") + delta
+    if is_waiting:
+        changes["waiting_count"] = F("waiting_count") + delta
+    if changes:
+        Talk.objects.filter(pk=talk_id).update(**changes)
+
+
+@receiver(pre_delete, sender=SessionReservation)
+def lock_deleted_reservation(sender, instance, **kwargs):
+    # the instance may be outdated, e.g. if the reservation has been promoted
+    # from the waiting list since it was loaded, so the counters are adjusted
+    # by the state of the locked database row. The talk is locked first like
+    # in SessionReservation.save
+    lock_talks(instance.talk_id)
+    instance._counted_state = (
+        SessionReservation.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values_list("talk_id", "is_confirmed", "is_waiting")
+        .first()
+    )
+
+
+@receiver(post_delete, sender=SessionReservation)
+def update_counters_of_deleted_reservation(sender, instance, **kwargs):
+    counted_state = getattr(instance, "_counted_state", None)
+    if counted_state is not None:
+        update_reservation_counters(*counted_state, delta=-1)
+
 
 class AttendeeVote(TimeStampedModel):
     attendee = models.ForeignKey(
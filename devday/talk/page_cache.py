@@ -0,0 +1,209 @@
+"""
+Full page cache for the public, event specific session and speaker pages.
+
+Anonymous visitors all get the same output for the schedule, session details,
+video list and speaker pages. :py:class:`AnonymousPageCacheMixin` stores the
+rendered responses in the Django cache, keyed by event slug, absolute URL and
+language.
+
+Each cache key contains a version token for the event and a global version
+token. Saving or deleting one of the models shown on these pages replaces the
+version token of the affected event, changes to an
+:py:class:`event.models.Event` replace the global version token, because the
+current event determines the menu and the grid layout of all pages. Entries
+expire after ``settings.PAGE_CACHE_TIMEOUT`` seconds in any case, this bounds
+the staleness of CMS content and of the talks of other events listed on
+speaker pages.
+
+Responses rendered inside of a transaction are not cached because the data
+they are based on might be rolled back.
+
+"""
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import translation
+
+from event.models import Event
+from speaker.models import PublishedSpeaker
+from talk.models import (
+    Room,
+    Talk,
+    TalkMedia,
+    TalkPublishedSpeaker,
+    TalkSlot,
+    TimeSlot,
+    Track,
+)
+
+GLOBAL_VERSION_KEY = "page_cache:version"
+EVENT_VERSION_KEY = "page_cache:version:{}"
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _get_versions(event_slug):
+    event_version_key = EVENT_VERSION_KEY.format(event_slug)
+    versions = cache.get_many([GLOBAL_VERSION_KEY, event_version_key])
+    missing = {
+        key: _new_version()
+        for key in (GLOBAL_VERSION_KEY, event_version_key)
+        if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions[GLOBAL_VERSION_KEY], versions[event_version_key]
+
+
+def get_page_cache_key(request, event_slug):
+    global_version, event_version = _get_versions(event_slug)
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return "page_cache:{}:{}:{}:{}:{}".format(
+        event_slug, global_version, event_version, translation.get_language(), url
+    )
+
+
+def invalidate_event_pages(event_slug):
+    cache.set(EVENT_VERSION_KEY.format(event_slug), _new_version(), None)
+
+
+def invalidate_all_pages():
+    cache.set(GLOBAL_VERSION_KEY, _new_version(), None)
+
+
+def _in_transaction():
+    return transaction.get_connection().in_atomic_block
+
+
+def is_cacheable_request(request):
+    return (
+        settings.PAGE_CACHE_TIMEOUT > 0
+        and request.method in ("GET", "HEAD")
+        and request.user.is_anonymous
+        and not get_messages(request)
+    )
+
+
+def is_cacheable_response(response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not _in_transaction()
+    )
+
+
+def cache_anonymous_page(view_func):
+    """
+    Serve responses for anonymous visitors of the decorated view from the
+    page cache.
+
+    The view must be routed with an ``event`` URL keyword argument containing
+    the event slug.
+    """
+
+    @wraps(view_func)
+    def _wrapped_view(request, *args, **kwargs):
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        key = get_page_cache_key(request, kwargs["event"])
+        response = cache.get(key)
+        if response is not None:
+            return response
+
+        response = view_func(request, *args, **kwargs)
+
+        def store(rendered_response):
+            if is_cacheable_response(rendered_response):
+                cache.set(key, rendered_response, settings.PAGE_CACHE_TIMEOUT)
+
+        if hasattr(response, "render") and callable(response.render):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+
+    return _wrapped_view
+
+
+class AnonymousPageCacheMixin(object):
+    """
+    Wrap the view with :py:func:`cache_anonymous_page`. The cache lookup
+    happens before ``dispatch``, so cache hits do not execute any view code.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return cache_anonymous_page(super().as_view(**initkwargs))
+
+
+def _invalidate_on_commit(event_slug):
+    invalidate_event_pages(event_slug)
+    # concurrent requests may have cached pages before the commit
+    transaction.on_commit(lambda: invalidate_event_pages(event_slug))
+
+
+def _event_slug(event_id):
+    return Event.objects.filter(id=event_id).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Event, dispatch_uid="page_cache_event_saved")
+@receiver(post_delete, sender=Event, dispatch_uid="page_cache_event_deleted")
+def invalidate_on_event_change(sender, instance, **kwargs):
+    invalidate_all_pages()
+    transaction.on_commit(invalidate_all_pages)
+
+
+@receiver(post_save, sender=Room, dispatch_uid="page_cache_room_saved")
+@receiver(post_delete, sender=Room, dispatch_uid="page_cache_room_deleted")
+@receiver(post_save, sender=TimeSlot, dispatch_uid="page_cache_time_slot_saved")
+@receiver(post_delete, sender=TimeSlot, dispatch_uid="page_cache_time_slot_deleted")
+@receiver(post_save, sender=Track, dispatch_uid="page_cache_track_saved")
+@receiver(post_delete, sender=Track, dispatch_uid="page_cache_track_deleted")
+@receiver(post_save, sender=Talk, dispatch_uid="page_cache_talk_saved")
+@receiver(post_delete, sender=Talk, dispatch_uid="page_cache_talk_deleted")
+@receiver(post_save, sender=PublishedSpeaker, dispatch_uid="page_cache_speaker_saved")
+@receiver(
+    post_delete, sender=PublishedSpeaker, dispatch_uid="page_cache_speaker_deleted"
+)
+def invalidate_on_event_data_change(sender, instance, **kwargs):
+    if instance.event_id is None:
+        return
+    event_slug = _event_slug(instance.event_id)
+    if event_slug is not None:
+        _invalidate_on_commit(event_slug)
+
+
+@receiver(post_save, sender=TalkSlot, dispatch_uid="page_cache_talk_slot_saved")
+@receiver(post_delete, sender=TalkSlot, dispatch_uid="page_cache_talk_slot_deleted")
+@receiver(post_save, sender=TalkMedia, dispatch_uid="page_cache_talk_media_saved")
+@receiver(post_delete, sender=TalkMedia, dispatch_uid="page_cache_talk_media_deleted")
+@receiver(
+    post_save,
+    sender=TalkPublishedSpeaker,
+    dispatch_uid="page_cache_talk_published_speaker_saved",
+)
+@receiver(
+    post_delete,
+    sender=TalkPublishedSpeaker,
+    dispatch_uid="page_cache_talk_published_speaker_deleted",
+)
+def invalidate_on_talk_data_change(sender, instance, **kwargs):
+    event_slug = (
+        Talk.objects.filter(id=instance.talk_id)
+        .values_list("event__slug", flat=True)
+        .first()
+    )
+    if event_slug is not None:
+        _invalidate_on_commit(event_slug)
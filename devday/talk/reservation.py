@@ -2,13 +2,67 @@
 Functions for reservation handling.
 
 """
+from collections import Counter
+from datetime import timedelta
+
 from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Value, When, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from talk.models import SessionReservation, Talk
+
+PROMOTE_WAITING_RESERVATIONS_SQL = """
+UPDATE {reservation} SET {is_waiting} = false, {modified} = %(now)s
+WHERE {id} IN (
+    SELECT ranked.{id} FROM (
+        SELECT r.{id}, r.{talk_id}, ROW_NUMBER() OVER (
+            PARTITION BY r.{talk_id} ORDER BY r.{created}, r.{id}
+        ) AS position
+        FROM {reservation} r
+        WHERE r.{is_waiting} AND r.{talk_id} = ANY(%(talk_ids)s)
+    ) ranked
+    JOIN {talk} t ON t.{talk_pk} = ranked.{talk_id}
+    WHERE ranked.position <= t.{spots} - t.{confirmed_count} - (
+        SELECT COUNT(*) FROM {reservation} p
+        WHERE p.{talk_id} = t.{talk_pk}
+        AND NOT p.{is_confirmed} AND NOT p.{is_waiting}
+        AND p.{modified} >= %(pending_since)s
+    )
+)
+RETURNING {id}, {talk_id}
+"""
+
+
+def _promote_waiting_reservations_sql():
+    reservation = SessionReservation._meta
+    talk = Talk._meta
+    qn = connection.ops.quote_name
+    return PROMOTE_WAITING_RESERVATIONS_SQL.format(
+        reservation=qn(reservation.db_table),
+        talk=qn(talk.db_table),
+        **{
+            name: qn(reservation.get_field(name).column)
+            for name in (
+                "id",
+                "talk_id",
+                "created",
+                "modified",
+                "is_confirmed",
+                "is_waiting",
+            )
+        },
+        talk_pk=qn(talk.pk.column),
+        spots=qn(talk.get_field("spots").column),
+        confirmed_count=qn(talk.get_field("confirmed_count").column),
+    )
 
 
 def get_reservation_email_context(reservation, request, confirmation_key):
     return {
-        "scheme": request.scheme,
+        "scheme": request.scheme if request is not None else "https",
         "confirmation_key": confirmation_key,
         "expiration_days": settings.TALK_RESERVATION_CONFIRMATION_DAYS,
         "site": get_current_site(request),
@@ -16,3 +70,165 @@ def get_reservation_email_context(reservation, request, confirmation_key):
         "event": reservation.talk.event,
         "user": reservation.attendee.user,
     }
+
+
+def annotate_waiting_positions(reservations):
+    """
+    Set ``waiting_position`` of each waiting reservation to its one based
+    position on the waiting list of its talk.
+
+    The waiting lists of all affected talks are ranked with ``ROW_NUMBER()``
+    in a single query, in the order in which
+    :py:func:`promote_waiting_reservations` promotes them.
+
+    :param reservations: iterable of reservations
+    :return: the reservations
+    """
+    waiting = [reservation for reservation in reservations if reservation.is_waiting]
+    if not waiting:
+        return reservations
+    talk_ids = {reservation.talk_id for reservation in waiting}
+    positions = dict(
+        SessionReservation.objects.filter(is_waiting=True, talk_id__in=talk_ids)
+        .annotate(
+            waiting_position=Window(
+                expression=RowNumber(),
+                partition_by=[F("talk_id")],
+                order_by=[F("created").asc(), F("id").asc()],
+            )
+        )
+        .values_list("id", "waiting_position")
+    )
+    for reservation in waiting:
+        reservation.waiting_position = positions.get(reservation.pk)
+    return reservations
+
+
+def confirm_reservation(reservation):
+    """
+    Confirm the reservation if its talk has a free spot, put it on the waiting
+    list otherwise.
+
+    The talk row is locked while its ``confirmed_count`` is checked and the
+    reservation is saved, so concurrent confirmations cannot overbook the
+    talk.
+
+    :param reservation: the reservation to confirm
+    :return: True if the reservation is confirmed
+    """
+    with transaction.atomic():
+        talk = (
+            Talk.objects.select_for_update()
+            .only("spots", "confirmed_count")
+            .get(pk=reservation.talk_id)
+        )
+        is_confirmed = (
+            SessionReservation.objects.filter(pk=reservation.pk)
+            .values_list("is_confirmed", flat=True)
+            .get()
+        )
+        if not is_confirmed and talk.is_fully_booked:
+            reservation.is_confirmed, reservation.is_waiting = False, True
+        else:
+            reservation.is_confirmed, reservation.is_waiting = True, False
+        reservation.save()
+        return reservation.is_confirmed
+
+
+def promote_waiting_reservations(talk_ids=None):
+    """
+    Take the oldest reservations from the waiting lists of the given talks,
+    as many as each talk has free spots, with a single ``UPDATE`` statement.
+
+    A spot is free unless it is taken by a confirmed reservation or by a
+    reservation that has been invited to confirm less than
+    ``TALK_RESERVATION_CONFIRMATION_DAYS`` ago. The talk rows are locked while
+    the reservations are promoted.
+
+    :param talk_ids: ids of the talks to process, defaults to all reservable
+        talks
+    :return: list of promoted reservations for notification, ordered by talk
+        and position on the waiting list
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        talks = Talk.objects.select_for_update().filter(waiting_count__gt=0)
+        if talk_ids is None:
+            talks = talks.filter(
+                pk__in=Talk.reservable.values_list("pk", flat=True)
+            )
+        else:
+            talks = talks.filter(pk__in=talk_ids, spots__gt=0)
+        talk_ids = list(talks.values_list("pk", flat=True))
+        if not talk_ids:
+            return []
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _promote_waiting_reservations_sql(),
+                {
+                    "now": now,
+                    "talk_ids": talk_ids,
+                    "pending_since": now
+                    - timedelta(days=settings.TALK_RESERVATION_CONFIRMATION_DAYS),
+                },
+            )
+            promoted = cursor.fetchall()
+        if not promoted:
+            return []
+
+        # the UPDATE bypasses SessionReservation.save()
+        promoted_per_talk = Counter(talk_id for _, talk_id in promoted)
+        Talk.objects.filter(pk__in=promoted_per_talk).update(
+            waiting_count=F("waiting_count")
+            - Case(
+                *[
+                    When(pk=talk_id, then=Value(count))
+                    for talk_id, count in promoted_per_talk.items()
+                ],
+                output_field=IntegerField(),
+            )
+        )
+        return list(
+            SessionReservation.objects.filter(
+                pk__in=[reservation_id for reservation_id, _ in promoted]
+            )
+            .select_related("talk", "talk__event", "attendee", "attendee__user")
+            .order_by("talk_id", "created", "id")
+        )
+
+
+def recount_reservations():
+    """
+    Count the confirmed and waiting reservations of all talks again, like
+    migration ``0048_talk_reservation_counters`` did, and correct counters
+    that differ. The talks are locked before the reservations are counted, so
+    reservations that change in the meantime are counted by their own
+    transactions. Returns the number of corrected talks.
+    """
+    corrected = 0
+    with transaction.atomic():
+        talks = list(
+            Talk.objects.select_for_update()
+            .order_by("pk")
+            .values_list("pk", "confirmed_count", "waiting_count")
+        )
+        counts = {
+            talk_id: (confirmed, waiting)
+            for talk_id, confirmed, waiting in SessionReservation.objects.values(
+                "talk_id"
+            )
+            .annotate(
+                confirmed=Count("id", filter=Q(is_confirmed=True)),
+                waiting=Count("id", filter=Q(is_waiting=True)),
+            )
+            .values_list("talk_id", "confirmed", "waiting")
+        }
+        for talk_id, confirmed_count, waiting_count in talks:
+            confirmed, waiting = counts.get(talk_id, (0, 0))
+            if (confirmed_count, waiting_count) != (confirmed, waiting):
+                Talk.objects.filter(pk=talk_id).update(
+                    confirmed_count=confirmed, waiting_count=waiting
+                )
+                corrected += 1
+    return corrected
@@ -0,0 +1,194 @@
+"""
+Layout of the session grid.
+
+The grid shows the time slots of an event grouped in blocks. Each block is a
+table with a column per room that is used in the block and a row per distinct
+start time. Time slots that lie within other time slots of the same block
+(e.g. a long workshop in parallel to several talks) are rendered with a
+rowspan, time slots that contain exactly one other time slot get a colspan.
+
+:py:func:`layout_schedule` works on plain lists of model instances and does
+not issue any database queries.
+
+"""
+from collections import defaultdict
+
+
+class _FenwickTree(object):
+    """
+    Binary indexed tree counting values by rank (1 based).
+    """
+
+    def __init__(self, size):
+        self.tree = [0] * (size + 1)
+        self.total = 0
+
+    def add(self, rank):
+        self.total += 1
+        while rank < len(self.tree):
+            self.tree[rank] += 1
+            rank += rank & -rank
+
+    def count_up_to(self, rank):
+        count = 0
+        while rank > 0:
+            count += self.tree[rank]
+            rank -= rank & -rank
+        return count
+
+    def count_from(self, rank):
+        return self.total - self.count_up_to(rank - 1)
+
+
+def _sweep(time_slots, order, rank, count):
+    """
+    Add the end times of the time slots in the given order to a Fenwick tree
+    and count for each time slot the matching end times of all time slots
+    with the same or an earlier position in the order. Time slots with the
+    same start time are added before any of them is counted.
+    """
+    tree = _FenwickTree(len(rank))
+    counts = [0] * len(time_slots)
+    position = 0
+    while position < len(order):
+        start_time = time_slots[order[position]].start_time
+        group_end = position
+        while (
+            group_end < len(order)
+            and time_slots[order[group_end]].start_time == start_time
+        ):
+            tree.add(rank[time_slots[order[group_end]].end_time])
+            group_end += 1
+        for index in order[position:group_end]:
+            # subtract the time slot itself
+            counts[index] = count(tree, rank[time_slots[index].end_time]) - 1
+        position = group_end
+    return counts
+
+
+def count_overlaps(time_slots):
+    """
+    Count the overlaps of each time slot in the given list.
+
+    The overlap count of a time slot is the number of other time slots that
+    it lies within plus the number of other time slots that lie within it.
+    Time slots with identical start and end times lie within each other and
+    are therefore counted twice.
+
+    The counts are computed with two sorted sweeps in O(n log n).
+
+    :param time_slots: list of objects with start_time and end_time
+    :return: list of overlap counts in the order of time_slots
+    """
+    rank = {
+        end_time: position
+        for position, end_time in enumerate(
+            sorted({time_slot.end_time for time_slot in time_slots}), start=1
+        )
+    }
+    ascending = sorted(
+        range(len(time_slots)), key=lambda index: time_slots[index].start_time
+    )
+    # time slots starting before and ending after a time slot contain it
+    containing = _sweep(time_slots, ascending, rank, lambda tree, r: tree.count_from(r))
+    # time slots starting after and ending before a time slot lie within it
+    contained = _sweep(
+        time_slots,
+        list(reversed(ascending)),
+        rank,
+        lambda tree, r: tree.count_up_to(r),
+    )
+    return [a + b for a, b in zip(containing, contained)]
+
+
+def _time_slot_order(time_slot):
+    return time_slot.block, time_slot.start_time, time_slot.end_time
+
+
+def layout_schedule(time_slots, talk_slots, rooms):
+    """
+    Compute the session grid layout.
+
+    The result is a dictionary mapping block numbers to dictionaries with the
+    following keys:
+
+    ``time_slots``
+      list of ``(time_slot, [(room_id, talk), ...], overlap_count)`` tuples in
+      block, start and end time order
+
+    ``rooms``
+      list of the rooms used in the block, in the order of ``rooms``
+
+    ``schedule``
+      list of rows, one per distinct start time. Each row is a dictionary
+      with a ``time_slots`` list of ``[time_slot, attributes]`` pairs and a
+      ``room_talks`` dictionary mapping rooms to a flat list of
+      ``time_slot, talks, attributes`` triples. The attributes contain the
+      ``rowspan`` or ``colspan`` of the time slot if any.
+
+    :param time_slots: time slots of the event
+    :param talk_slots: talk slots of the event, talks are listed in this order
+    :param rooms: rooms of the event in display order
+    :return: dictionary of blocks
+    """
+    talks_by_time = defaultdict(list)
+    for talk_slot in talk_slots:
+        talks_by_time[talk_slot.time_id].append((talk_slot.room_id, talk_slot.talk))
+    room_positions = {room.id: position for position, room in enumerate(rooms)}
+
+    blocks = {}
+    for time_slot in sorted(time_slots, key=_time_slot_order):
+        block = blocks.setdefault(time_slot.block, {"time_slots": [], "rooms": set()})
+        time_talk_slots = talks_by_time.get(time_slot.id, [])
+        block["time_slots"].append((time_slot, time_talk_slots))
+        block["rooms"].update(room_id for room_id, _ in time_talk_slots)
+
+    for block in blocks.values():
+        block_positions = sorted(
+            room_positions[room_id]
+            for room_id in block["rooms"]
+            if room_id in room_positions
+        )
+        block["rooms"] = [rooms[position] for position in block_positions]
+        overlaps = count_overlaps([time_slot for time_slot, _ in block["time_slots"]])
+        block["time_slots"] = [
+            (time_slot, time_talk_slots, overlap_count)
+            for (time_slot, time_talk_slots), overlap_count in zip(
+                block["time_slots"], overlaps
+            )
+        ]
+        block["schedule"] = _layout_block(block, room_positions)
+    return blocks
+
+
+def _layout_block(block, room_positions):
+    room_count = len(block["rooms"])
+    rooms_by_id = {room.id: room for room in block["rooms"]}
+    schedule = []
+    rows_by_start_time = {}
+
+    for time_slot, time_talk_slots, overlap_count in block["time_slots"]:
+        attributes = {}
+        if overlap_count > 1:
+            attributes["rowspan"] = overlap_count
+        elif overlap_count == 1:
+            attributes["colspan"] = room_count - 1
+
+        if time_slot.start_time in rows_by_start_time:
+            row = schedule[rows_by_start_time[time_slot.start_time]]
+            row["time_slots"].append([time_slot, attributes])
+        else:
+            rows_by_start_time[time_slot.start_time] = len(schedule)
+            row = {"time_slots": [[time_slot, attributes]], "room_talks": {}}
+            schedule.append(row)
+
+        room_talks = {}
+        for room_id, talk in time_talk_slots:
+            if room_id in room_positions:
+                room_talks.setdefault(room_id, []).append(talk)
+        for room_id in sorted(room_talks, key=room_positions.get):
+            room = rooms_by_id[room_id]
+            row["room_talks"].setdefault(room, []).extend(
+                [time_slot, room_talks[room_id], attributes]
+            )
+    return schedule
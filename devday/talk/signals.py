@@ -4,10 +4,14 @@ Custom signals sent during the confirmation processes.
 """
 from attendee.signals import attendence_cancelled
 from django.conf import settings
+from django.db import transaction
 from django.dispatch import Signal, receiver
 from django.template.loader import render_to_string
 from talk.models import SessionReservation
-from talk.reservation import get_reservation_email_context
+from talk.reservation import (
+    get_reservation_email_context,
+    promote_waiting_reservations,
+)
 
 session_reservation_confirmed = Signal(providing_args=["reservation", "request"])
 
@@ -38,40 +42,42 @@ def send_reservation_confirmation_mail(
     user.email_user(subject, message, settings.DEFAULT_FROM_EMAIL)
 
 
+def promote_waiting_list(talk_ids=None, request=None):
+    """
+    Promote waiting reservations to free spots of the given talks and send
+    confirmation mails to the promoted attendees.
+
+    :param talk_ids: ids of the talks to process, defaults to all reservable
+        talks
+    :param request: request used to build the confirmation links, if any
+    :return: list of promoted reservations
+    """
+    promoted = promote_waiting_reservations(talk_ids)
+    for reservation in promoted:
+        send_reservation_confirmation_mail(
+            request, reservation, reservation.attendee.user
+        )
+    return promoted
+
+
+def _promote_on_commit(talk_ids, request):
+    # the signals are sent before the cancelled reservations are deleted,
+    # their spots are free once the transaction has been committed
+    transaction.on_commit(lambda: promote_waiting_list(talk_ids, request))
+
+
 @receiver(session_reservation_cancelled, dispatch_uid="talk_check_pending_reservations")
 def send_confirmation_mails_to_pending_reservations(sender, **kwargs):
     old_reservation = kwargs.get("reservation")
-    request = kwargs.get("request")
-    reservation = (
-        SessionReservation.objects.filter(
-            talk_id=old_reservation.talk_id, is_waiting=True
-        )
-        .select_related("talk", "talk__event", "attendee", "attendee__user")
-        .order_by("created")
-        .first()
-    )
-    if reservation:
-        user = reservation.attendee.user
-        reservation.is_waiting = False
-        reservation.save()
-        send_reservation_confirmation_mail(request, reservation, user)
+    _promote_on_commit([old_reservation.talk_id], kwargs.get("request"))
 
 
 @receiver(attendence_cancelled, dispatch_uid="talk_check_pending_reservations_attendee")
 def send_confirmation_mails_to_remaining_attendees(sender, **kwargs):
-    old_attendee = kwargs.get("attendee")
-    request = kwargs.get("request")
-    for old_reservation in SessionReservation.objects.filter(attendee=old_attendee):
-        reservation = (
-            SessionReservation.objects.filter(
-                talk_id=old_reservation.talk_id, is_waiting=True
-            )
-            .select_related("talk", "talk__event", "attendee", "attendee__user")
-            .order_by("created")
-            .first()
+    talk_ids = list(
+        SessionReservation.objects.filter(attendee=kwargs.get("attendee")).values_list(
+            "talk_id", flat=True
         )
-        if reservation:
-            user = reservation.attendee.user
-            reservation.is_waiting = False
-            reservation.save()
-            send_reservation_confirmation_mail(request, reservation, user)
+    )
+    if talk_ids:
+        _promote_on_commit(talk_ids, kwargs.get("request"))
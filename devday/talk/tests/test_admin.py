@@ -11,6 +11,7 @@ from attendee.tests import attendee_testutils
 from devday.utils.devdata import DevData
 from event.models import Event
 from event.tests import event_testutils
+from outbox.mail import send_queued_mail
 from speaker.tests import speaker_testutils
 from talk.forms import AddTalkSlotFormStep1, AddTalkSlotFormStep2
 from talk.models import (
@@ -168,6 +169,7 @@ class AdminTest(TestCase):
         self.assertTrue(reservations[1].is_waiting)
         reservations[2].refresh_from_db()
         self.assertFalse(reservations[2].is_waiting)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn(reservations[2].attendee.user.email, mail.outbox[0].recipients())
         mail.outbox.clear()
@@ -0,0 +1,124 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk.models import TalkDraftSpeaker, Track
+from talk.tests import talk_testutils
+
+
+class SessionViewSetTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = event_testutils.create_test_event()
+        cls.other_event = event_testutils.create_test_event("Other Event")
+        cls.user, _ = attendee_testutils.create_test_user()
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def create_sessions(self, event, count, start=0):
+        track, _ = Track.objects.get_or_create(event=event, name="Track")
+        for index in range(start, start + count):
+            speaker, _, _ = speaker_testutils.create_test_speaker(
+                "speaker{}-{}@example.org".format(event.slug, index),
+                "Speaker {}".format(index),
+            )
+            talk = talk_testutils.create_test_talk(
+                speaker, event, "Talk {} {}".format(event.slug, index)
+            )
+            talk.publish(track)
+
+    def count_queries(self, url):
+        # the first request loads the CMS URL configuration
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.json()
+
+    def test_list_constant_queries(self):
+        self.create_sessions(self.event, 2)
+        count, data = self.count_queries("/api/sessions/")
+        self.assertEqual(len(data["results"]), 2)
+        self.create_sessions(self.event, 2, start=2)
+        with self.assertNumQueries(count):
+            response = self.client.get("/api/sessions/")
+        self.assertEqual(len(response.json()["results"]), 4)
+
+    def test_list_without_duplicates(self):
+        self.create_sessions(self.event, 1)
+        talk = self.event.talk_set.get()
+        speaker, _, _ = speaker_testutils.create_test_speaker(
+            "cospeaker@example.org", "Co Speaker"
+        )
+        TalkDraftSpeaker.objects.create(talk=talk, draft_speaker=speaker, order=2)
+        talk.publish(talk.track)
+        data = self.client.get("/api/sessions/").json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(len(data["results"][0]["speakers"]), 2)
+
+    def test_list_filter_by_event(self):
+        self.create_sessions(self.event, 2)
+        self.create_sessions(self.other_event, 1)
+        data = self.client.get(
+            "/api/sessions/", {"event": self.other_event.slug}
+        ).json()
+        self.assertEqual(
+            [session["event"] for session in data["results"]],
+            [str(self.other_event)],
+        )
+
+    def test_list_pagination(self):
+        self.create_sessions(self.event, 3)
+        data = self.client.get("/api/sessions/", {"page_size": 2}).json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["next"])
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(len(data["results"]), 1)
+        self.assertIsNone(data["next"])
+
+    def test_not_modified(self):
+        self.create_sessions(self.event, 2)
+        response = self.client.get("/api/sessions/")
+        self.assertIn("Last-Modified", response)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                "/api/sessions/", HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse([query for query in queries if "talk_talk" in query["sql"]])
+
+    def test_if_modified_since(self):
+        self.create_sessions(self.event, 1)
+        response = self.client.get("/api/sessions/")
+        response = self.client.get(
+            "/api/sessions/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_modified_after_change(self):
+        self.create_sessions(self.event, 1)
+        etag = self.client.get("/api/sessions/")["ETag"]
+        talk = self.event.talk_set.get()
+        talk.title = "Changed"
+        with patch(
+            "talk.api_versions.transaction.on_commit", side_effect=lambda func: func()
+        ):
+            talk.save()
+        response = self.client.get("/api/sessions/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.json()["results"][0]["title"], "Changed")
+
+    def test_etag_depends_on_query(self):
+        self.create_sessions(self.event, 1)
+        etag = self.client.get("/api/sessions/")["ETag"]
+        response = self.client.get(
+            "/api/sessions/", {"event": self.event.slug}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,117 @@
+import gzip
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from devday.api import invalidate_api_versions
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk.bundle import build_event_bundle, encode_event_bundle, get_event_bundle
+from talk.models import Room, TalkSlot, TimeSlot, Track
+from talk.tests import talk_testutils
+
+
+class EventBundleTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = event_testutils.create_test_event(sessions_published=True)
+        self.track = Track.objects.create(name="Things", event=self.event)
+        self.room = Room.objects.create(name="Room 1", event=self.event)
+        self.time_slot = TimeSlot.objects.create(name="Morning", event=self.event)
+        self.talks = []
+        for index in range(2):
+            speaker, _, _ = speaker_testutils.create_test_speaker(
+                "speaker{}@example.org".format(index), "Speaker {}".format(index)
+            )
+            talk = talk_testutils.create_test_talk(
+                speaker, self.event, "Talk {}".format(index)
+            )
+            talk.publish(self.track)
+            self.talks.append(talk)
+        TalkSlot.objects.create(talk=self.talks[0], room=self.room, time=self.time_slot)
+        # not part of the program
+        speaker, _, _ = speaker_testutils.create_test_speaker(
+            "draft@example.org", "Draft Speaker"
+        )
+        talk_testutils.create_test_talk(speaker, self.event, "Draft")
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_build(self):
+        with self.assertNumQueries(5):
+            bundle = build_event_bundle(self.event)
+        self.assertEqual(bundle["event"]["id"], self.event.slug)
+        self.assertEqual(bundle["tracks"], [{"id": self.track.id, "name": "Things"}])
+        self.assertEqual(
+            bundle["rooms"], [{"id": self.room.id, "name": "Room 1", "priority": 0}]
+        )
+        self.assertEqual(
+            [time_slot["id"] for time_slot in bundle["time_slots"]],
+            [self.time_slot.id],
+        )
+        self.assertEqual(
+            [
+                (session["id"], session["room"], session["time_slot"])
+                for session in bundle["sessions"]
+            ],
+            [
+                (self.talks[0].slug, self.room.id, self.time_slot.id),
+                (self.talks[1].slug, None, None),
+            ],
+        )
+        self.assertEqual(
+            [speaker["name"] for speaker in bundle["speakers"]],
+            ["Speaker 0", "Speaker 1"],
+        )
+        self.assertEqual(
+            bundle["sessions"][0]["speakers"], [bundle["speakers"][0]["id"]]
+        )
+
+    def test_encode(self):
+        version, data = encode_event_bundle(build_event_bundle(self.event))
+        document = json.loads(gzip.decompress(data))
+        self.assertEqual(document["version"], version)
+        self.assertEqual(
+            encode_event_bundle(build_event_bundle(self.event)), (version, data)
+        )
+
+    @patch("talk.bundle._in_transaction", return_value=False)
+    def test_get_cached(self, _):
+        bundle = get_event_bundle(self.event)
+        # only the API versions are read
+        with self.assertNumQueries(1):
+            self.assertEqual(get_event_bundle(self.event), bundle)
+
+    @patch("talk.bundle._in_transaction", return_value=False)
+    def test_rebuilt_on_version_change_by_other_process(self, _):
+        get_event_bundle(self.event)
+        Room.objects.filter(pk=self.room.pk).update(name="Main Hall")
+        # another web server process has replaced the version in the database
+        invalidate_api_versions("program")
+        _, data = get_event_bundle(self.event)
+        self.assertEqual(
+            json.loads(gzip.decompress(data))["rooms"][0]["name"], "Main Hall"
+        )
+
+    @patch("talk.bundle._in_transaction", return_value=False)
+    def test_rebuilt_on_program_change(self, _):
+        version, _ = get_event_bundle(self.event)
+        self.room.name = "Main Hall"
+        with patch(
+            "talk.api_versions.transaction.on_commit", side_effect=lambda func: func()
+        ):
+            self.room.save()
+        new_version, data = get_event_bundle(self.event)
+        self.assertNotEqual(new_version, version)
+        self.assertEqual(
+            json.loads(gzip.decompress(data))["rooms"][0]["name"], "Main Hall"
+        )
+
+    def test_not_cached_in_transaction(self):
+        get_event_bundle(self.event)
+        # the API versions and the bundle data
+        with self.assertNumQueries(6):
+            get_event_bundle(self.event)
@@ -0,0 +1,102 @@
+from django.test import TestCase
+
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk.committee_export import (
+    get_committee_export_queryset,
+    iter_committee_export_rows,
+)
+from talk.models import Talk, TalkComment, TalkDraftSpeaker, TalkFormat, Vote
+
+
+class CommitteeExportTest(TestCase):
+    def setUp(self):
+        self.event = event_testutils.create_test_event()
+        self.speaker, _, _ = speaker_testutils.create_test_speaker(
+            name="First Speaker", organization="First Org"
+        )
+        self.other_speaker, _, _ = speaker_testutils.create_test_speaker(
+            email="other@example.org", name="Other Speaker", organization="Other Org"
+        )
+        self.voters = [
+            attendee_testutils.create_test_user("voter{}@example.org".format(index))[0]
+            for index in range(3)
+        ]
+        self.long_format = TalkFormat.objects.create(name="Talk", duration=60)
+        self.short_format = TalkFormat.objects.create(name="Lightning", duration=10)
+
+    def create_talks(self, count):
+        talks = []
+        for index in range(count):
+            talk = Talk.objects.create(
+                draft_speaker=self.speaker,
+                title="Talk {:02d}".format(index),
+                abstract="Abstract {}".format(index),
+                event=self.event,
+            )
+            TalkDraftSpeaker.objects.create(talk=talk, draft_speaker=self.other_speaker)
+            talk.talkformat.add(self.long_format, self.short_format)
+            for score, voter in enumerate(self.voters, start=1):
+                Vote.objects.create(voter=voter, talk=talk, score=score)
+                TalkComment.objects.create(
+                    commenter=voter, talk=talk, comment="Comment {}".format(score)
+                )
+            talks.append(talk)
+        return talks
+
+    def export(self, chunk_size=500):
+        return list(
+            iter_committee_export_rows(
+                get_committee_export_queryset(self.event).order_by("title"),
+                chunk_size,
+            )
+        )
+
+    def test_row_content(self):
+        talk = self.create_talks(1)[0]
+        Talk.objects.create(
+            draft_speaker=self.speaker, title="Unrated", event=self.event
+        )
+        rows = self.export()
+        self.assertEqual(len(rows), 2)
+        row = rows[0]
+        self.assertEqual(row.id, talk.id)
+        self.assertEqual(row.title, "Talk 00")
+        self.assertEqual(row.abstract, "Abstract 0")
+        self.assertEqual(row.average_score, 2.0)
+        self.assertEqual(row.vote_sum, 6)
+        self.assertEqual(row.vote_count, 3)
+        self.assertEqual(
+            row.speakers,
+            [("First Speaker", "First Org"), ("Other Speaker", "Other Org")],
+        )
+        self.assertEqual(row.formats, ["Lightning (0:10h)", "Talk (1:00h)"])
+        self.assertEqual(
+            [(c.commenter, c.comment) for c in row.comments],
+            [
+                ("voter0@example.org", "Comment 1"),
+                ("voter1@example.org", "Comment 2"),
+                ("voter2@example.org", "Comment 3"),
+            ],
+        )
+        unrated = rows[1]
+        self.assertIsNone(unrated.average_score)
+        self.assertEqual(unrated.vote_count, 0)
+        self.assertEqual(unrated.formats, [])
+        self.assertEqual(unrated.comments, [])
+
+    def test_query_budget(self):
+        self.create_talks(10)
+        # talks, speakers, formats and comments
+        with self.assertNumQueries(4):
+            self.assertEqual(len(self.export()), 10)
+
+    def test_query_budget_per_chunk(self):
+        self.create_talks(10)
+        # the talks query plus speakers, formats and comments for each chunk
+        with self.assertNumQueries(1 + 3 * 3):
+            rows = self.export(chunk_size=4)
+        self.assertEqual(
+            [row.title for row in rows], ["Talk {:02d}".format(i) for i in range(10)]
+        )
@@ -4,7 +4,9 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core import signing
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from django.utils.translation import ugettext as _
 
@@ -566,10 +568,86 @@ class SessionReservationTest(TestCase):
         talk.publish(track=track)
         user, _ = attendee_testutils.create_test_user()
         attendee = Attendee.objects.create(user=user, event=event)
+        self.talk = talk
         self.reservation = SessionReservation.objects.create(
             talk=talk, attendee=attendee
         )
 
+    def assert_counters(self, confirmed, waiting):
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.confirmed_count, confirmed)
+        self.assertEqual(self.talk.waiting_count, waiting)
+
+    def test_counters_follow_state(self):
+        self.assert_counters(0, 0)
+        self.reservation.is_waiting = True
+        self.reservation.save()
+        self.assert_counters(0, 1)
+        self.reservation.is_waiting = False
+        self.reservation.is_confirmed = True
+        self.reservation.save()
+        self.assert_counters(1, 0)
+        self.reservation.save()
+        self.assert_counters(1, 0)
+
+    def test_counters_on_create_and_delete(self):
+        user, _ = attendee_testutils.create_test_user("other@example.org")
+        attendee = Attendee.objects.create(user=user, event=self.talk.event)
+        reservation = SessionReservation.objects.create(
+            talk=self.talk, attendee=attendee, is_confirmed=True
+        )
+        self.assert_counters(1, 0)
+        reservation.delete()
+        self.assert_counters(0, 0)
+
+    def test_save_locks_talk_before_reservation(self):
+        self.reservation.is_waiting = True
+        with CaptureQueriesContext(connection) as queries:
+            self.reservation.save()
+        locked = [
+            query["sql"].split(" FROM ")[1].split()[0]
+            for query in queries
+            if query["sql"].endswith("FOR UPDATE")
+        ]
+        self.assertEqual(locked, ['"talk_talk"', '"talk_sessionreservation"'])
+
+    def test_delete_locks_talk_before_reservation(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.reservation.delete()
+        locked = [
+            query["sql"].split(" FROM ")[1].split()[0]
+            for query in queries
+            if query["sql"].endswith("FOR UPDATE")
+        ]
+        self.assertEqual(locked, ['"talk_talk"', '"talk_sessionreservation"'])
+
+    def test_saving_stale_talk_keeps_counters(self):
+        talk = Talk.objects.get(pk=self.talk.pk)
+        self.reservation.is_confirmed = True
+        self.reservation.save()
+        talk.title = "Changed"
+        talk.save()
+        self.assert_counters(1, 0)
+        self.assertEqual(self.talk.title, "Changed")
+
+    def test_counters_on_delete_of_outdated_instance(self):
+        self.reservation.is_waiting = True
+        self.reservation.save()
+        # promoted from the waiting list after the instance has been loaded
+        SessionReservation.objects.filter(pk=self.reservation.pk).update(
+            is_waiting=False
+        )
+        Talk.objects.filter(pk=self.talk.pk).update(waiting_count=0)
+        self.reservation.delete()
+        self.assert_counters(0, 0)
+
+    def test_counters_on_cascade_delete(self):
+        self.reservation.is_waiting = True
+        self.reservation.save()
+        self.assert_counters(0, 1)
+        self.reservation.attendee.delete()
+        self.assert_counters(0, 0)
+
     @override_settings(
         CONFIRMATION_SALT="test_salt_confirmation", TALK_RESERVATION_CONFIRMATION_DAYS=5
     )
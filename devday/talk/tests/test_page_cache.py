@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from attendee.tests import attendee_testutils
+from event.tests import event_testutils
+from speaker.tests import speaker_testutils
+from talk.models import Room, TalkMedia, TalkSlot, TimeSlot, Track
+from talk.tests import talk_testutils
+
+
+@patch("talk.page_cache._in_transaction", return_value=False)
+class AnonymousPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.event = event_testutils.create_test_event(sessions_published=True)
+        self.url = "/{}/videos/".format(self.event.slug)
+        speaker, _, _ = speaker_testutils.create_test_speaker()
+        self.talk = talk_testutils.create_test_talk(speaker, self.event, "Talk 1")
+        self.track = Track.objects.create(name="Things", event=self.event)
+        self.talk.publish(self.track)
+
+    def tearDown(self):
+        cache.clear()
+
+    def assert_cached(self, url=None):
+        url = url or self.url
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_anonymous_response_cached(self, _):
+        self.client.get(self.url)
+        # the cms apphook reload middleware queries the urlconf revision
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context)
+
+    def test_cached_views(self, _):
+        talk_url = "/{}/talk/{}/".format(self.event.slug, self.talk.slug)
+        speaker = self.talk.published_speakers.first()
+        for url in (
+            "/{}/sessions/".format(self.event.slug),
+            talk_url,
+            "/{}/speaker/".format(self.event.slug),
+            "/{}/speaker/{}/".format(self.event.slug, speaker.slug),
+        ):
+            with self.subTest(url=url):
+                self.assert_cached(url)
+
+    def test_authenticated_response_not_cached(self, _):
+        user, password = attendee_testutils.create_test_user()
+        self.client.login(username=user.email, password=password)
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+
+    def test_query_string_is_part_of_key(self, _):
+        self.client.get(self.url)
+        response = self.client.get(self.url + "?page=2")
+        self.assertIsNotNone(response.context)
+
+    def test_not_cached_inside_transaction(self, in_transaction):
+        in_transaction.return_value = True
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self, _):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+
+    def test_not_found_not_cached(self, _):
+        url = "/{}/talk/no-such-talk/".format(self.event.slug)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNotNone(response.context)
+
+    def test_talk_media_invalidates(self, _):
+        self.assert_cached()
+        TalkMedia.objects.create(talk=self.talk, video="https://example.org/video")
+        response = self.client.get(self.url)
+        self.assertIsNotNone(response.context)
+        self.assertIn(self.talk, response.context["talk_list"])
+
+    def test_talk_change_invalidates(self, _):
+        self.assert_cached()
+        self.talk.title = "Changed"
+        self.talk.save()
+        self.assertIsNotNone(self.client.get(self.url).context)
+
+    def test_schedule_changes_invalidate(self, _):
+        room = Room.objects.create(name="Room", event=self.event)
+        time_slot = TimeSlot.objects.create(name="Slot", event=self.event)
+        for change in (
+            lambda: TalkSlot.objects.create(talk=self.talk, room=room, time=time_slot),
+            lambda: TalkSlot.objects.filter(talk=self.talk).delete(),
+            lambda: Room.objects.create(name="Other Room", event=self.event),
+            lambda: TimeSlot.objects.create(name="Other Slot", event=self.event),
+            lambda: Track.objects.create(name="Other Track", event=self.event),
+            lambda: self.talk.published_speakers.first().save(),
+            lambda: self.event.save(),
+        ):
+            self.assert_cached()
+            change()
+            self.assertIsNotNone(self.client.get(self.url).context)
+
+    def test_other_event_change_keeps_cache(self, _):
+        other_event = event_testutils.create_test_event("Other Event")
+        self.assert_cached()
+        Track.objects.create(name="Other Things", event=other_event)
+        self.assert_cached()
@@ -1,10 +1,57 @@
+import threading
+from datetime import timedelta
+from io import StringIO
 from unittest import mock
 
+from django.conf import settings
 from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.db import connection
 from django.http import HttpRequest
-from django.test import TestCase, override_settings
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-from talk.reservation import get_reservation_email_context
+from attendee.models import Attendee
+from attendee.tests import attendee_testutils
+from event.tests.event_testutils import create_test_event
+from speaker.tests import speaker_testutils
+from talk.models import SessionReservation, Talk
+from talk.reservation import (
+    annotate_waiting_positions,
+    confirm_reservation,
+    get_reservation_email_context,
+    promote_waiting_reservations,
+    recount_reservations,
+)
+
+
+def create_reservations(spots, count, event=None, prefix="attendee"):
+    if event is None:
+        start_time = timezone.now() + timedelta(days=1)
+        event = create_test_event(
+            start_time=start_time, end_time=start_time + timedelta(hours=8)
+        )
+    speaker, _, _ = speaker_testutils.create_test_speaker(
+        "{}-speaker@example.org".format(prefix)
+    )
+    talk = Talk.objects.create(
+        draft_speaker=speaker,
+        title="Workshop",
+        abstract="Test abstract",
+        event=event,
+        spots=spots,
+    )
+    reservations = []
+    for i in range(count):
+        user, _ = attendee_testutils.create_test_user(
+            "{}{}@example.org".format(prefix, i)
+        )
+        attendee = Attendee.objects.create(user=user, event=event)
+        reservations.append(
+            SessionReservation.objects.create(talk=talk, attendee=attendee)
+        )
+    return talk, reservations
 
 
 class ReservationEmailContextTest(TestCase):
@@ -36,3 +83,193 @@ class ReservationEmailContextTest(TestCase):
         self.assertEqual(data["event"], "Test event")
         self.assertIn("user", data)
         self.assertEqual(data["user"], "fakeuser")
+
+
+class ConfirmReservationTest(TestCase):
+    def setUp(self):
+        self.talk, self.reservations = create_reservations(spots=1, count=2)
+
+    def test_confirm_free_spot(self):
+        first, second = self.reservations
+        self.assertTrue(confirm_reservation(first))
+        self.assertTrue(first.is_confirmed)
+        self.assertFalse(first.is_waiting)
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.confirmed_count, 1)
+
+    def test_confirm_fully_booked(self):
+        first, second = self.reservations
+        confirm_reservation(first)
+        self.assertFalse(confirm_reservation(second))
+        second.refresh_from_db()
+        self.assertFalse(second.is_confirmed)
+        self.assertTrue(second.is_waiting)
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.confirmed_count, 1)
+        self.assertEqual(self.talk.waiting_count, 1)
+
+    def test_confirm_twice(self):
+        first, _ = self.reservations
+        confirm_reservation(first)
+        self.assertTrue(confirm_reservation(first))
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.confirmed_count, 1)
+
+
+class RecountReservationsTest(TestCase):
+    def setUp(self):
+        self.talk, self.reservations = create_reservations(spots=1, count=3)
+        first, second, _ = self.reservations
+        confirm_reservation(first)
+        confirm_reservation(second)
+
+    def test_recount(self):
+        Talk.objects.filter(pk=self.talk.pk).update(confirmed_count=3, waiting_count=0)
+        self.assertEqual(recount_reservations(), 1)
+        self.talk.refresh_from_db()
+        self.assertEqual((self.talk.confirmed_count, self.talk.waiting_count), (1, 1))
+        self.assertEqual(recount_reservations(), 0)
+
+    def test_talk_without_reservations(self):
+        SessionReservation.objects.filter(talk=self.talk).delete()
+        Talk.objects.filter(pk=self.talk.pk).update(confirmed_count=1)
+        recount_reservations()
+        self.talk.refresh_from_db()
+        self.assertEqual((self.talk.confirmed_count, self.talk.waiting_count), (0, 0))
+
+    def test_command(self):
+        Talk.objects.filter(pk=self.talk.pk).update(waiting_count=5)
+        out = StringIO()
+        call_command("recount_reservations", stdout=out)
+        self.assertIn("corrected the reservation counters of 1 talks", out.getvalue())
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.waiting_count, 1)
+
+
+class ConcurrentConfirmReservationTest(TransactionTestCase):
+    def test_no_overbooking(self):
+        spots, attendees = 3, 10
+        talk, reservations = create_reservations(spots=spots, count=attendees)
+        barrier = threading.Barrier(attendees)
+        results = []
+
+        def confirm(reservation):
+            try:
+                barrier.wait()
+                results.append(confirm_reservation(reservation))
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=confirm, args=(reservation,))
+            for reservation in reservations
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), spots)
+        self.assertEqual(
+            SessionReservation.objects.filter(talk=talk, is_confirmed=True).count(),
+            spots,
+        )
+        talk.refresh_from_db()
+        self.assertEqual(talk.confirmed_count, spots)
+        self.assertEqual(talk.waiting_count, attendees - spots)
+
+
+class PromoteWaitingReservationsTest(TestCase):
+    def setUp(self):
+        self.talk, self.reservations = create_reservations(spots=2, count=5)
+
+    def set_state(self, reservation, is_confirmed=False, is_waiting=False, **kwargs):
+        reservation.is_confirmed = is_confirmed
+        reservation.is_waiting = is_waiting
+        reservation.save()
+        if kwargs:
+            SessionReservation.objects.filter(pk=reservation.pk).update(**kwargs)
+
+    def test_promotes_oldest_to_free_spots(self):
+        first, second, third, fourth, fifth = self.reservations
+        self.set_state(first, is_confirmed=True)
+        for reservation in (second, third, fourth):
+            self.set_state(reservation, is_waiting=True)
+        SessionReservation.objects.filter(pk=second.pk).update(
+            created=timezone.now() + timedelta(minutes=1)
+        )
+        # fifth is invited but has not confirmed yet and takes the second spot
+        promoted = promote_waiting_reservations([self.talk.id])
+        self.assertEqual(promoted, [])
+
+        fifth.delete()
+        promoted = promote_waiting_reservations([self.talk.id])
+        self.assertEqual(promoted, [third])
+        self.assertFalse(SessionReservation.objects.get(pk=third.pk).is_waiting)
+        self.talk.refresh_from_db()
+        self.assertEqual(self.talk.waiting_count, 2)
+
+    def test_expired_invitation_releases_spot(self):
+        first, second, third, _, _ = self.reservations
+        for reservation in self.reservations[3:]:
+            reservation.delete()
+        self.set_state(first, is_confirmed=True)
+        self.set_state(
+            second,
+            modified=timezone.now()
+            - timedelta(days=settings.TALK_RESERVATION_CONFIRMATION_DAYS + 1),
+        )
+        self.set_state(third, is_waiting=True)
+        self.assertEqual(promote_waiting_reservations([self.talk.id]), [third])
+
+    def test_constant_queries(self):
+        other_talk, others = create_reservations(
+            spots=3, count=4, event=self.talk.event, prefix="other"
+        )
+        for reservation in self.reservations + others:
+            self.set_state(reservation, is_waiting=True)
+        with CaptureQueriesContext(connection) as queries:
+            promoted = promote_waiting_reservations()
+        self.assertEqual(len(promoted), 5)
+        self.assertEqual(
+            [(r.talk_id, r.pk) for r in promoted],
+            [(self.talk.id, r.pk) for r in self.reservations[:2]]
+            + [(other_talk.id, r.pk) for r in others[:3]],
+        )
+        self.assertLessEqual(len(queries), 6)
+        self.talk.refresh_from_db()
+        other_talk.refresh_from_db()
+        self.assertEqual(self.talk.waiting_count, 3)
+        self.assertEqual(other_talk.waiting_count, 1)
+
+    def test_no_waiting_reservations(self):
+        self.assertEqual(promote_waiting_reservations([self.talk.id]), [])
+        self.assertEqual(promote_waiting_reservations(), [])
+
+
+class AnnotateWaitingPositionsTest(TestCase):
+    def test_positions(self):
+        talk, reservations = create_reservations(spots=1, count=4)
+        first, second, third, fourth = reservations
+        first.is_confirmed = True
+        first.save()
+        for reservation in (second, third, fourth):
+            reservation.is_waiting = True
+            reservation.save()
+        other_talk, others = create_reservations(
+            spots=1, count=2, event=talk.event, prefix="other"
+        )
+        others[1].is_waiting = True
+        others[1].save()
+
+        with self.assertNumQueries(1):
+            annotate_waiting_positions([first, fourth, second, others[1]])
+        self.assertFalse(hasattr(first, "waiting_position"))
+        self.assertEqual(second.waiting_position, 1)
+        self.assertEqual(fourth.waiting_position, 3)
+        self.assertEqual(others[1].waiting_position, 1)
+
+    def test_no_waiting_reservations(self):
+        _, reservations = create_reservations(spots=1, count=1)
+        with self.assertNumQueries(0):
+            annotate_waiting_positions(reservations)
@@ -0,0 +1,207 @@
+import io
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from talk.management.commands.benchmark_schedule_layout import (
+    create_synthetic_schedule,
+)
+from talk.models import Room, Talk, TalkSlot, TimeSlot
+from talk.schedule import count_overlaps, layout_schedule
+
+
+def reference_layout(time_slots, talk_slots, rooms):
+    """
+    The nested loop implementation that the grid used before the layout was
+    moved to talk.schedule. Overlaps are replaced by their count.
+    """
+    blocks = {}
+    for time_slot in time_slots:
+        block = blocks.setdefault(time_slot.block, {"time_slots": [], "rooms": set()})
+        time_talk_slots = [
+            (talk_slot.room_id, talk_slot.talk)
+            for talk_slot in talk_slots
+            if talk_slot.time_id == time_slot.id
+        ]
+        block["time_slots"].append((time_slot, time_talk_slots, []))
+        block["rooms"] |= {talk_slot_tuple[0] for talk_slot_tuple in time_talk_slots}
+
+    for block in blocks.values():
+        block["rooms"] = [room for room in rooms if room.id in block["rooms"]]
+        grouped_talks = {}
+        for time_slot, time_talk_slots, overlaps in block["time_slots"]:
+            grouped_talks.setdefault(time_slot, {"room_talks": {}, "attributes": {}})
+            for room_id, talk in time_talk_slots:
+                room_talks = grouped_talks[time_slot]["room_talks"]
+                for room in block["rooms"]:
+                    if room.id == room_id:
+                        room_talks.setdefault(room, []).append(talk)
+
+        time_slot_count = len(block["time_slots"])
+        for index1 in range(time_slot_count):
+            time_slot1, _, overlaps1 = block["time_slots"][index1]
+            for index2 in range(time_slot_count):
+                time_slot2, _, overlaps2 = block["time_slots"][index2]
+                if (
+                    time_slot1 != time_slot2
+                    and time_slot1.start_time >= time_slot2.start_time
+                    and time_slot1.end_time <= time_slot2.end_time
+                ):
+                    overlaps2.append(index1)
+                    overlaps1.append(index2)
+
+        schedule = []
+        scheduled_times = {}
+        row = 0
+        for time_slot, time_talk_slots, overlaps in block["time_slots"]:
+            attributes = grouped_talks[time_slot]["attributes"]
+            if len(overlaps) > 1:
+                attributes["rowspan"] = len(overlaps)
+            elif len(overlaps) == 1:
+                attributes["colspan"] = len(block["rooms"]) - 1
+            if time_slot.start_time not in scheduled_times:
+                scheduled_times[time_slot.start_time] = row
+                index = row
+                row += 1
+            else:
+                index = scheduled_times[time_slot.start_time]
+            if len(schedule) - 1 < index:
+                schedule.append(
+                    {"time_slots": [[time_slot, attributes]], "room_talks": {}}
+                )
+            else:
+                schedule[index]["time_slots"].append([time_slot, attributes])
+            for room in block["rooms"]:
+                if room in grouped_talks[time_slot]["room_talks"]:
+                    schedule[index]["room_talks"].setdefault(room, []).extend(
+                        [
+                            time_slot,
+                            grouped_talks[time_slot]["room_talks"][room],
+                            attributes,
+                        ]
+                    )
+        block["schedule"] = schedule
+        block["time_slots"] = [
+            (time_slot, time_talk_slots, len(overlaps))
+            for time_slot, time_talk_slots, overlaps in block["time_slots"]
+        ]
+    return blocks
+
+
+class LayoutScheduleTest(SimpleTestCase):
+    def setUp(self):
+        self.start = timezone.make_aware(datetime(2030, 5, 1, 9, 0))
+        self.rooms = [
+            Room(id=1, name="Big", priority=0),
+            Room(id=2, name="Small", priority=1),
+            Room(id=3, name="Workshop", priority=2),
+        ]
+
+    def time_slot(self, id, start, minutes, block=0):
+        start_time = self.start + timedelta(minutes=start)
+        return TimeSlot(
+            id=id,
+            name="Slot {}".format(id),
+            start_time=start_time,
+            end_time=start_time + timedelta(minutes=minutes),
+            block=block,
+        )
+
+    def talk_slot(self, id, time_slot, room):
+        return TalkSlot(
+            id=id,
+            talk=Talk(id=id, title="Talk {}".format(id)),
+            time=time_slot,
+            room=room,
+        )
+
+    def test_count_overlaps(self):
+        time_slots = [
+            self.time_slot(1, 0, 240),
+            self.time_slot(2, 0, 60),
+            self.time_slot(3, 60, 60),
+            self.time_slot(4, 60, 60),
+            self.time_slot(5, 300, 30),
+        ]
+        self.assertEqual(count_overlaps(time_slots), [3, 1, 3, 3, 0])
+
+    def test_count_overlaps_empty(self):
+        self.assertEqual(count_overlaps([]), [])
+
+    def test_layout_empty(self):
+        self.assertEqual(layout_schedule([], [], self.rooms), {})
+
+    def test_layout_with_overlapping_workshop(self):
+        workshop = self.time_slot(1, 0, 120)
+        first = self.time_slot(2, 0, 60)
+        second = self.time_slot(3, 60, 60)
+        lunch = self.time_slot(4, 120, 60)
+        talk_slots = [
+            self.talk_slot(1, workshop, self.rooms[2]),
+            self.talk_slot(2, first, self.rooms[1]),
+            self.talk_slot(3, first, self.rooms[0]),
+            self.talk_slot(4, second, self.rooms[0]),
+        ]
+        blocks = layout_schedule(
+            [lunch, second, first, workshop], talk_slots, self.rooms
+        )
+        self.assertEqual(list(blocks.keys()), [0])
+        block = blocks[0]
+        self.assertEqual(block["rooms"], self.rooms)
+        schedule = block["schedule"]
+        self.assertEqual(len(schedule), 3)
+        self.assertEqual(
+            schedule[0]["time_slots"],
+            [[first, {"colspan": 2}], [workshop, {"rowspan": 2}]],
+        )
+        self.assertEqual(list(schedule[0]["room_talks"].keys()), self.rooms)
+        self.assertEqual(
+            schedule[0]["room_talks"][self.rooms[2]],
+            [workshop, [talk_slots[0].talk], {"rowspan": 2}],
+        )
+        self.assertEqual(schedule[1]["time_slots"], [[second, {"colspan": 2}]])
+        self.assertEqual(schedule[2]["time_slots"], [[lunch, {}]])
+        self.assertEqual(schedule[2]["room_talks"], {})
+
+    def test_layout_multiple_blocks(self):
+        day1 = self.time_slot(1, 0, 60, block=0)
+        day2 = self.time_slot(2, 24 * 60, 60, block=1)
+        talk_slots = [
+            self.talk_slot(1, day1, self.rooms[0]),
+            self.talk_slot(2, day2, self.rooms[1]),
+        ]
+        blocks = layout_schedule([day2, day1], talk_slots, self.rooms)
+        self.assertEqual(list(blocks.keys()), [0, 1])
+        self.assertEqual(blocks[0]["rooms"], [self.rooms[0]])
+        self.assertEqual(blocks[1]["rooms"], [self.rooms[1]])
+
+    def test_layout_matches_reference(self):
+        for time_slot_count, room_count, block_count in (
+            (12, 3, 1),
+            (60, 8, 2),
+            (300, 24, 3),
+        ):
+            time_slots, talk_slots, rooms = create_synthetic_schedule(
+                time_slot_count, room_count, block_count
+            )
+            self.assertEqual(
+                layout_schedule(time_slots, talk_slots, rooms),
+                reference_layout(time_slots, talk_slots, rooms),
+            )
+
+
+class BenchmarkScheduleLayoutCommandTest(SimpleTestCase):
+    def test_benchmark(self):
+        outbuf = io.StringIO()
+        call_command(
+            "benchmark_schedule_layout",
+            time_slots=[10, 20],
+            rooms=4,
+            repeat=1,
+            stdout=outbuf,
+        )
+        output_lines = outbuf.getvalue().splitlines()
+        self.assertEqual(len(output_lines), 2)
+        self.assertTrue(output_lines[0].startswith("10 time slots"))
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from django.core import mail
 from django.test import RequestFactory, TestCase
 
@@ -5,6 +7,7 @@ from attendee.models import Attendee
 from attendee.signals import attendence_cancelled
 from attendee.tests import attendee_testutils
 from event.models import Event
+from outbox.mail import send_queued_mail
 from speaker.tests import speaker_testutils
 from talk.models import SessionReservation, Talk, Track
 from talk.signals import (
@@ -26,6 +29,13 @@ class SendReservationConfirmationMailTest(TestCase):
         user, _ = attendee_testutils.create_test_user()
         self.attendee = Attendee.objects.create(user=user, event=self.event)
 
+    def send_and_commit(self, signal, **kwargs):
+        # the waiting lists are processed when the transaction is committed
+        with patch(
+            "talk.signals.transaction.on_commit", side_effect=lambda func: func()
+        ):
+            signal.send(self.__class__, **kwargs)
+
     def test_send_reservation_confirmation_mail(self):
         self.client.request()
         request = RequestFactory().request()
@@ -36,6 +46,7 @@ class SendReservationConfirmationMailTest(TestCase):
 
         send_reservation_confirmation_mail(request, reservation, self.attendee.user)
 
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn(self.attendee.user.email, mail.outbox[0].recipients())
         self.assertEqual(len(mail.outbox[0].recipients()), 1)
@@ -46,9 +57,10 @@ class SendReservationConfirmationMailTest(TestCase):
         reservation = SessionReservation.objects.create(
             talk=self.talk, attendee=self.attendee, is_confirmed=False, is_waiting=False
         )
-        session_reservation_cancelled.send(
-            self.__class__, reservation=reservation, request=request
+        self.send_and_commit(
+            session_reservation_cancelled, reservation=reservation, request=request
         )
+        send_queued_mail()
         # no mails sent if there are no pending reservations
         self.assertEqual(len(mail.outbox), 0)
 
@@ -57,9 +69,10 @@ class SendReservationConfirmationMailTest(TestCase):
         reservation = SessionReservation.objects.create(
             talk=self.talk, attendee=attendee2, is_confirmed=False, is_waiting=True
         )
-        session_reservation_cancelled.send(
-            self.__class__, reservation=reservation, request=request
+        self.send_and_commit(
+            session_reservation_cancelled, reservation=reservation, request=request
         )
+        send_queued_mail()
         # mails sent to waiting attendee
         self.assertEqual(len(mail.outbox), 1)
         self.assertIn(attendee2.user.email, mail.outbox[0].recipients())
@@ -85,9 +98,10 @@ class SendReservationConfirmationMailTest(TestCase):
             talk=talk2, attendee=self.attendee, is_confirmed=False, is_waiting=False
         )
 
-        attendence_cancelled.send(
-            self.__class__, attendee=self.attendee, request=request
+        self.send_and_commit(
+            attendence_cancelled, attendee=self.attendee, request=request
         )
+        send_queued_mail()
         # no mails sent if there are no pending reservations
         self.assertEqual(len(mail.outbox), 0)
 
@@ -107,9 +121,10 @@ class SendReservationConfirmationMailTest(TestCase):
             talk=talk2, attendee=attendee3, is_confirmed=False, is_waiting=True
         )
 
-        attendence_cancelled.send(
-            self.__class__, attendee=self.attendee, request=request
+        self.send_and_commit(
+            attendence_cancelled, attendee=self.attendee, request=request
         )
+        send_queued_mail()
 
         # mails sent to waiting attendee
         self.assertEqual(len(mail.outbox), 2)
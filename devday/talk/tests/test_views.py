@@ -6,8 +6,10 @@ from xml.etree import ElementTree
 from django.conf import settings
 from django.contrib.auth.models import Group
 from django.core import mail, signing
+from django.db import connection
 from django.http import QueryDict
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.translation import ugettext as _
@@ -17,6 +19,7 @@ from attendee.tests import attendee_testutils
 from devday.utils.devdata import DevData
 from event.models import Event
 from event.tests import event_testutils
+from outbox.mail import send_queued_mail
 from speaker.models import PublishedSpeaker
 from speaker.tests import speaker_testutils
 from talk import COMMITTEE_GROUP
@@ -34,6 +37,7 @@ from talk.models import (
     SessionReservation,
     Talk,
     TalkComment,
+    TalkDraftSpeaker,
     TalkFormat,
     TalkMedia,
     TalkSlot,
@@ -44,7 +48,7 @@ from talk.models import (
 from talk.tests import talk_testutils
 
 # noinspection PyUnresolvedReferences
-from talk.views import AttendeeTalkFeedback
+from talk.views import AttendeeTalkFeedback, CommitteeTalkOverview
 
 
 class LoginTestMixin(object):
@@ -238,6 +242,96 @@ class TestTalkOverView(LoginTestMixin, TestCase):
         talks = list(response.context["talk_list"])
         self.assertListEqual([talk2, talk1], talks)
 
+    def create_talks(self, count, event=None):
+        event = event or Event.objects.current_event()
+        speaker, _, _ = speaker_testutils.create_test_speaker(
+            email="talks{}@example.org".format(Talk.objects.count()), name="Speaker"
+        )
+        return [
+            Talk.objects.create(
+                draft_speaker=speaker,
+                title="Test Session {:02d}".format(index),
+                event=event,
+            )
+            for index in range(count)
+        ]
+
+    def test_comment_count(self):
+        talk, other = self.create_talks(2)
+        other_event_talk = self.create_talks(
+            1, event_testutils.create_test_event("Other Event", published=False)
+        )[0]
+        committee_member = self.login_committee_member()
+        for commented in (talk, talk, other_event_talk):
+            TalkComment.objects.create(
+                commenter=committee_member, talk=commented, comment="Hmm"
+            )
+        Vote.objects.create(voter=committee_member, talk=talk, score=3)
+        response = self.client.get(self.url)
+        talks = list(response.context["talk_list"])
+        self.assertListEqual([talk, other], talks)
+        self.assertEqual(talks[0].comment_count, 2)
+        self.assertEqual(talks[0].vote_sum, 3)
+        self.assertEqual(talks[0].vote_count, 1)
+        self.assertEqual(talks[1].comment_count, 0)
+        self.assertEqual(response.context["talk_count"], 2)
+
+    def test_constant_query_count(self):
+        self.login_committee_member()
+        self.create_talks(1)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(self.url)
+        self.create_talks(5)
+        with self.assertNumQueries(len(captured)):
+            self.client.get(self.url)
+
+    @mock.patch.object(CommitteeTalkOverview, "paginate_by", 2)
+    def test_keyset_pagination(self):
+        talks = self.create_talks(5)
+        committee_member = self.login_committee_member()
+        for score, talk in zip((3, 5, 3, 1), talks):
+            Vote.objects.create(voter=committee_member, talk=talk, score=score)
+        expected_orders = {
+            ("title", "asc"): talks,
+            ("title", "desc"): talks[::-1],
+            ("score", "desc"): [talks[1], talks[2], talks[0], talks[3], talks[4]],
+            ("score_sum", "asc"): [talks[4], talks[3], talks[0], talks[2], talks[1]],
+        }
+        for (sort_order, sort_dir), expected in expected_orders.items():
+            with self.subTest(sort_order=sort_order, sort_dir=sort_dir):
+                params = {"sort_order": sort_order, "sort_dir": sort_dir}
+                pages = []
+                response = self.client.get(self.url, params)
+                self.assertIsNone(response.context["previous_cursor"])
+                while True:
+                    pages.append(list(response.context["talk_list"]))
+                    next_cursor = response.context["next_cursor"]
+                    if next_cursor is None:
+                        break
+                    response = self.client.get(
+                        self.url, dict(params, after=next_cursor)
+                    )
+                self.assertEqual([len(page) for page in pages], [2, 2, 1])
+                self.assertListEqual(
+                    [talk for page in pages for talk in page], expected
+                )
+
+                previous_pages = []
+                while response.context["previous_cursor"] is not None:
+                    response = self.client.get(
+                        self.url,
+                        dict(params, before=response.context["previous_cursor"]),
+                    )
+                    previous_pages.insert(0, list(response.context["talk_list"]))
+                self.assertListEqual(previous_pages, pages[:-1])
+
+    def test_invalid_cursor_ignored(self):
+        talks = self.create_talks(2)
+        self.login_committee_member()
+        response = self.client.get(self.url, {"after": "invalid"})
+        self.assertListEqual(list(response.context["talk_list"]), talks)
+
 
 class TestTalkDetails(TestCase):
     def setUp(self):
@@ -469,6 +563,7 @@ class TestSubmitTalkComment(TestCase):
         self.assertEqual(comments[0].comment, "A little comment for yo")
         self.assertTrue(comments[0].is_visible)
         self.assertEqual(comments[0].commenter, user)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         speaker_mail = mail.outbox[0]
         self.assertIn(self.speaker.user.email, speaker_mail.recipients())
@@ -1103,12 +1198,8 @@ class TestTalkVideoView(TestCase):
         track = Track.objects.create(name="Things")
         talk1.publish(track)
         talk2.publish(track)
-        TalkMedia.objects.create(
-            talk=talk1, code="https://example.org/git/talk1code"
-        )
-        TalkMedia.objects.create(
-            talk=talk2, code="https://example.org/git/talk1code"
-        )
+        TalkMedia.objects.create(talk=talk1, code="https://example.org/git/talk1code")
+        TalkMedia.objects.create(talk=talk2, code="https://example.org/git/talk1code")
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertIn("event", response.context)
@@ -1160,10 +1251,55 @@ class TestEventSessionSummaryView(TestCase):
         )
         self.assertIn(
             self.talk.title,
-            r.content.decode(),
+            r.getvalue().decode(),
             "talk should be listed in session summary",
         )
 
+    def test_get_session_summary_content(self):
+        other_speaker, _, _ = speaker_testutils.create_test_speaker(
+            email="otherspeaker@example.org",
+            name="Other Speaker",
+            organization="Other Org",
+        )
+        TalkDraftSpeaker.objects.create(talk=self.talk, draft_speaker=other_speaker)
+        self.talk.talkformat.add(TalkFormat.objects.create(name="Talk", duration=45))
+        Vote.objects.create(voter=self.staff, talk=self.talk, score=4)
+        Vote.objects.create(voter=self.user, talk=self.talk, score=2)
+        comment = TalkComment.objects.create(
+            commenter=self.staff, talk=self.talk, comment="Nice"
+        )
+        self.client.login(username=self.staff.email, password=self.staff_password)
+        r = self.client.get(self.url)
+        self.assertTrue(r.streaming, "export should be streamed")
+        self.assertEqual(
+            r["Content-Disposition"], "attachment; filename=session-summary.csv"
+        )
+        lines = r.getvalue().decode().splitlines()
+        self.assertEqual(
+            lines[0],
+            "Speaker;Organizations;Title;Abstract;Remarks;Formats;Avg. Score;"
+            "Total Score;Comments",
+        )
+        self.assertEqual(
+            lines[1],
+            "Test Speaker, Other Speaker;Test Org, Other Org;A Talk;;;"
+            "Talk (0:45h);3.0;6;staff@example.org: Nice ({})".format(comment.modified),
+        )
+
+    def test_get_session_summary_query_count(self):
+        for index in range(5):
+            talk = Talk.objects.create(
+                draft_speaker=self.speaker,
+                title="Talk {}".format(index),
+                event=self.event,
+            )
+            TalkComment.objects.create(commenter=self.staff, talk=talk, comment="Ok")
+        self.client.login(username=self.staff.email, password=self.staff_password)
+        r = self.client.get(self.url)
+        # rows are fetched while streaming: talks, speakers, formats, comments
+        with self.assertNumQueries(4):
+            self.assertEqual(len(r.getvalue().decode().splitlines()), 7)
+
 
 class TestAttendeeVotingView(TestCase):
     def setUp(self):
@@ -1520,6 +1656,7 @@ class TestTalkAddReservation(TestCase):
         )
         self.assertFalse(reservation.is_confirmed)
         self.assertFalse(reservation.is_waiting)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(len(mail.outbox[0].recipients()), 1)
         self.assertIn(self.user.email, mail.outbox[0].recipients())
@@ -1641,6 +1778,7 @@ class TestTalkResendReservationConfirmation(TestCase):
         )
         self.assertFalse(reservation.is_confirmed)
         self.assertFalse(reservation.is_waiting)
+        send_queued_mail()
         self.assertEqual(len(mail.outbox), 1)
         self.assertEqual(len(mail.outbox[0].recipients()), 1)
         self.assertIn(self.user.email, mail.outbox[0].recipients())
@@ -1714,6 +1852,37 @@ class TestTalkCancelReservation(TestCase):
             ).exists()
         )
 
+    def test_post_cancels_promotable_waiting_reservation(self):
+        # the spot of the talk is free, but the waiting list has not been
+        # processed yet
+        Talk.objects.filter(pk=self.talk.pk).update(spots=1)
+        reservation = SessionReservation.objects.create(
+            attendee=self.attendee, talk=self.talk, is_waiting=True
+        )
+        user, _ = attendee_testutils.create_test_user("waiting@example.org")
+        waiting = SessionReservation.objects.create(
+            attendee=Attendee.objects.create(user=user, event=self.event),
+            talk=self.talk,
+            is_waiting=True,
+        )
+        self.client.login(username=self.user.get_username(), password=self.password)
+        callbacks = []
+        with mock.patch(
+            "talk.signals.transaction.on_commit", side_effect=callbacks.append
+        ):
+            response = self.client.post(self.url, data={})
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(SessionReservation.objects.filter(pk=reservation.pk).exists())
+        # the waiting list is processed after the reservation has been deleted
+        for callback in callbacks:
+            callback()
+        send_queued_mail()
+        waiting.refresh_from_db()
+        self.assertFalse(waiting.is_waiting)
+        self.assertEqual([m.recipients() for m in mail.outbox], [[user.email]])
+        self.talk.refresh_from_db()
+        self.assertEqual((self.talk.confirmed_count, self.talk.waiting_count), (0, 0))
+
 
 class TestTalkConfirmReservation(TestCase):
     def setUp(self):
@@ -1882,6 +2051,16 @@ class TestTalkReservationWaiting(TestCase):
         self.assertIn("event", response.context)
         self.assertIn("talk", response.context)
 
+    def test_get_shows_waiting_position(self):
+        attendee = Attendee.objects.get(event=self.event, user=self.user)
+        SessionReservation.objects.create(
+            talk=self.talk, attendee=attendee, is_waiting=True
+        )
+        self.client.login(username=self.user.get_username(), password=self.password)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["reservation"].waiting_position, 1)
+
 
 class TestLimitedTalkList(TestCase):
     def setUp(self):
@@ -1,8 +1,6 @@
-import csv
 import logging
 import xml.etree.ElementTree as ElementTree
 from datetime import date, timedelta
-from io import StringIO
 
 from django.conf import settings
 from django.contrib import messages
@@ -11,8 +9,20 @@ from django.contrib.auth.mixins import AccessMixin, PermissionRequiredMixin
 from django.contrib.sites.shortcuts import get_current_site
 from django.core import signing
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
-from django.db.models import Avg, Count, F, Max, Min, Prefetch, Sum
+from django.db.models import (
+    Avg,
+    Count,
+    F,
+    FloatField,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.db.transaction import atomic
 from django.http import (
     Http404,
@@ -39,12 +49,19 @@ from django.views.generic.edit import (
 )
 from django.views.generic.list import BaseListView
 
+from attendee.capabilities import get_capabilities
 from attendee.forms import DevDayRegistrationForm
 from attendee.models import Attendee
 from attendee.views import AttendeeRequiredMixin, StaffUserMixin
+from devday.utils.csv_export import StreamingCSVExportView
 from event.models import Event
+from outbox.mail import queue_mail
 from speaker.models import Speaker
-from talk import signals
+from talk import COMMITTEE_PERMISSIONS, signals
+from talk.committee_export import (
+    get_committee_export_queryset,
+    iter_committee_export_rows,
+)
 from talk.forms import (
     AttendeeTalkFeedbackForm,
     AttendeeTalkVoteForm,
@@ -62,11 +79,18 @@ from talk.models import (
     SessionReservation,
     Talk,
     TalkComment,
+    TalkDraftSpeaker,
     TalkSlot,
     TimeSlot,
     Vote,
 )
-from talk.reservation import get_reservation_email_context
+from talk.page_cache import AnonymousPageCacheMixin
+from talk.reservation import (
+    annotate_waiting_positions,
+    confirm_reservation,
+    get_reservation_email_context,
+)
+from talk.schedule import layout_schedule
 
 logger = logging.getLogger("talk")
 
@@ -120,12 +144,10 @@ class SpeakerRequiredMixin(AccessMixin):
     speaker = None
 
     def dispatch(self, request, *args, **kwargs):
-        user = request.user
-        if not user.is_authenticated:
+        if not request.user.is_authenticated:
             return self.handle_no_permission()
-        try:
-            self.speaker = user.speaker
-        except ObjectDoesNotExist:
+        self.speaker = get_capabilities(request).speaker
+        if self.speaker is None:
             return redirect(
                 "{}?next={}".format(reverse("create_speaker"), request.path)
             )
@@ -172,10 +194,10 @@ class CreateTalkView(TalkSubmissionOpenMixin, SpeakerRequiredMixin, CreateView):
 
 
 class CommitteeRequiredMixin(PermissionRequiredMixin):
-    permission_required = ("talk.add_vote", "talk.add_talkcomment")
+    permission_required = COMMITTEE_PERMISSIONS
 
 
-class TalkDetails(DetailView):
+class TalkDetails(AnonymousPageCacheMixin, DetailView):
     model = Talk
     slug_url_kwarg = "slug"
     slug_field = "slug"
@@ -224,48 +246,130 @@ class TalkDetails(DetailView):
 
 
 class CommitteeTalkOverview(CommitteeRequiredMixin, ListView):
+    """
+    List the talks of the current event with their vote statistics for the
+    program committee.
+
+    The list is paginated with keyset pagination: the ``after`` and
+    ``before`` parameters contain a signed cursor with the sort value and the
+    primary key of the last or first talk of the current page. Pages are
+    therefore selected by a condition on the sort key instead of an
+    ``OFFSET`` and stay stable while votes are cast.
+    """
+
     model = Talk
     template_name_suffix = "_committee_overview"
+    paginate_by = 50
+
+    CURSOR_SALT = "talk.committee_overview"
 
     ORDER_MAP = {
-        "speaker": "draft_speakers__name",
-        "score": "average_score",
-        "score_sum": "vote_sum",
+        "title": "title",
+        "speaker": "speaker_name",
+        "score": "score_key",
+        "score_sum": "score_sum_key",
     }
 
+    def get_sort(self):
+        sort_order = self.request.GET.get("sort_order", "title")
+        if sort_order not in CommitteeTalkOverview.ORDER_MAP:
+            sort_order = "title"
+        sort_dir = "desc" if self.request.GET.get("sort_dir") == "desc" else "asc"
+        return sort_order, sort_dir
+
     def get_queryset(self):
-        qs = (
+        first_speaker = TalkDraftSpeaker.objects.filter(talk=OuterRef("pk")).order_by(
+            "order"
+        )
+        comment_count = (
+            TalkComment.objects.filter(talk=OuterRef("pk"))
+            .order_by()
+            .values("talk")
+            .annotate(count=Count("id"))
+            .values("count")
+        )
+        return (
             super(CommitteeTalkOverview, self)
             .get_queryset()
             .filter(event=Event.objects.current_event())
             .annotate(
-                average_score=Avg("vote__score"),
+                average_score=Cast(Avg("vote__score"), FloatField()),
                 vote_sum=Sum("vote__score"),
                 vote_count=Count("vote__id"),
+                comment_count=Coalesce(Subquery(comment_count), 0),
+                speaker_name=Coalesce(
+                    Subquery(first_speaker.values("draft_speaker__name")[:1]), Value("")
+                ),
             )
-            .order_by("title")
+            .annotate(
+                score_key=Coalesce(F("average_score"), 0.0),
+                score_sum_key=Coalesce(F("vote_sum"), 0),
+            )
+            .prefetch_related("draft_speakers", "talkformat")
         )
-        sort_order = self.request.GET.get("sort_order", "title")
-        sort_order = CommitteeTalkOverview.ORDER_MAP.get(sort_order, sort_order)
-        if self.request.GET.get("sort_dir") == "desc":
-            sort_order = "-{}".format(sort_order)
-        return qs.order_by(sort_order)
+
+    def _load_cursor(self, parameter):
+        try:
+            return signing.loads(self.request.GET[parameter], salt=self.CURSOR_SALT)
+        except (KeyError, signing.BadSignature):
+            return None
+
+    def _dump_cursor(self, talk, sort_key):
+        return signing.dumps((getattr(talk, sort_key), talk.pk), salt=self.CURSOR_SALT)
+
+    def paginate_queryset(self, queryset, page_size):
+        sort_order, sort_dir = self.get_sort()
+        sort_key = CommitteeTalkOverview.ORDER_MAP[sort_order]
+        descending = sort_dir == "desc"
+
+        after = self._load_cursor("after")
+        before = None if after else self._load_cursor("before")
+        cursor = after or before
+        # walk backwards from the cursor to find the previous page
+        backwards = before is not None
+        if cursor:
+            value, pk = cursor
+            lookup = "lt" if descending != backwards else "gt"
+            queryset = queryset.filter(
+                Q(**{"{}__{}".format(sort_key, lookup): value})
+                | Q(**{sort_key: value, "pk__{}".format(lookup): pk})
+            )
+        if descending != backwards:
+            queryset = queryset.order_by(F(sort_key).desc(), F("pk").desc())
+        else:
+            queryset = queryset.order_by(sort_key, "pk")
+
+        talks = list(queryset[: page_size + 1])
+        has_more = len(talks) > page_size
+        talks = talks[:page_size]
+        if backwards:
+            talks.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = cursor is not None, has_more
+
+        self.previous_cursor = (
+            self._dump_cursor(talks[0], sort_key)
+            if self.has_previous and talks
+            else None
+        )
+        self.next_cursor = (
+            self._dump_cursor(talks[-1], sort_key) if self.has_next and talks else None
+        )
+        return None, None, talks, self.has_previous or self.has_next
 
     def get_context_data(self, **kwargs):
         context = super(CommitteeTalkOverview, self).get_context_data(**kwargs)
-        talk_list = context["talk_list"]
-        for item in (
-            Talk.objects.values("id")
-            .annotate(comment_count=Count("talkcomment__id"))
-            .all()
-        ):
-            for talk in talk_list:
-                if item["id"] == talk.id:
-                    setattr(talk, "comment_count", item["comment_count"])
+        sort_order, sort_dir = self.get_sort()
         context.update(
             {
-                "sort_order": self.request.GET.get("sort_order", "title"),
-                "sort_dir": self.request.GET.get("sort_dir", "asc"),
+                "sort_order": sort_order,
+                "sort_dir": sort_dir,
+                "talk_count": Talk.objects.filter(
+                    event=Event.objects.current_event()
+                ).count(),
+                "previous_cursor": self.previous_cursor,
+                "next_cursor": self.next_cursor,
             }
         )
         return context
@@ -276,7 +380,7 @@ class CommitteeSpeakerDetails(CommitteeRequiredMixin, DetailView):
     template_name = "talk/speaker_details.html"
 
 
-class TalkListView(ListView):
+class TalkListView(AnonymousPageCacheMixin, ListView):
     model = Talk
 
     def dispatch(self, request, *args, **kwargs):
@@ -314,88 +418,7 @@ class TalkListView(ListView):
 
         rooms = list(Room.objects.for_event(self.event))
 
-        blocks = {}
-
-        # assign time slots to blocks
-        for time_slot in time_slots:
-            block = blocks.setdefault(
-                time_slot.block, {"time_slots": [], "rooms": set()}
-            )
-            time_talk_slots = [
-                (talk_slot.room_id, talk_slot.talk)
-                for talk_slot in talk_slots
-                if talk_slot.time_id == time_slot.id
-            ]
-            block["time_slots"].append((time_slot, time_talk_slots, []))
-            block["rooms"] |= {
-                talk_slot_tuple[0] for talk_slot_tuple in time_talk_slots
-            }
-
-        # sort talks into ordered rooms
-        for block in blocks.values():
-            block["rooms"] = [room for room in rooms if room.id in block["rooms"]]
-            grouped_talks = {}
-            for time_slot, time_talk_slots, overlaps in block["time_slots"]:
-                grouped_talks.setdefault(
-                    time_slot, {"room_talks": {}, "attributes": {}}
-                )
-                for room_id, talk in time_talk_slots:
-                    room_talks = grouped_talks[time_slot]["room_talks"]
-                    for room in block["rooms"]:
-                        if room.id == room_id:
-                            room_talks.setdefault(room, []).append(talk)
-
-            # calculate overlaps
-            time_slot_count = len(block["time_slots"])
-            for index1 in range(time_slot_count):
-                time_slot1, time_talk_slots1, overlaps1 = block["time_slots"][index1]
-                for index2 in range(time_slot_count):
-                    time_slot2, time_talk_slots2, overlaps2 = block["time_slots"][
-                        index2
-                    ]
-                    if (
-                        time_slot1 != time_slot2
-                        and time_slot1.start_time >= time_slot2.start_time
-                        and time_slot1.end_time <= time_slot2.end_time
-                    ):
-                        overlaps2.append(index1)
-                        overlaps1.append(index2)
-
-            schedule = []
-            scheduled_times = {}
-            row = 0
-
-            # calculate column and row spans
-            for time_slot, time_talk_slots, overlaps in block["time_slots"]:
-                attributes = grouped_talks[time_slot]["attributes"]
-                if len(overlaps) > 1:
-                    attributes["rowspan"] = len(overlaps)
-                elif len(overlaps) == 1:
-                    attributes["colspan"] = len(block["rooms"]) - 1
-                if time_slot.start_time not in scheduled_times:
-                    scheduled_times[time_slot.start_time] = row
-                    index = row
-                    row += 1
-                else:
-                    index = scheduled_times[time_slot.start_time]
-                if len(schedule) - 1 < index:
-                    schedule_row = {
-                        "time_slots": [[time_slot, attributes]],
-                        "room_talks": {},
-                    }
-                    schedule.append(schedule_row)
-                else:
-                    schedule[index]["time_slots"].append([time_slot, attributes])
-                for room in block["rooms"]:
-                    if room in grouped_talks[time_slot]["room_talks"]:
-                        schedule[index]["room_talks"].setdefault(room, []).extend(
-                            [
-                                time_slot,
-                                grouped_talks[time_slot]["room_talks"][room],
-                                attributes,
-                            ]
-                        )
-                block["schedule"] = schedule
+        blocks = layout_schedule(time_slots, talk_slots, rooms)
 
         unscheduled = []
         for talk in all_talks:
@@ -461,7 +484,7 @@ class TalkListPreviewView(ListView):
         return context
 
 
-class TalkVideoView(ListView):
+class TalkVideoView(AnonymousPageCacheMixin, ListView):
     model = Talk
     template_name_suffix = "_videos"
     event = None
@@ -686,7 +709,7 @@ class CommitteeSubmitTalkComment(CommitteeRequiredMixin, SingleObjectMixin, Form
         # send email to speaker if comment is visible
         if self.talk_comment.is_visible:
             recipients = [speaker.user.email for speaker in talk.draft_speakers.all()]
-            send_mail(
+            queue_mail(
                 self.get_email_subject(),
                 self.get_email_text_body(),
                 settings.DEFAULT_FROM_EMAIL,
@@ -837,64 +860,45 @@ class RedirectVideoView(RedirectView):
         )
 
 
-class EventSessionSummaryView(StaffUserMixin, BaseListView):
+class EventSessionSummaryView(StaffUserMixin, StreamingCSVExportView):
     model = Talk
+    filename = "session-summary.csv"
+    header = (
+        "Speaker",
+        "Organizations",
+        "Title",
+        "Abstract",
+        "Remarks",
+        "Formats",
+        "Avg. Score",
+        "Total Score",
+        "Comments",
+    )
+    chunk_size = 500
 
     def get_queryset(self):
-        return (
-            super()
-            .get_queryset()
-            .filter(event=Event.objects.current_event())
-            .order_by("title")
+        return get_committee_export_queryset(Event.objects.current_event()).order_by(
+            "title"
         )
 
-    def render_to_response(self, context):
-        output = StringIO()
-        try:
-            writer = csv.writer(output, delimiter=";")
-            writer.writerow(
-                (
-                    "Speaker",
-                    "Organizations",
-                    "Title",
-                    "Abstract",
-                    "Remarks",
-                    "Formats",
-                    "Avg. Score",
-                    "Total Score",
-                    "Comments",
-                )
-            )
-            writer.writerows(
-                [
+    def get_rows(self, queryset):
+        for row in iter_committee_export_rows(queryset, self.chunk_size):
+            yield [
+                ", ".join([speaker.name for speaker in row.speakers]),
+                ", ".join([speaker.organization for speaker in row.speakers]),
+                row.title,
+                row.abstract,
+                row.remarks,
+                ", ".join(row.formats),
+                row.average_score,
+                row.vote_sum,
+                "\n".join(
                     [
-                        ", ".join([speaker.name for speaker in t.draft_speakers.all()]),
-                        ", ".join(
-                            [speaker.organization for speaker in t.draft_speakers.all()]
-                        ),
-                        t.title,
-                        t.abstract,
-                        t.remarks,
-                        ", ".join([str(f) for f in t.talkformat.all()]),
-                        t.vote_set.aggregate(Avg("score"))["score__avg"],
-                        t.vote_set.aggregate(Sum("score"))["score__sum"],
-                        "\n".join(
-                            [
-                                "%s: %s (%s)" % (c.commenter, c.comment, c.modified)
-                                for c in t.talkcomment_set.order_by("modified").all()
-                            ]
-                        ),
+                        "%s: %s (%s)" % (c.commenter, c.comment, c.modified)
+                        for c in sorted(row.comments, key=lambda c: c.modified)
                     ]
-                    for t in context.get("object_list", [])
-                ]
-            )
-            response = HttpResponse(
-                output.getvalue(), content_type="txt/csv; charset=utf-8"
-            )
-            response["Content-Disposition"] = "attachment; filename=session-summary.csv"
-            return response
-        finally:
-            output.close()
+                ),
+            ]
 
 
 class AttendeeVotingView(AttendeeRequiredMixin, ListView):
@@ -1069,10 +1073,7 @@ class TalkAddReservation(
             {
                 "talk": self.talk,
                 "event": self.talk.event,
-                "fully_booked": self.talk.sessionreservation_set.filter(
-                    is_confirmed=True
-                ).count()
-                >= self.talk.spots,
+                "fully_booked": self.talk.is_fully_booked,
             }
         )
         return context
@@ -1153,12 +1154,12 @@ class TalkCancelReservation(AttendeeRequiredMixin, DeleteView):
 
     def delete(self, request, *args, **kwargs):
         self.object = self.get_object()
-        signals.session_reservation_cancelled.send(
-            sender=self.__class__, reservation=self.object, request=self.request
-        )
-        success_url = self.get_success_url()
-        self.object.delete()
-        return HttpResponseRedirect(success_url)
+        with atomic():
+            signals.session_reservation_cancelled.send(
+                sender=self.__class__, reservation=self.object, request=self.request
+            )
+            self.object.delete()
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class ConfirmationError(Exception):
@@ -1188,17 +1189,8 @@ class TalkConfirmReservation(AttendeeRequiredMixin, TemplateView):
         self.reservation = self.validate_key(kwargs.get("confirmation_key"))
         if self.reservation.attendee.user != self.request.user:
             raise ConfirmationError(self.WRONG_USER, code="wrong_user")
-        if (
-            self.reservation.talk.spots
-            <= SessionReservation.objects.filter(
-                is_confirmed=True, talk_id=self.reservation.talk_id
-            ).count()
-        ):
-            self.reservation.is_waiting = True
-            self.reservation.save()
+        if not confirm_reservation(self.reservation):
             raise ConfirmationError(self.OVERBOOKED, code="overbooked")
-        self.reservation.is_confirmed = True
-        self.reservation.save()
 
     def validate_key(self, confirmation_key):
         try:
@@ -1268,9 +1260,13 @@ class TalkReservationWaiting(AttendeeRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context.update(
-            {"event": self.event, "talk": get_object_or_404(Talk, slug=kwargs["slug"])}
-        )
+        talk = get_object_or_404(Talk, slug=kwargs["slug"])
+        reservation = SessionReservation.objects.filter(
+            talk=talk, attendee=self.attendee, is_waiting=True
+        ).first()
+        if reservation is not None:
+            annotate_waiting_positions([reservation])
+        context.update({"event": self.event, "talk": talk, "reservation": reservation})
         return context
 
 
@@ -1279,18 +1275,9 @@ class LimitedTalkList(ListView):
     template_name_suffix = "_limited_list"
 
     def get_queryset(self):
-        confirmed_reservations = Prefetch(
-            "sessionreservation_set",
-            to_attr="confirmed_reservations",
-            queryset=SessionReservation.objects.filter(is_confirmed=True),
-        )
-        return (
-            Talk.reservable.filter(
-                event__slug=self.kwargs.get("event"), track__isnull=False
-            )
-            .prefetch_related(confirmed_reservations)
-            .order_by("title")
-        )
+        return Talk.reservable.filter(
+            event__slug=self.kwargs.get("event"), track__isnull=False
+        ).order_by("title")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)